@@ -0,0 +1,84 @@
+"""
+Compare JSON codecs on payloads shaped like rippled responses:
+
+    python -m benchmarks.codec_benchmark [iterations]
+"""
+import sys
+import timeit
+
+from ripple_api.codec import CODECS, get_codec
+
+ACCOUNT = 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh'
+
+
+def account_info() -> dict:
+    return {'result': {
+        'account_data': {
+            'Account': ACCOUNT, 'Balance': '999999999960', 'Flags': 8388608, 'LedgerEntryType': 'AccountRoot',
+            'OwnerCount': 0, 'PreviousTxnID': '4294BEBE5B569A18C0A2702387C9B1E7146DC3A5850C1E87204951C6FDAA4C42',
+            'PreviousTxnLgrSeq': 3, 'Sequence': 6, 'index': '92FA6A9FC8EA6018D5D16532D7795C91BFB0831355BDFDA177E86C8BF997985F',
+        },
+        'ledger_current_index': 4, 'queue_data': {'txn_count': 0}, 'status': 'success', 'validated': False,
+    }}
+
+
+def transaction(index: int) -> dict:
+    return {
+        'Account': ACCOUNT, 'Amount': {'currency': 'USD', 'issuer': ACCOUNT, 'value': '{}.5'.format(index)},
+        'Destination': 'ra5nK24KXen9AHvsdFTKHSANinZseWnPcX', 'Fee': '12', 'Flags': 2147483648,
+        'Sequence': index, 'SigningPubKey': '0330E7FC9D56BB25D6893BA3F317AE5BCF33B3291BD63DB32654A313222F7FD020',
+        'TransactionType': 'Payment', 'TxnSignature': '3045022100' + 'AB' * 66,
+        'hash': '{:064X}'.format(index),
+        'metaData': {
+            'AffectedNodes': [{'ModifiedNode': {
+                'FinalFields': {'Account': ACCOUNT, 'Balance': str(10 ** 9 - index), 'Sequence': index + 1},
+                'LedgerEntryType': 'AccountRoot', 'LedgerIndex': '{:064X}'.format(index * 7),
+                'PreviousFields': {'Balance': str(10 ** 9), 'Sequence': index},
+            }}],
+            'TransactionIndex': index % 100, 'TransactionResult': 'tesSUCCESS',
+        },
+    }
+
+
+def account_tx(count: int = 200) -> dict:
+    return {'result': {
+        'account': ACCOUNT, 'ledger_index_max': 5000, 'ledger_index_min': 32570, 'limit': count,
+        'marker': {'ledger': 4000, 'seq': 12}, 'status': 'success', 'validated': True,
+        'transactions': [{'meta': transaction(index)['metaData'], 'tx': transaction(index), 'validated': True}
+                         for index in range(count)],
+    }}
+
+
+def ledger(count: int = 1000) -> dict:
+    return {'result': {
+        'ledger': {
+            'accepted': True, 'close_time': 638329241, 'ledger_index': '54300932', 'closed': True,
+            'ledger_hash': 'B52AC3876412A152FE9C0442801E685D148D05448D0238587DBA256A1D8C5D26',
+            'transactions': [transaction(index) for index in range(count)],
+        },
+        'status': 'success', 'validated': True,
+    }}
+
+
+def main(iterations: int = 20) -> None:
+    reference = get_codec('json')
+    payloads = dict(account_info=account_info(), account_tx=account_tx(), ledger=ledger())
+    codecs = []
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            print('{:8} not installed'.format(name))
+    print('{:8} {:14} {:>10} {:>12} {:>12}'.format('codec', 'payload', 'bytes', 'dumps, us', 'loads, us'))
+    for name, payload in payloads.items():
+        data = reference.dumps(payload)
+        buffer = bytearray(data)
+        for codec in codecs:
+            dumps = timeit.timeit(lambda: codec.dumps(payload), number=iterations) / iterations
+            loads = timeit.timeit(lambda: codec.loads(memoryview(buffer)), number=iterations) / iterations
+            print('{:8} {:14} {:>10} {:>12.1f} {:>12.1f}'.format(
+                codec.name, name, len(data), dumps * 1e6, loads * 1e6))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -1,15 +1,92 @@
+import asyncio
 from decimal import Decimal
 
 from ripple_api.json_rpc import RippleRPCClient
 from ripple_api.data_api import RippleDataAPIClient
+from ripple_api.cache import ResponseCache
+from ripple_api.codec import get_codec
+from ripple_api.exceptions import RippleAPIError
+from ripple_api.export import export_records
+from ripple_api.follower import LedgerFollower
+from ripple_api.keypairs import Keypair, sign_transactions
+from ripple_api.node_pool import NodePool
+from ripple_api.pagination import is_error
+from ripple_api.transport import HTTPTransport, ResponseError
+from ripple_api.websocket import WebSocketTransport
+from ripple_api.async_api import AsyncHTTPTransport, AsyncRippleRPCClient, AsyncRippleDataAPIClient
+
+
+def _fill(tx_json: dict, info: dict, fee: dict, index: int = 0, last_ledger_offset: int = None) -> dict:
+    """
+    Fill Sequence, Fee and LastLedgerSequence of a transaction from account_info and fee responses
+    :param index: position of the transaction in a batch, sequences of a batch are consecutive
+    :param last_ledger_offset: number of ledgers after the current one the transaction stays valid for,
+    None leaves LastLedgerSequence out
+    """
+    tx_json = dict(tx_json)
+    if 'Sequence' not in tx_json:
+        tx_json['Sequence'] = info['account_data']['Sequence'] + index
+    if 'Fee' not in tx_json:
+        tx_json['Fee'] = fee['drops']['open_ledger_fee']
+    if last_ledger_offset is not None and 'LastLedgerSequence' not in tx_json:
+        current = info.get('ledger_current_index', info.get('ledger_index'))
+        tx_json['LastLedgerSequence'] = current + last_ledger_offset
+    return tx_json
+
+
+def _autofill_requests(account: str, transactions: list, last_ledger_offset: int = None) -> list:
+    """
+    Requests whose responses are needed to fill Sequence, Fee and LastLedgerSequence of transactions
+    :param account: address the transactions are sent from
+    :return: list of (method, params) tuples
+    """
+    requests = []
+    if any('Sequence' not in tx_json or (last_ledger_offset is not None and 'LastLedgerSequence' not in tx_json)
+           for tx_json in transactions):
+        requests.append(('account_info', dict(account=account, ledger_index='current')))
+    if any('Fee' not in tx_json for tx_json in transactions):
+        requests.append(('fee', {}))
+    return requests
+
+
+def _fill_batch(transactions: list, responses: dict, last_ledger_offset: int = None) -> list:
+    """
+    Fill transactions from the responses to `_autofill_requests`,
+    transactions without Sequence get consecutive sequences following the current one of the account
+    :param responses: responses keyed by method
+    """
+    filled = []
+    index = 0
+    for tx_json in transactions:
+        filled.append(_fill(tx_json, responses.get('account_info'), responses.get('fee'), index,
+                            last_ledger_offset))
+        # only transactions without Sequence take the next sequence of the account
+        index += 'Sequence' not in tx_json
+    return filled
 
 
 class Account(RippleRPCClient):
-    def __init__(self, node: str, account: str, seed: str) -> None:
-        super(Account, self).__init__(node)
+    def __init__(self, node: str, account: str, seed: str,
+                 transport: HTTPTransport = None, local_signing: bool = False,
+                 key_type: str = None, last_ledger_offset: int = 20) -> None:
+        """
+        :param node: URL of rippled node
+        :param account: address of the account
+        :param seed: secret of the account
+        :param transport: pool of keep-alive connections
+        :param local_signing: sign transactions in this process instead of calling sign method of the node
+        :param key_type: 'secp256k1' or 'ed25519', ed25519 seeds select ed25519 themselves
+        :param last_ledger_offset: locally signed transactions without LastLedgerSequence expire this many
+        ledgers after the current one, None leaves them valid until they are included in a ledger
+        """
+        super(Account, self).__init__(node, transport=transport)
         self.account = account
         self.seed = seed
+        self.local_signing = local_signing
+        self.key_type = key_type
+        self.last_ledger_offset = last_ledger_offset
         self.xrp_base = Decimal(1000000)
+        self._keypair = None
 
     def __repr__(self):
         return '<Account address={}>'.format(self.account)
@@ -25,16 +102,76 @@ class Account(RippleRPCClient):
         balance = info.get('account_data', {}).get('Balance', 0)
         return Decimal(balance) / self.xrp_base
         
-    def sign_and_submit(self, tx_json: dict, secret: str) -> dict:
+    def keypair(self, secret: str = None) -> Keypair:
+        """
+        Key pair derived from a secret, the one of the account is derived once
+        :param secret: seed, defaults to the seed of the account
+        """
+        if secret is not None and secret != self.seed:
+            return Keypair.from_seed(secret, self.key_type)
+        if self._keypair is None:
+            self._keypair = Keypair.from_seed(self.seed, self.key_type)
+        return self._keypair
+
+    def _autofill(self, account: str, transactions: list):
+        """
+        Request what is missing in transactions and fill them
+        :return: list of filled transactions, or error response of the node
         """
-        Base method that signs transaction and submits it
+        responses = {}
+        for method, params in _autofill_requests(account, transactions, self.last_ledger_offset):
+            responses[method] = getattr(self, method)(**params)
+            if is_error(responses[method]):
+                return responses[method]
+        return _fill_batch(transactions, responses, self.last_ledger_offset)
+
+    def _sign_batch(self, filled: list, secret: str = None, workers: int = None) -> list:
+        secret = self.seed if secret is None else secret
+        return sign_transactions(filled, secret, key_type=self.key_type, workers=workers)
+
+    def autofill(self, tx_json: dict) -> dict:
+        """
+        Fill Sequence, Fee and LastLedgerSequence which are missing
+        :param tx_json: transaction json
+        :return: filled transaction, or error response of the node
+        """
+        filled = self._autofill(tx_json['Account'], [tx_json])
+        return filled if isinstance(filled, dict) else filled[0]
+
+    def sign_and_submit(self, tx_json: dict, secret: str = None) -> dict:
+        """
+        Base method that signs transaction and submits it.
+        With local signing the transaction is signed in this process and only submitted to the node.
         :param tx_json: transaction json, formatted accordingly
-        :param secret: seed of the account
+        :param secret: seed of the account, defaults to the seed of the account
         :return: transaction data
         """
-        tx_info = self.sign(tx_json=tx_json, secret=secret)
-        tx_blob = tx_info.get('tx_blob')
-        return self.submit(tx_blob=tx_blob)
+        secret = self.seed if secret is None else secret
+        if not self.local_signing:
+            tx_info = self.sign(tx_json=tx_json, secret=secret)
+            tx_blob = tx_info.get('tx_blob')
+            return self.submit(tx_blob=tx_blob)
+        tx_json = self.autofill(tx_json)
+        if is_error(tx_json):
+            return tx_json
+        tx_info = self.keypair(secret).sign_transaction(tx_json)
+        return self.submit(tx_blob=tx_info['tx_blob'])
+
+    def sign_many(self, transactions, secret: str = None, workers: int = None):
+        """
+        Sign many transactions locally, large batches are spread across worker processes.
+        Transactions without Sequence get consecutive sequences following the current one of the account,
+        transactions without Fee get the open ledger fee and those without LastLedgerSequence
+        expire `last_ledger_offset` ledgers after the current one.
+        :param transactions: iterable of transaction jsons of this account
+        :param secret: seed of the account, defaults to the seed of the account
+        :param workers: number of processes, defaults to the number of CPUs
+        :return: list of tx_blob and tx_json dicts in order of transactions, or error response of the node
+        """
+        filled = self._autofill(self.account, list(transactions))
+        if isinstance(filled, dict):
+            return filled
+        return self._sign_batch(filled, secret, workers)
 
     def send_xrp(self, issuer: str, taker: str, amount: str, secret: str) -> dict:
         """
@@ -74,3 +211,87 @@ class Account(RippleRPCClient):
             TransactionType="Payment"
         )
         return self.sign_and_submit(tx_json=payment_json, secret=secret)
+
+
+class AsyncAccount(Account, AsyncRippleRPCClient):
+    """
+    asyncio version of Account, send_xrp and send_currency return awaitables as well
+    """
+    def __init__(self, node: str, account: str, seed: str,
+                 transport: AsyncHTTPTransport = None, local_signing: bool = False,
+                 key_type: str = None, last_ledger_offset: int = 20) -> None:
+        super(AsyncAccount, self).__init__(node, account, seed, transport=transport,
+                                           local_signing=local_signing, key_type=key_type,
+                                           last_ledger_offset=last_ledger_offset)
+
+    def __repr__(self):
+        return '<AsyncAccount address={}>'.format(self.account)
+
+    async def balance(self, address: str=None) -> Decimal:
+        """
+        Get balance of XRP, if address is not specified return balance of the main address
+        :param address: xrp address
+        :return: amount of XRP
+        """
+        address = self.account if address is None else address
+        info = await self.account_info(account=address)
+        balance = info.get('account_data', {}).get('Balance', 0)
+        return Decimal(balance) / self.xrp_base
+
+    async def _autofill(self, account: str, transactions: list):
+        """
+        Request what is missing in transactions and fill them
+        :return: list of filled transactions, or error response of the node
+        """
+        responses = {}
+        for method, params in _autofill_requests(account, transactions, self.last_ledger_offset):
+            responses[method] = await getattr(self, method)(**params)
+            if is_error(responses[method]):
+                return responses[method]
+        return _fill_batch(transactions, responses, self.last_ledger_offset)
+
+    async def autofill(self, tx_json: dict) -> dict:
+        """
+        Fill Sequence, Fee and LastLedgerSequence which are missing
+        :param tx_json: transaction json
+        :return: filled transaction, or error response of the node
+        """
+        filled = await self._autofill(tx_json['Account'], [tx_json])
+        return filled if isinstance(filled, dict) else filled[0]
+
+    async def sign_and_submit(self, tx_json: dict, secret: str = None) -> dict:
+        """
+        Base method that signs transaction and submits it.
+        With local signing the transaction is signed in this process and only submitted to the node.
+        :param tx_json: transaction json, formatted accordingly
+        :param secret: seed of the account, defaults to the seed of the account
+        :return: transaction data
+        """
+        secret = self.seed if secret is None else secret
+        if not self.local_signing:
+            tx_info = await self.sign(tx_json=tx_json, secret=secret)
+            tx_blob = tx_info.get('tx_blob')
+            return await self.submit(tx_blob=tx_blob)
+        tx_json = await self.autofill(tx_json)
+        if is_error(tx_json):
+            return tx_json
+        tx_info = self.keypair(secret).sign_transaction(tx_json)
+        return await self.submit(tx_blob=tx_info['tx_blob'])
+
+    async def sign_many(self, transactions, secret: str = None, workers: int = None):
+        """
+        Sign many transactions locally, large batches are spread across worker processes.
+        Transactions without Sequence get consecutive sequences following the current one of the account,
+        transactions without Fee get the open ledger fee and those without LastLedgerSequence
+        expire `last_ledger_offset` ledgers after the current one.
+        :param transactions: iterable of transaction jsons of this account
+        :param secret: seed of the account, defaults to the seed of the account
+        :param workers: number of processes, defaults to the number of CPUs
+        :return: list of tx_blob and tx_json dicts in order of transactions, or error response of the node
+        """
+        filled = await self._autofill(self.account, list(transactions))
+        if isinstance(filled, dict):
+            return filled
+        # signing is CPU bound, keep the event loop responsive
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._sign_batch, filled, secret, workers)
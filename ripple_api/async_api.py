@@ -0,0 +1,377 @@
+import asyncio
+import http.client
+import ssl
+import time
+import zlib
+from collections import deque
+from io import BytesIO
+from urllib.parse import urlsplit
+from urllib.error import HTTPError, URLError
+
+from ripple_api.codec import JSONCodec
+from ripple_api.json_rpc import RippleRPCClient
+from ripple_api.data_api import RippleDataAPIClient
+from ripple_api.transport import ACCEPT_ENCODING, BodyReader, Response, ResponseError
+
+
+class AsyncHTTPTransport(object):
+    """
+    Pool of persistent HTTP/1.1 connections driven by asyncio event loop.
+    Number of requests in flight is limited by a semaphore, connections are kept alive
+    and reused per (scheme, host, port) so thousands of requests can share a handful of sockets.
+    """
+    def __init__(self, max_concurrency: int = 100, pool_size: int = 100,
+                 idle_timeout: float = 30.0, timeout: float = 60.0,
+                 ssl_context: ssl.SSLContext = None, compression: bool = True) -> None:
+        """
+        :param max_concurrency: maximum number of requests in flight
+        :param pool_size: maximum number of idle connections kept open across all hosts
+        :param idle_timeout: seconds after which an idle connection is closed instead of reused
+        :param timeout: timeout of a single request
+        :param ssl_context: SSL context for https connections
+        :param compression: ask servers for gzip/deflate compressed responses
+        """
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.compression = compression
+        self._loop = None
+        self._semaphore = None
+        self._idle = {}
+        self._idle_count = 0
+        self._stats = dict(
+            requests=0,
+            connections_opened=0,
+            connections_reused=0,
+            connections_evicted=0,
+            bytes_sent=0,
+            bytes_received=0,
+            bytes_decoded=0,
+            decompress_time=0.0,
+        )
+
+    def __repr__(self):
+        return '<AsyncHTTPTransport max_concurrency=%r pool_size=%r>' % (
+            self.max_concurrency, self.pool_size)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Connection reuse and traffic statistics
+        :return: counters of requests made, connections opened, reused and evicted,
+        bytes sent, bytes received on the wire, bytes after decompression and seconds spent decompressing
+        """
+        stats = dict(self._stats)
+        stats['idle_connections'] = self._idle_count
+        return stats
+
+    async def request(self, method: str, url: str, body: bytes = None,
+                      headers: dict = None) -> Response:
+        """
+        Send request over a pooled connection
+        :param method: HTTP method
+        :param url: absolute URL of the resource
+        :param body: request body
+        :param headers: request headers
+        :return: response with fully read body
+        :raises HTTPError: if server responded with status code >= 400
+        :raises URLError: if connection to the server failed, ResponseError if it failed after the request was sent
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path = '{}?{}'.format(path, parts.query)
+        headers = {} if headers is None else dict(headers)
+        if self.compression:
+            headers.setdefault('Accept-Encoding', ACCEPT_ENCODING)
+        request = self._encode_request(method, parts.netloc, path, body, headers)
+        self._stats['bytes_sent'] += len(body) if body else 0
+
+        self._bind_loop()
+        async with self._semaphore:
+            try:
+                res = await asyncio.wait_for(self._send(key, request), self.timeout)
+            except asyncio.TimeoutError as err:
+                raise URLError(err)
+        if res.status >= 400:
+            raise HTTPError(url, res.status, res.reason, res.headers, BytesIO(res.body))
+        return res
+
+    def close(self) -> None:
+        """
+        Close all idle connections
+        """
+        idle, self._idle = self._idle, {}
+        self._idle_count = 0
+        for connections in idle.values():
+            for _, writer, _ in connections:
+                try:
+                    writer.close()
+                except RuntimeError:
+                    # event loop of the connection is already closed, and so is its socket
+                    pass
+
+    def _bind_loop(self) -> None:
+        """
+        Tie the semaphore and idle connections to the running event loop, they can not be used
+        from another one, so when the transport moves to a new loop (e.g. consecutive asyncio.run calls)
+        connections of the previous loop are closed
+        """
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self.close()
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _send(self, key: tuple, request: bytes, retry: bool = True) -> Response:
+        reader, writer, reused = await self._acquire(key, reuse=retry)
+        sent = False
+        try:
+            writer.write(request)
+            await writer.drain()
+            sent = True
+            status_line = await reader.readline()
+        except OSError as err:
+            status_line, error = b'', err
+        except ValueError as err:
+            # status line longer than the stream limit
+            writer.close()
+            raise ResponseError(err)
+        except asyncio.CancelledError:
+            writer.close()
+            raise
+        else:
+            error = http.client.RemoteDisconnected('Remote end closed connection without response')
+        if not status_line:
+            writer.close()
+            if reused and retry:
+                # keep-alive connection was closed by the server while idle and nothing
+                # was answered on it, send the request once more on a fresh connection
+                return await self._send(key, request, retry=False)
+            raise ResponseError(error) if sent else URLError(error)
+        try:
+            res, will_close = await self._read_response(reader, status_line)
+            body = BodyReader(BytesIO(res.body), res.headers.get('Content-Encoding'), self._count).read()
+            res = res._replace(body=body)
+        except (http.client.HTTPException, asyncio.IncompleteReadError, OSError, ValueError,
+                zlib.error) as err:
+            # the server may have processed the request already, it is never resent
+            # as that could e.g. submit a transaction twice
+            writer.close()
+            raise ResponseError(err)
+        except asyncio.CancelledError:
+            writer.close()
+            raise
+        self._stats['requests'] += 1
+        if will_close:
+            writer.close()
+        else:
+            self._release(key, reader, writer)
+        return res
+
+    async def _acquire(self, key: tuple, reuse: bool = True) -> tuple:
+        now = time.monotonic()
+        connections = self._idle.get(key) if reuse else None
+        while connections:
+            reader, writer, last_used = connections.pop()
+            self._idle_count -= 1
+            if now - last_used > self.idle_timeout or reader.at_eof():
+                writer.close()
+                self._stats['connections_evicted'] += 1
+                continue
+            self._stats['connections_reused'] += 1
+            return reader, writer, True
+        scheme, host, port = key
+        context = None
+        if scheme == 'https':
+            context = self.ssl_context or ssl.create_default_context()
+        port = port or (443 if scheme == 'https' else 80)
+        try:
+            reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        except OSError as err:
+            raise URLError(err)
+        self._stats['connections_opened'] += 1
+        return reader, writer, False
+
+    def _count(self, received: int, decoded: int, elapsed: float) -> None:
+        self._stats['bytes_received'] += received
+        self._stats['bytes_decoded'] += decoded
+        self._stats['decompress_time'] += elapsed
+
+    def _release(self, key: tuple, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter) -> None:
+        if self._idle_count < self.pool_size:
+            self._idle.setdefault(key, deque()).append((reader, writer, time.monotonic()))
+            self._idle_count += 1
+            return
+        self._stats['connections_evicted'] += 1
+        writer.close()
+
+    @staticmethod
+    def _encode_request(method: str, host: str, path: str, body: bytes,
+                        headers: dict) -> bytes:
+        lines = ['{} {} HTTP/1.1'.format(method, path), 'Host: {}'.format(host)]
+        lines.extend('{}: {}'.format(name, value) for name, value in headers.items())
+        lines.append('Content-Length: {}'.format(len(body) if body else 0))
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        return head + body if body else head
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, status_line: bytes) -> tuple:
+        version, status, *reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        if not version.startswith('HTTP/'):
+            raise http.client.BadStatusLine(status_line)
+        raw_headers = b''
+        while True:
+            line = await reader.readline()
+            raw_headers += line
+            if line in (b'\r\n', b'\n', b''):
+                break
+        headers = http.client.parse_headers(BytesIO(raw_headers))
+
+        will_close = version == 'HTTP/1.0' or headers.get('Connection', '').lower() == 'close'
+        if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # the last chunk may be followed by trailer fields up to an empty line
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b''.join(chunks)
+        elif headers.get('Content-Length') is not None:
+            body = await reader.readexactly(int(headers['Content-Length']))
+        else:
+            body = await reader.read()
+            will_close = True
+        return Response(int(status), reason[0] if reason else '', headers, body), will_close
+
+
+def _sync_only(name: str):
+    """
+    Replacement of a helper of the synchronous clients which drives requests itself
+    (iterators, batches, background workers) and therefore can not work with awaitable results
+    :param name: name of the method
+    """
+    def method(self, *args, **kwargs):
+        raise TypeError('{}.{} is not supported, use the synchronous client'.format(
+            type(self).__name__, name))
+    method.__name__ = name
+    return method
+
+
+def _single_node(node) -> None:
+    """
+    Check that node of an asyncio client is URL of a single HTTP(S) server
+    """
+    if not isinstance(node, str):
+        raise TypeError('asyncio clients accept URL of a single node, got {!r}, '
+                        'node pools are only supported by the synchronous clients'.format(node))
+    if node.startswith(('ws://', 'wss://')):
+        raise ValueError('asyncio clients accept HTTP(S) URLs only, got {!r}'.format(node))
+
+
+class AsyncRippleRPCClient(RippleRPCClient):
+    """
+    asyncio version of RippleRPCClient, every method returns awaitable with the same result.
+    Helpers driving many requests themselves (iter_* paginators, batch, stream, order_book etc.)
+    are not supported and raise TypeError, gather the awaitables of plain methods instead.
+    """
+    def __init__(self, node: str, username: str = None, password: str = None,
+                 transport: AsyncHTTPTransport = None, codec: JSONCodec = None):
+        """
+        :param node: URL of rippled node
+        :param username: username of admin in rippled node
+        :param password: password of admin in rippled node
+        :param transport: asyncio pool of keep-alive connections, can be shared between clients
+        :param codec: JSON encoder/decoder of requests and responses, defaults to the fastest installed one
+        """
+        _single_node(node)
+        transport = AsyncHTTPTransport() if transport is None else transport
+        super(AsyncRippleRPCClient, self).__init__(
+            node, username=username, password=password, transport=transport, codec=codec)
+
+    def __repr__(self):
+        return '<AsyncRippleRPCClient node=%r>' % self.node
+
+    batch = _sync_only('batch')
+    stream = _sync_only('stream')
+    account_info_many = _sync_only('account_info_many')
+    iter_account_lines = _sync_only('iter_account_lines')
+    iter_account_objects = _sync_only('iter_account_objects')
+    iter_account_offers = _sync_only('iter_account_offers')
+    iter_account_tx = _sync_only('iter_account_tx')
+    backfill_account_tx = _sync_only('backfill_account_tx')
+    follow_ledgers = _sync_only('follow_ledgers')
+    iter_ledger_data = _sync_only('iter_ledger_data')
+    dump_ledger_state = _sync_only('dump_ledger_state')
+    iter_book_offers = _sync_only('iter_book_offers')
+    order_book = _sync_only('order_book')
+
+    async def _call(self, method: str, params: dict) -> dict:
+        """Base method which sends requests to node
+        :param method: JSON-RPC method of rippled
+        :param params: parameters of the request
+        """
+        payload = self._payload(method, params)
+        try:
+            res = await self.transport.request('POST', self.node, body=payload,
+                                               headers=self.request_headers)
+            return self._result(res.status, self.codec.loads(res.body))
+        except (HTTPError, URLError) as err:
+            return self._error(err)
+
+
+class AsyncRippleDataAPIClient(RippleDataAPIClient):
+    """
+    asyncio version of RippleDataAPIClient, every method returns awaitable with the same result.
+    Helpers driving many requests themselves (stream, paginate, iter_*, fetch_* and exchange_series)
+    are not supported and raise TypeError.
+    """
+    def __init__(self, node: str = 'https://data.ripple.com',
+                 transport: AsyncHTTPTransport = None, codec: JSONCodec = None):
+        """
+        :param node: URL of Data API server
+        :param transport: asyncio pool of keep-alive connections, can be shared between clients
+        :param codec: JSON decoder of responses, defaults to the fastest installed one
+        """
+        _single_node(node)
+        transport = AsyncHTTPTransport() if transport is None else transport
+        super(AsyncRippleDataAPIClient, self).__init__(node, transport=transport, codec=codec)
+
+    def __repr__(self):
+        return '<AsyncRippleDataAPIClient node=%r>' % self.node
+
+    stream = _sync_only('stream')
+    paginate = _sync_only('paginate')
+    fetch_range = _sync_only('fetch_range')
+    iter_transactions = _sync_only('iter_transactions')
+    fetch_transactions = _sync_only('fetch_transactions')
+    iter_payments = _sync_only('iter_payments')
+    fetch_payments = _sync_only('fetch_payments')
+    iter_exchanges = _sync_only('iter_exchanges')
+    fetch_exchanges = _sync_only('fetch_exchanges')
+    exchange_series = _sync_only('exchange_series')
+    iter_account_transaction_history = _sync_only('iter_account_transaction_history')
+    iter_account_balance_changes = _sync_only('iter_account_balance_changes')
+
+    async def _call(self, url_params: tuple, params: dict) -> dict:
+        """
+        Send request to data API
+        :param url_params: url parameters which are forming endpoint
+        :param params: query params
+        :return: response dict
+        """
+        url = self._url(url_params, params)
+        try:
+            res = await self.transport.request('GET', url)
+            return self.codec.loads(res.body)
+        except (HTTPError, URLError) as err:
+            return {"status": "error", "msg": err}
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ripple_api import binary_codec
+from ripple_api.ledger_dump import resolve_ledger_index
+from ripple_api.pagination import Paginator
+
+
+def transaction_position(item: dict) -> tuple:
+    """
+    Position of an account_tx entry in the ledger history, metadata of binary entries is decoded
+    up to TransactionIndex
+    :return: (ledger index, index of the transaction in its ledger)
+    """
+    tx = item.get('tx') or {}
+    meta = item.get('meta')
+    ledger_index = item.get('ledger_index', tx.get('ledger_index', 0))
+    if isinstance(meta, dict):
+        position = meta.get('TransactionIndex', 0)
+    elif meta:
+        position = binary_codec.decode_field(meta, 'TransactionIndex') or 0
+    else:
+        position = 0
+    return int(ledger_index), position
+
+
+def transaction_hash(item: dict) -> str:
+    """
+    Hash of an account_tx entry, computed from the blob of binary entries
+    """
+    tx = item.get('tx')
+    if isinstance(tx, dict) and 'hash' in tx:
+        return tx['hash']
+    blob = bytes.fromhex(item['tx_blob'])
+    # transaction ID is SHA-512Half of the blob with 'TXN\0' prefix
+    return hashlib.sha512(b'TXN\x00' + blob).digest()[:32].hex().upper()
+
+
+class AccountTxBackfill(object):
+    """
+    Downloads the transaction history of an account in a ledger range.
+    The range is split into windows of `window` ledgers, up to `workers` windows are downloaded concurrently
+    and transactions are yielded strictly ordered by ledger and position in the ledger,
+    without duplicates. Windows are handed over page by page, each of them buffers at most `buffer` pages
+    ahead of the consumer. With `checkpoint` the start of the first unfinished window is saved
+    to a JSON file and an interrupted backfill resumes from it; transactions of that window may be yielded again.
+    """
+    def __init__(self, client, account: str, ledger_index_min: int, ledger_index_max=None,
+                 window: int = 10000, workers: int = 4, checkpoint: str = None,
+                 forward: bool = True, binary: bool = False, limit: int = 200, buffer: int = 2) -> None:
+        """
+        :param client: RippleRPCClient sending the requests
+        :param account: address of the account
+        :param ledger_index_min: first ledger of the range
+        :param ledger_index_max: last ledger of the range, latest validated ledger if not specified
+        :param window: number of ledgers in a window
+        :param workers: number of windows downloaded concurrently
+        :param checkpoint: path of the checkpoint file
+        :param forward: yield oldest transactions first
+        :param binary: request transactions as hex blobs
+        :param limit: number of transactions per page
+        :param buffer: number of pages a window downloads ahead of the consumer
+        """
+        self.client = client
+        self.account = account
+        self.ledger_index_min = ledger_index_min
+        self.ledger_index_max = ledger_index_max
+        self.window = window
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.forward = forward
+        self.binary = binary
+        self.limit = limit
+        self.buffer = buffer
+        self._stats = dict(windows=0, transactions=0, duplicates=0)
+
+    def __repr__(self):
+        return '<AccountTxBackfill account=%r ledgers=%r-%r>' % (
+            self.account, self.ledger_index_min, self.ledger_index_max)
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: number of finished windows, transactions yielded and duplicates dropped
+        """
+        return dict(self._stats)
+
+    def windows(self, start: int = None) -> list:
+        """
+        Ledger windows in the order of output
+        :param start: ledger to start from, first ledger of the range in direction of output if not specified
+        :return: list of (ledger_index_min, ledger_index_max)
+        """
+        low, high = self.ledger_index_min, self.ledger_index_max
+        if self.forward:
+            low = low if start is None else start
+            return [(first, min(first + self.window - 1, high)) for first in range(low, high + 1, self.window)]
+        high = high if start is None else start
+        return [(max(last - self.window + 1, low), last) for last in range(high, low - 1, -self.window)]
+
+    def __iter__(self):
+        if self.ledger_index_max is None:
+            self.ledger_index_max = resolve_ledger_index(self.client, 'validated')
+        windows = deque(self.windows(self._load()))
+        last_position = None
+        last_hashes = set()
+        stop = threading.Event()
+        with ThreadPoolExecutor(self.workers, thread_name_prefix='ripple-backfill') as executor:
+            in_flight = deque()
+            try:
+                while windows or in_flight:
+                    while windows and len(in_flight) < self.workers:
+                        bounds = windows.popleft()
+                        pages = queue.Queue(self.buffer)
+                        executor.submit(self._fetch, bounds, pages, stop)
+                        in_flight.append((bounds, pages))
+                    bounds, pages = in_flight.popleft()
+                    for item in self._items(pages):
+                        position = transaction_position(item)
+                        tx_hash = transaction_hash(item)
+                        if last_position is not None and (
+                                position < last_position if self.forward else position > last_position):
+                            self._stats['duplicates'] += 1
+                            continue
+                        if position != last_position:
+                            last_position, last_hashes = position, set()
+                        elif tx_hash in last_hashes:
+                            self._stats['duplicates'] += 1
+                            continue
+                        last_hashes.add(tx_hash)
+                        self._stats['transactions'] += 1
+                        yield item
+                    self._stats['windows'] += 1
+                    self._save(bounds[1] + 1 if self.forward else bounds[0] - 1)
+            finally:
+                # workers blocked on full buffers give up, the executor waits for them on exit
+                stop.set()
+
+    @staticmethod
+    def _items(pages: queue.Queue):
+        while True:
+            page = pages.get()
+            if page is None:
+                return
+            if isinstance(page, Exception):
+                raise page
+            yield from page
+
+    def _fetch(self, bounds: tuple, pages: queue.Queue, stop: threading.Event) -> None:
+        """
+        Download a window page by page into its buffer, followed by None once it is complete,
+        or by the exception which stopped it
+        """
+        ledger_index_min, ledger_index_max = bounds
+        params = dict(
+            account=self.account,
+            binary=self.binary,
+            forward=self.forward,
+            ledger_index_max=ledger_index_max,
+            ledger_index_min=ledger_index_min,
+            limit=self.limit
+        )
+        try:
+            for page in Paginator(self.client, 'account_tx', params, prefetch=False).pages():
+                # account_tx returns transactions in the requested order, pages only need to be
+                # sorted within themselves
+                items = sorted(page.get('transactions', ()), key=transaction_position, reverse=not self.forward)
+                if not self._put(pages, items, stop):
+                    return
+        except Exception as err:
+            self._put(pages, err, stop)
+            return
+        self._put(pages, None, stop)
+
+    @staticmethod
+    def _put(pages: queue.Queue, item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _load(self) -> int:
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return None
+        with open(self.checkpoint) as fp:
+            state = json.load(fp)
+        if (state.get('account'), state.get('forward'), state.get('ledger_index_min')) != \
+                (self.account, self.forward, self.ledger_index_min):
+            return None
+        return state['next']
+
+    def _save(self, next_ledger: int) -> None:
+        if self.checkpoint is None:
+            return
+        state = dict(account=self.account, forward=self.forward, ledger_index_min=self.ledger_index_min,
+                     next=next_ledger)
+        temp = self.checkpoint + '.tmp'
+        with open(temp, 'w') as fp:
+            json.dump(state, fp)
+        os.replace(temp, self.checkpoint)
@@ -0,0 +1,84 @@
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+
+class Batch(object):
+    """
+    Dispatches client calls concurrently: every method of the client called on the batch
+    is submitted to a pool of `max_in_flight` workers and returns a future of its result.
+    Leaving the `with` block waits for all submitted calls to finish.
+
+        with rpc.batch(max_in_flight=32) as batch:
+            futures = [batch.account_info(address) for address in addresses]
+        infos = [future.result() for future in futures]
+    """
+    def __init__(self, client, max_in_flight: int = 10) -> None:
+        """
+        :param client: RippleRPCClient whose methods are called
+        :param max_in_flight: maximum number of requests sent at once
+        """
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.futures = []
+        self._executor = ThreadPoolExecutor(max_in_flight, thread_name_prefix='ripple-batch')
+
+    def __repr__(self):
+        return '<Batch max_in_flight=%r calls=%r>' % (self.max_in_flight, len(self.futures))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+        if name.startswith('_') or not callable(method):
+            raise AttributeError('{!r} is not a method of the client'.format(name))
+
+        def submit(*args, **kwargs) -> Future:
+            return self.submit(method, *args, **kwargs)
+        submit.__name__ = name
+        submit.__doc__ = method.__doc__
+        return submit
+
+    def call(self, method: str, params: dict) -> Future:
+        """
+        Submit raw JSON-RPC call
+        :param method: JSON-RPC method of rippled
+        :param params: parameters of the request
+        :return: future of the response
+        """
+        return self.submit(self.client._call, method, params)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Submit fn(*args, **kwargs) to the workers of the batch
+        :return: future of the result
+        """
+        future = self._executor.submit(fn, *args, **kwargs)
+        self.futures.append(future)
+        return future
+
+    def results(self, timeout: float = None) -> list:
+        """
+        Wait for all submitted calls
+        :param timeout: seconds to wait for all of them
+        :return: responses in submission order
+        """
+        futures = list(self.futures)
+        for _ in as_completed(futures, timeout):
+            pass
+        return [future.result() for future in futures]
+
+    def as_completed(self, timeout: float = None):
+        """
+        Iterate over futures of submitted calls as they complete
+        :param timeout: seconds to wait for all of them
+        """
+        return as_completed(list(self.futures), timeout)
+
+    def close(self) -> None:
+        """
+        Wait for submitted calls and stop the workers
+        """
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,562 @@
+"""
+Canonical binary serialization of XRPL transactions and ledger objects.
+Field definitions are read from definitions.json of rippled shipped with the package,
+fields are ordered by type code and field code.
+"""
+import json
+import pkgutil
+import struct
+from collections import namedtuple
+from decimal import Decimal
+
+from ripple_api.utils import decode_account_id, encode_account_id
+
+# prefix of the data signed by a single signer, 'STX\0'
+SIGNING_PREFIX = b'\x53\x54\x58\x00'
+
+OBJECT_END = b'\xe1'
+ARRAY_END = b'\xf1'
+
+# fields, types and enums as published by rippled (the output of its server_definitions method),
+# updating the file is enough to support fields of new amendments which use known types
+_DEFINITIONS = json.loads(pkgutil.get_data('ripple_api', 'definitions.json').decode('utf-8'))
+
+# serialized types, codes >= 10000 wrap whole objects and are never part of a blob
+TYPES = {name: code for name, code in _DEFINITIONS['TYPES'].items() if 0 < code < 10000}
+
+# types the encoder and decoder handle, fields of other types are left out of the tables
+_SUPPORTED_TYPES = frozenset((
+    'UInt8', 'UInt16', 'UInt32', 'UInt64', 'Int32', 'Hash128', 'Hash160', 'Hash192', 'Hash256', 'Amount',
+    'Blob', 'AccountID', 'STObject', 'STArray', 'PathSet', 'Vector256', 'Currency', 'Issue', 'Number',
+    'XChainBridge',
+))
+
+TRANSACTION_TYPES = {name: code for name, code in _DEFINITIONS['TRANSACTION_TYPES'].items() if code >= 0}
+LEDGER_ENTRY_TYPES = {name: code for name, code in _DEFINITIONS['LEDGER_ENTRY_TYPES'].items() if code >= 0}
+TRANSACTION_RESULTS = dict(_DEFINITIONS['TRANSACTION_RESULTS'])
+
+_ENUMS = dict(TransactionType=TRANSACTION_TYPES, LedgerEntryType=LEDGER_ENTRY_TYPES,
+              TransactionResult=TRANSACTION_RESULTS)
+_ENUM_NAMES = {field: {code: name for name, code in values.items()} for field, values in _ENUMS.items()}
+
+Field = namedtuple('Field', ('name', 'type', 'code', 'header', 'ordinal', 'vl', 'signing'))
+
+
+def field_header(type_code: int, field_code: int) -> bytes:
+    """
+    Field ID: type and field codes packed into one, two or three bytes
+    """
+    if type_code < 16:
+        if field_code < 16:
+            return bytes((type_code << 4 | field_code, ))
+        return bytes((type_code << 4, field_code))
+    if field_code < 16:
+        return bytes((field_code, type_code))
+    return bytes((0, type_code, field_code))
+
+
+def _fields() -> dict:
+    fields = {}
+    for name, info in _DEFINITIONS['FIELDS']:
+        type_name, code = info['type'], info['nth']
+        if not info['isSerialized'] or type_name not in _SUPPORTED_TYPES:
+            continue
+        type_code = TYPES[type_name]
+        fields[name] = Field(name, type_name, code, field_header(type_code, code),
+                             type_code << 16 | code, info['isVLEncoded'], info['isSigningField'])
+    return fields
+
+
+# precomputed tables: fields by name, by field ID, and canonical order of field names
+FIELDS = _fields()
+FIELDS_BY_HEADER = {field.header: field for field in FIELDS.values()}
+FIELD_ORDER = {name: index for index, name in enumerate(sorted(FIELDS, key=lambda name: FIELDS[name].ordinal))}
+
+
+def length_prefix(length: int) -> bytes:
+    """
+    Length prefix of a variable length field
+    """
+    if length <= 192:
+        return bytes((length, ))
+    if length <= 12480:
+        length -= 193
+        return bytes((193 + (length >> 8), length & 0xff))
+    if length <= 918744:
+        length -= 12481
+        return bytes((241 + (length >> 16), (length >> 8) & 0xff, length & 0xff))
+    raise ValueError('Variable length field is too long: {}'.format(length))
+
+
+# amounts
+
+_MIN_MANTISSA = 10 ** 15
+_MAX_MANTISSA = 10 ** 16 - 1
+_MIN_EXPONENT = -96
+_MAX_EXPONENT = 80
+_NOT_XRP = 0x8000000000000000
+_POSITIVE = 0x4000000000000000
+# first byte of a multi-purpose token amount: not XRP nor IOU, positive, MPT
+_MPT = 0x60
+_ZERO_CURRENCY = bytes(20)
+
+
+def encode_currency(currency: str) -> bytes:
+    """
+    160-bit currency code, from ISO-like code of three characters or 40 hex digits
+    """
+    if len(currency) == 40:
+        return bytes.fromhex(currency)
+    if currency == 'XRP':
+        return _ZERO_CURRENCY
+    if len(currency) != 3:
+        raise ValueError('Invalid currency code: {!r}'.format(currency))
+    return bytes(12) + currency.encode('ascii') + bytes(5)
+
+
+def decode_currency(data: bytes) -> str:
+    if data == _ZERO_CURRENCY:
+        return 'XRP'
+    if data[:12] == bytes(12) and data[15:] == bytes(5):
+        return data[12:15].decode('ascii')
+    return data.hex().upper()
+
+
+def encode_amount(amount) -> bytes:
+    """
+    XRP amount in drops as 64-bit integer, issued currency amount as 64-bit
+    mantissa and exponent followed by currency and issuer, token amount as 64-bit integer
+    followed by the issuance ID
+    """
+    if not isinstance(amount, dict):
+        drops = int(amount)
+        return struct.pack('>Q', abs(drops) | (_POSITIVE if drops >= 0 else 0))
+    if 'mpt_issuance_id' in amount:
+        return struct.pack('>BQ', _MPT, int(amount['value'])) + _hash(amount['mpt_issuance_id'], 24)
+    value = amount['value']
+    if isinstance(value, bool) or not isinstance(value, (str, int, float, Decimal)):
+        raise ValueError('Amount value must be a string or a number: {!r}'.format(value))
+    # floats are converted through their shortest repr, so 0.1 is encoded as 0.1 rather than its binary expansion
+    value = Decimal(str(value))
+    tail = encode_currency(amount['currency']) + decode_account_id(amount['issuer'])
+    if value == 0:
+        return struct.pack('>Q', _NOT_XRP) + tail
+    sign, digits, exponent = value.as_tuple()
+    mantissa = int(''.join(map(str, digits)))
+    while mantissa < _MIN_MANTISSA:
+        mantissa *= 10
+        exponent -= 1
+    while mantissa > _MAX_MANTISSA:
+        if mantissa % 10:
+            raise ValueError('Amount has more than 16 significant digits: {}'.format(amount['value']))
+        mantissa //= 10
+        exponent += 1
+    if not _MIN_EXPONENT <= exponent <= _MAX_EXPONENT:
+        raise ValueError('Amount is out of range: {}'.format(amount['value']))
+    bits = _NOT_XRP | (0 if sign else _POSITIVE) | (exponent + 97) << 54 | mantissa
+    return struct.pack('>Q', bits) + tail
+
+
+def _decode_amount(data: bytes, pos: int) -> tuple:
+    if data[pos] & 0xa0 == 0x20:
+        value, = struct.unpack_from('>Q', data, pos + 1)
+        sign = '' if data[pos] & 0x40 else '-'
+        return dict(value=sign + str(value), mpt_issuance_id=data[pos + 9:pos + 33].hex().upper()), pos + 33
+    bits, = struct.unpack_from('>Q', data, pos)
+    if not bits & _NOT_XRP:
+        drops = bits & ~_POSITIVE
+        return str(drops if bits & _POSITIVE else -drops), pos + 8
+    mantissa = bits & ((1 << 54) - 1)
+    if mantissa:
+        value = Decimal(mantissa).scaleb(((bits >> 54) & 0xff) - 97)
+        text = format(value.normalize(), 'f')
+        if not bits & _POSITIVE:
+            text = '-' + text
+    else:
+        text = '0'
+    amount = dict(currency=decode_currency(data[pos + 8:pos + 28]),
+                  issuer=encode_account_id(data[pos + 28:pos + 48]),
+                  value=text)
+    return amount, pos + 48
+
+
+# issues
+
+# stands in for the currency of a token issue, it is followed by the sequence of the issuance
+_NO_ACCOUNT = bytes(19) + b'\x01'
+
+
+def _encode_issue(issue: dict) -> bytes:
+    if 'mpt_issuance_id' in issue:
+        issuance = _hash(issue['mpt_issuance_id'], 24)
+        # rippled writes the sequence, the first four bytes of the issuance ID, in reverse order
+        return issuance[4:] + _NO_ACCOUNT + issuance[3::-1]
+    currency = encode_currency(issue['currency'])
+    if currency == _ZERO_CURRENCY:
+        return currency
+    return currency + decode_account_id(issue['issuer'])
+
+
+def _decode_issue(data: bytes, pos: int) -> tuple:
+    currency = data[pos:pos + 20]
+    if currency == _ZERO_CURRENCY:
+        return dict(currency='XRP'), pos + 20
+    account = data[pos + 20:pos + 40]
+    if account == _NO_ACCOUNT:
+        return dict(mpt_issuance_id=(data[pos + 43:pos + 39:-1] + currency).hex().upper()), pos + 44
+    return dict(currency=decode_currency(currency), issuer=encode_account_id(account)), pos + 40
+
+
+_BRIDGE_FIELDS = (('LockingChainDoor', 'AccountID'), ('LockingChainIssue', 'Issue'),
+                  ('IssuingChainDoor', 'AccountID'), ('IssuingChainIssue', 'Issue'))
+
+
+# numbers: 64-bit signed mantissa and 32-bit exponent, the mantissa of non-zero numbers is normalized
+# to the range of 19 digit integers
+
+_NUMBER_MIN_MANTISSA = 10 ** 18
+_NUMBER_MAX_MANTISSA = 2 ** 63 - 1
+_NUMBER_ZERO_EXPONENT = -2 ** 31
+
+
+def _encode_number(value) -> bytes:
+    if isinstance(value, bool) or not isinstance(value, (str, int, float, Decimal)):
+        raise ValueError('Number must be a string or a number: {!r}'.format(value))
+    value = Decimal(str(value))
+    if value == 0:
+        return struct.pack('>qi', 0, _NUMBER_ZERO_EXPONENT)
+    sign, digits, exponent = value.as_tuple()
+    mantissa = int(''.join(map(str, digits)))
+    while mantissa < _NUMBER_MIN_MANTISSA:
+        mantissa *= 10
+        exponent -= 1
+    while mantissa > _NUMBER_MAX_MANTISSA:
+        # rounds half up on the last dropped digit, as rippled does
+        mantissa, digit = divmod(mantissa, 10)
+        exponent += 1
+        if mantissa <= _NUMBER_MAX_MANTISSA and digit >= 5:
+            mantissa += 1
+    return struct.pack('>qi', -mantissa if sign else mantissa, exponent)
+
+
+def _decode_number(data: bytes, pos: int) -> tuple:
+    mantissa, exponent = struct.unpack_from('>qi', data, pos)
+    if mantissa == 0:
+        return '0', pos + 12
+    value = Decimal(mantissa).scaleb(exponent).normalize()
+    if -20 <= value.adjusted() <= 20:
+        return format(value, 'f'), pos + 12
+    sign, digits, exponent = value.as_tuple()
+    return '{}{}e{}'.format('-' if sign else '', ''.join(map(str, digits)), exponent), pos + 12
+
+
+# paths
+
+_PATH_ACCOUNT = 0x01
+_PATH_CURRENCY = 0x10
+_PATH_ISSUER = 0x20
+_PATH_SEPARATOR = 0xff
+_PATHSET_END = 0x00
+
+
+def _encode_paths(paths: list) -> bytes:
+    out = bytearray()
+    for index, path in enumerate(paths):
+        if index:
+            out.append(_PATH_SEPARATOR)
+        for step in path:
+            kind = 0
+            data = b''
+            if 'account' in step:
+                kind |= _PATH_ACCOUNT
+                data += decode_account_id(step['account'])
+            if 'currency' in step:
+                kind |= _PATH_CURRENCY
+                data += encode_currency(step['currency'])
+            if 'issuer' in step:
+                kind |= _PATH_ISSUER
+                data += decode_account_id(step['issuer'])
+            out.append(kind)
+            out += data
+    out.append(_PATHSET_END)
+    return bytes(out)
+
+
+def _decode_paths(data: bytes, pos: int) -> tuple:
+    paths = [[]]
+    while True:
+        kind = data[pos]
+        pos += 1
+        if kind == _PATHSET_END:
+            return paths, pos
+        if kind == _PATH_SEPARATOR:
+            paths.append([])
+            continue
+        step = {}
+        if kind & _PATH_ACCOUNT:
+            step['account'] = encode_account_id(data[pos:pos + 20])
+            pos += 20
+        if kind & _PATH_CURRENCY:
+            step['currency'] = decode_currency(data[pos:pos + 20])
+            pos += 20
+        if kind & _PATH_ISSUER:
+            step['issuer'] = encode_account_id(data[pos:pos + 20])
+            pos += 20
+        paths[-1].append(step)
+
+
+# encoding
+
+_INTEGERS = dict(UInt8='>B', UInt16='>H', UInt32='>I', Int32='>i')
+_HASH_SIZE = {name: int(name[4:]) // 8 for name in TYPES if name.startswith('Hash')}
+# UInt64 fields holding token amounts are written in base 10 rather than hex in JSON
+_DECIMAL_UINT64 = frozenset(('MaximumAmount', 'OutstandingAmount', 'MPTAmount', 'LockedAmount'))
+
+
+def _hash(value: str, size: int, name: str = 'Hash') -> bytes:
+    data = bytes.fromhex(value)
+    if len(data) != size:
+        raise ValueError('{} must be {} bytes long'.format(name, size))
+    return data
+
+
+def _sorted_fields(obj: dict, signing: bool) -> list:
+    fields = []
+    for name, value in obj.items():
+        field = FIELDS.get(name)
+        if field is None:
+            # API metadata such as hash, date or ledger_index is not part of the object
+            if name[:1].islower():
+                continue
+            raise ValueError('Unknown field: {!r}'.format(name))
+        if signing and not field.signing:
+            continue
+        fields.append((field.ordinal, field, value))
+    fields.sort(key=lambda item: item[0])
+    return fields
+
+
+def _encode_object(obj: dict, out: bytearray, signing: bool) -> None:
+    for _, field, value in _sorted_fields(obj, signing):
+        out += field.header
+        _encode_value(field, value, out, signing)
+
+
+def _encode_value(field: Field, value, out: bytearray, signing: bool) -> None:
+    kind = field.type
+    if kind in _INTEGERS:
+        if isinstance(value, str):
+            value = _ENUMS[field.name][value]
+        out += struct.pack(_INTEGERS[kind], value)
+    elif kind == 'UInt64':
+        if isinstance(value, str) and field.name in _DECIMAL_UINT64:
+            value = int(value)
+        out += bytes.fromhex(value.rjust(16, '0')) if isinstance(value, str) else struct.pack('>Q', value)
+    elif kind in _HASH_SIZE:
+        out += _hash(value, _HASH_SIZE[kind], field.name)
+    elif kind == 'Currency':
+        out += encode_currency(value)
+    elif kind == 'Issue':
+        out += _encode_issue(value)
+    elif kind == 'Number':
+        out += _encode_number(value)
+    elif kind == 'XChainBridge':
+        for name, part in _BRIDGE_FIELDS:
+            if part == 'AccountID':
+                out += length_prefix(20) + decode_account_id(value[name])
+            else:
+                out += _encode_issue(value[name])
+    elif kind == 'Amount':
+        out += encode_amount(value)
+    elif kind == 'Blob':
+        data = bytes.fromhex(value)
+        out += length_prefix(len(data)) + data
+    elif kind == 'AccountID':
+        out += length_prefix(20) + decode_account_id(value)
+    elif kind == 'Vector256':
+        data = b''.join(bytes.fromhex(item) for item in value)
+        out += length_prefix(len(data)) + data
+    elif kind == 'PathSet':
+        out += _encode_paths(value)
+    elif kind == 'STObject':
+        _encode_object(value, out, signing)
+        out += OBJECT_END
+    elif kind == 'STArray':
+        for item in value:
+            (name, inner), = item.items()
+            out += FIELDS[name].header
+            _encode_object(inner, out, signing)
+            out += OBJECT_END
+        out += ARRAY_END
+    else:
+        raise ValueError('Unsupported type {} of {}'.format(kind, field.name))
+
+
+def encode(obj: dict, signing: bool = False) -> bytes:
+    """
+    Serialize transaction or ledger object to canonical binary format
+    :param obj: transaction JSON (tx_json) or ledger object
+    :param signing: leave out signature fields, as in the data which is signed
+    :return: serialized object
+    """
+    out = bytearray()
+    _encode_object(obj, out, signing)
+    return bytes(out)
+
+
+def encode_hex(obj: dict, signing: bool = False) -> str:
+    """
+    Serialize transaction or ledger object to upper case hex, e.g. tx_blob accepted by submit
+    """
+    return encode(obj, signing).hex().upper()
+
+
+def encode_for_signing(tx_json: dict) -> bytes:
+    """
+    Data signed by a single signer: prefix followed by transaction without signature fields
+    """
+    return SIGNING_PREFIX + encode(tx_json, signing=True)
+
+
+# decoding
+
+def _read_length(data: bytes, pos: int) -> tuple:
+    first = data[pos]
+    if first <= 192:
+        return first, pos + 1
+    if first <= 240:
+        return 193 + (first - 193) * 256 + data[pos + 1], pos + 2
+    return 12481 + (first - 241) * 65536 + data[pos + 1] * 256 + data[pos + 2], pos + 3
+
+
+def _read_field(data: bytes, pos: int) -> tuple:
+    first = data[pos]
+    type_code, field_code = first >> 4, first & 0x0f
+    size = 1
+    if not type_code:
+        type_code = data[pos + size]
+        size += 1
+    if not field_code:
+        field_code = data[pos + size]
+        size += 1
+    field = FIELDS_BY_HEADER.get(field_header(type_code, field_code))
+    if field is None:
+        raise ValueError('Unknown field type {} code {} at offset {}'.format(type_code, field_code, pos))
+    return field, pos + size
+
+
+def _decode_value(field: Field, data: bytes, pos: int) -> tuple:
+    kind = field.type
+    if kind in _INTEGERS:
+        value, = struct.unpack_from(_INTEGERS[kind], data, pos)
+        names = _ENUM_NAMES.get(field.name)
+        if names is not None:
+            value = names.get(value, value)
+        return value, pos + struct.calcsize(_INTEGERS[kind])
+    if kind == 'UInt64':
+        if field.name in _DECIMAL_UINT64:
+            return str(struct.unpack_from('>Q', data, pos)[0]), pos + 8
+        return data[pos:pos + 8].hex().upper(), pos + 8
+    if kind in _HASH_SIZE:
+        size = _HASH_SIZE[kind]
+        return data[pos:pos + size].hex().upper(), pos + size
+    if kind == 'Currency':
+        return decode_currency(data[pos:pos + 20]), pos + 20
+    if kind == 'Issue':
+        return _decode_issue(data, pos)
+    if kind == 'Number':
+        return _decode_number(data, pos)
+    if kind == 'XChainBridge':
+        bridge = {}
+        for name, part in _BRIDGE_FIELDS:
+            if part == 'AccountID':
+                bridge[name] = encode_account_id(data[pos + 1:pos + 21])
+                pos += 21
+            else:
+                bridge[name], pos = _decode_issue(data, pos)
+        return bridge, pos
+    if kind == 'Amount':
+        return _decode_amount(data, pos)
+    if kind == 'PathSet':
+        return _decode_paths(data, pos)
+    if kind == 'STObject':
+        return _decode_object(data, pos, OBJECT_END[0])
+    if kind == 'STArray':
+        items = []
+        while data[pos] != ARRAY_END[0]:
+            inner, pos = _read_field(data, pos)
+            value, pos = _decode_object(data, pos, OBJECT_END[0])
+            items.append({inner.name: value})
+        return items, pos + 1
+    length, pos = _read_length(data, pos)
+    chunk = data[pos:pos + length]
+    if kind == 'AccountID':
+        return encode_account_id(chunk), pos + length
+    if kind == 'Vector256':
+        return [chunk[index:index + 32].hex().upper() for index in range(0, length, 32)], pos + length
+    return chunk.hex().upper(), pos + length
+
+
+def _decode_object(data: bytes, pos: int, end) -> tuple:
+    obj = {}
+    while pos < len(data) and data[pos] != end:
+        field, pos = _read_field(data, pos)
+        obj[field.name], pos = _decode_value(field, data, pos)
+    return obj, pos + 1
+
+
+def decode(blob) -> dict:
+    """
+    Deserialize transaction, metadata or ledger object
+    :param blob: hex string or bytes, e.g. tx_blob of account_tx or data of ledger_data with binary=True
+    :return: object in the JSON format used by rippled
+    """
+    data = bytes.fromhex(blob) if isinstance(blob, str) else bytes(blob)
+    obj, _ = _decode_object(data, 0, None)
+    return obj
+
+
+def decode_field(blob, name: str):
+    """
+    Decode a single top-level field without decoding the whole object, fields are stored in canonical order
+    so reading stops as soon as the field is passed, e.g. TransactionIndex is the first field of metadata
+    :param blob: hex string or bytes of transaction, metadata or ledger object
+    :param name: name of the field
+    :return: value of the field, or None if the object does not contain it
+    """
+    target = FIELDS[name]
+    data = bytes.fromhex(blob) if isinstance(blob, str) else bytes(blob)
+    pos = 0
+    while pos < len(data):
+        field, pos = _read_field(data, pos)
+        if field.ordinal > target.ordinal:
+            return None
+        value, pos = _decode_value(field, data, pos)
+        if field is target:
+            return value
+    return None
+
+
+def decode_transaction(item: dict) -> dict:
+    """
+    Decode binary entry of tx or account_tx response into its JSON form,
+    transaction and metadata blobs are replaced with decoded 'tx' and 'meta'
+    """
+    item = dict(item)
+    blob = item.pop('tx_blob', None)
+    if blob is None and isinstance(item.get('tx'), str):
+        blob = item.pop('tx')
+    if blob is not None:
+        item['tx'] = decode(blob)
+    if isinstance(item.get('meta'), str):
+        item['meta'] = decode(item['meta'])
+    return item
+
+
+def decode_ledger_entry(item: dict) -> dict:
+    """
+    Decode binary entry of ledger_data state, object blob is replaced with its fields and 'index'
+    """
+    obj = decode(item['data'])
+    obj['index'] = item['index']
+    return obj
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# read-only methods whose responses can be served from cache
+CACHEABLE_METHODS = frozenset((
+    'account_channels', 'account_currencies', 'account_info', 'account_lines', 'account_objects',
+    'account_offers', 'account_tx', 'book_offers', 'gateway_balances', 'noripple_check',
+    'ledger', 'ledger_closed', 'ledger_current', 'ledger_data', 'ledger_entry',
+    'transaction_entry', 'tx', 'fee', 'server_info', 'server_state',
+))
+
+
+def is_pinned(params: dict) -> bool:
+    """
+    Check if request refers to a specific ledger version by hash or numeric index
+    """
+    if params.get('ledger_hash'):
+        return True
+    index = params.get('ledger_index')
+    return isinstance(index, int) or (isinstance(index, str) and index.isdigit())
+
+
+def is_immutable(method: str, params: dict, result: dict) -> bool:
+    """
+    Check if response can never change: it comes from a validated ledger
+    which the request pinned by hash or index, or it is a validated transaction
+    """
+    if result.get('validated') is not True:
+        return False
+    return method == 'tx' or is_pinned(params)
+
+
+class _Entry(object):
+    __slots__ = ('result', 'size', 'expires', 'ledger')
+
+    def __init__(self, result: dict, size: int, expires: float, ledger: int) -> None:
+        self.result = result
+        self.size = size
+        self.expires = expires
+        self.ledger = ledger
+
+
+class ResponseCache(object):
+    """
+    LRU cache of rippled responses bounded by size in bytes.
+    Responses pinned to a validated ledger never expire, responses about current, closed or latest
+    validated ledger live for `ttl` seconds and are dropped as soon as a response from a newer ledger is seen.
+    Cached responses are shared between callers and must not be modified.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 1.0) -> None:
+        """
+        :param max_bytes: maximum total size of cached responses, measured as length of their JSON
+        :param ttl: seconds to keep responses which are not pinned to a validated ledger
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._ledger = 0
+        self._stats = dict(hits=0, misses=0, evictions=0)
+
+    def __repr__(self):
+        return '<ResponseCache entries=%r bytes=%r>' % (len(self._entries), self._bytes)
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: hits, misses, evictions, number of entries and their total size in bytes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        return stats
+
+    def get(self, key):
+        """
+        Get cached response
+        :param key: request key
+        :return: cached response or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and (
+                    entry.expires < time.monotonic() or entry.ledger < self._ledger):
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry.result
+
+    def put(self, key, method: str, params: dict, result: dict) -> None:
+        """
+        Store response of a successful request
+        :param key: request key
+        :param method: JSON-RPC method of rippled
+        :param params: parameters of the request
+        :param result: response
+        """
+        if method not in CACHEABLE_METHODS or not isinstance(result, dict) or \
+                result.get('status') == 'error' or 'error' in result:
+            return
+        ledger = self._ledger_index(result)
+        expires = None
+        if not is_immutable(method, params, result):
+            expires = time.monotonic() + self.ttl
+        size = len(json.dumps(result, separators=(',', ':'), default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # a response from a newer ledger means a ledger was closed since volatile entries were stored
+            self._ledger = max(self._ledger, ledger)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(result, size, expires, self._ledger)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def clear(self) -> None:
+        """
+        Drop all cached responses
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    @staticmethod
+    def _ledger_index(result: dict) -> int:
+        index = result.get('ledger_current_index', result.get('ledger_index', 0))
+        if isinstance(index, str):
+            index = int(index) if index.isdigit() else 0
+        return index if isinstance(index, int) else 0
@@ -0,0 +1,210 @@
+from ripple_api.time_range import to_timestamp
+
+# named candle intervals in seconds
+INTERVALS = {'1m': 60, '5m': 300, '15m': 900, '30m': 1800, '1h': 3600, '4h': 14400, '1d': 86400}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is required for candle aggregation, install python-ripple-lib[numpy]')
+    return numpy
+
+
+def interval_seconds(interval) -> int:
+    """
+    Length of a candle interval given by name ('1m', '1h', ...) or number of seconds
+    """
+    return INTERVALS[interval] if isinstance(interval, str) else int(interval)
+
+
+def aggregate(times, prices, base_volumes, counter_volumes, seconds: int) -> dict:
+    """
+    Aggregate trades sorted by time into candles of `seconds`, in a single vectorized pass
+    :return: dict of arrays: time (start of the candle), open, high, low, close, volume (base),
+    counter_volume, vwap and count, only candles containing trades are present
+    """
+    np = _numpy()
+    if not len(times):
+        candles = {name: np.empty(0, np.float64) for name in (
+            'open', 'high', 'low', 'close', 'volume', 'counter_volume', 'vwap')}
+        candles.update(time=np.empty(0, np.int64), count=np.empty(0, np.int64))
+        return candles
+    buckets = times - times % seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(times)]
+    volume = np.add.reduceat(base_volumes, starts)
+    counter_volume = np.add.reduceat(counter_volumes, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = counter_volume / volume
+    return dict(
+        time=buckets[starts],
+        open=prices[starts],
+        high=np.maximum.reduceat(prices, starts),
+        low=np.minimum.reduceat(prices, starts),
+        close=prices[ends - 1],
+        volume=volume,
+        counter_volume=counter_volume,
+        vwap=vwap,
+        count=(ends - starts).astype(np.int64),
+    )
+
+
+def rolling(candles: dict, window: int, column: str = 'close') -> dict:
+    """
+    Rolling statistics over the last `window` candles, computed from cumulative sums
+    :param candles: result of ExchangeSeries.candles()
+    :param window: number of candles
+    :param column: column of the mean and standard deviation
+    :return: dict of arrays aligned with candles: mean, std and vwap, NaN where the window is not full
+    """
+    np = _numpy()
+    values = candles[column].astype(np.float64)
+    size = len(values)
+    stats = {name: np.full(size, np.nan) for name in ('mean', 'std', 'vwap')}
+    if window <= 0 or size < window:
+        return stats
+
+    def window_sums(array):
+        cumulative = np.cumsum(np.r_[0.0, array])
+        return cumulative[window:] - cumulative[:-window]
+
+    mean = window_sums(values) / window
+    stats['mean'][window - 1:] = mean
+    stats['std'][window - 1:] = np.sqrt(np.maximum(window_sums(values * values) / window - mean * mean, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats['vwap'][window - 1:] = window_sums(candles['counter_volume']) / window_sums(candles['volume'])
+    return stats
+
+
+class ExchangeSeries(object):
+    """
+    Trades of a market in growable NumPy arrays sorted by time: `times` (UNIX seconds), `prices`
+    (counter per base), `base_volumes` and `counter_volumes`. Candles of any interval are computed locally,
+    so raw exchanges are downloaded once for all timeframes. Candles are cached and after appends only
+    the last candle and newer ones are recomputed. Requires numpy.
+    """
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        :param capacity: initial number of trades the arrays can hold, they grow as needed
+        """
+        np = _numpy()
+        self._times = np.empty(capacity, np.int64)
+        self._prices = np.empty(capacity, np.float64)
+        self._base_volumes = np.empty(capacity, np.float64)
+        self._counter_volumes = np.empty(capacity, np.float64)
+        self.size = 0
+        self._candles = {}
+
+    def __repr__(self):
+        return '<ExchangeSeries trades=%r>' % self.size
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def times(self):
+        return self._times[:self.size]
+
+    @property
+    def prices(self):
+        return self._prices[:self.size]
+
+    @property
+    def base_volumes(self):
+        return self._base_volumes[:self.size]
+
+    @property
+    def counter_volumes(self):
+        return self._counter_volumes[:self.size]
+
+    def extend(self, exchanges) -> None:
+        """
+        Append exchanges of Data API
+        :param exchanges: iterable of records with executed_time, base_amount, counter_amount and rate
+        """
+        times, prices, base_volumes, counter_volumes = [], [], [], []
+        for exchange in exchanges:
+            base = float(exchange['base_amount'])
+            counter = float(exchange['counter_amount'])
+            rate = exchange.get('rate')
+            times.append(to_timestamp(exchange['executed_time']))
+            prices.append(float(rate) if rate not in (None, '') else counter / base)
+            base_volumes.append(base)
+            counter_volumes.append(counter)
+        self.append(times, prices, base_volumes, counter_volumes)
+
+    def append(self, times, prices, base_volumes, counter_volumes=None) -> None:
+        """
+        Append trades given as arrays
+        :param times: UNIX timestamps
+        :param prices: prices in counter currency per unit of base currency
+        :param base_volumes: amounts of base currency
+        :param counter_volumes: amounts of counter currency, price * base volume if not specified
+        """
+        np = _numpy()
+        times = np.asarray(times, np.int64)
+        prices = np.asarray(prices, np.float64)
+        base_volumes = np.asarray(base_volumes, np.float64)
+        if counter_volumes is None:
+            counter_volumes = prices * base_volumes
+        counter_volumes = np.asarray(counter_volumes, np.float64)
+        count = len(times)
+        if not count:
+            return
+        unordered = bool(self.size and times.min() < self._times[self.size - 1]) or \
+            bool(np.any(times[1:] < times[:-1]))
+        self._reserve(self.size + count)
+        end = self.size + count
+        self._times[self.size:end] = times
+        self._prices[self.size:end] = prices
+        self._base_volumes[self.size:end] = base_volumes
+        self._counter_volumes[self.size:end] = counter_volumes
+        self.size = end
+        if unordered:
+            order = np.argsort(self.times, kind='stable')
+            for name in ('_times', '_prices', '_base_volumes', '_counter_volumes'):
+                array = getattr(self, name)
+                array[:end] = array[:end][order]
+            # cached candles may miss trades inserted before their end
+            self._candles = {}
+
+    def candles(self, interval) -> dict:
+        """
+        Candles of an interval
+        :param interval: name ('1m', '5m', '1h', '1d', ...) or number of seconds
+        :return: dict of arrays: time, open, high, low, close, volume, counter_volume, vwap and count
+        """
+        np = _numpy()
+        seconds = interval_seconds(interval)
+        cached = self._candles.get(seconds)
+        start = keep = 0
+        if cached is not None and len(cached['time']):
+            # trades of the last cached candle and newer ones
+            keep = len(cached['time']) - 1
+            start = int(np.searchsorted(self.times, cached['time'][-1], side='left'))
+        fresh = aggregate(self.times[start:], self.prices[start:], self.base_volumes[start:],
+                          self.counter_volumes[start:], seconds)
+        if keep:
+            fresh = {name: np.concatenate((cached[name][:keep], values)) for name, values in fresh.items()}
+        self._candles[seconds] = fresh
+        return fresh
+
+    def ohlcv(self, intervals=('1m', '5m', '1h', '1d')) -> dict:
+        """
+        Candles of several intervals
+        :return: dict mapping each interval to its candles
+        """
+        return {interval: self.candles(interval) for interval in intervals}
+
+    def _reserve(self, size: int) -> None:
+        np = _numpy()
+        if size <= len(self._times):
+            return
+        capacity = max(size, 2 * len(self._times))
+        for name in ('_times', '_prices', '_base_volumes', '_counter_volumes'):
+            array = getattr(self, name)
+            grown = np.empty(capacity, array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
@@ -0,0 +1,79 @@
+import json
+import threading
+
+# methods with side effects or random results, every call must reach the node
+UNCOALESCED_METHODS = frozenset((
+    'submit', 'submit_multisigned', 'sign', 'sign_for', 'random', 'wallet_propose',
+    'validation_create', 'channel_authorize', 'can_delete', 'connect', 'stop',
+    'fetch_info', 'feature', 'ledger_accept',
+))
+
+
+def request_key(method: str, params: dict) -> tuple:
+    """
+    Key identifying a request regardless of the order of its parameters
+    """
+    return method, json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class _Flight(object):
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical concurrent calls: while a call for a key is in flight,
+    other callers with the same key wait for it and receive the same result object instead of calling again.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._stats = dict(executed=0, coalesced=0)
+
+    def __repr__(self):
+        return '<SingleFlight in_flight=%r>' % len(self._flights)
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: number of calls executed and number of calls served by another call in flight
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) unless a call with the same key is already in flight
+        :param key: hashable identifier of the call
+        :return: result of fn, shared by all coalesced callers
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats['executed'] += 1
+            else:
+                flight.followers += 1
+                self._stats['coalesced'] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fn(*args, **kwargs)
+        except Exception as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
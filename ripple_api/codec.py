@@ -0,0 +1,124 @@
+import json
+import threading
+
+
+class JSONCodec(object):
+    """
+    JSON encoder/decoder based on standard library, base class of faster backends
+    """
+    name = 'json'
+
+    def __repr__(self):
+        return '<{} name={!r}>'.format(self.__class__.__name__, self.name)
+
+    def dumps(self, obj) -> bytes:
+        """
+        Encode object to UTF-8 JSON
+        """
+        return json.dumps(obj).encode('utf-8')
+
+    def loads(self, data):
+        """
+        Decode UTF-8 JSON from bytes, bytearray or memoryview
+        """
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec backed by orjson, decodes straight from buffers without copying
+    """
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+
+    def dumps(self, obj) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, data):
+        return self._loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    JSON codec backed by ujson
+    """
+    name = 'ujson'
+
+    def __init__(self) -> None:
+        import ujson
+        self._dumps = ujson.dumps
+        self._loads = ujson.loads
+
+    def dumps(self, obj) -> bytes:
+        return self._dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def loads(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return self._loads(data)
+
+
+CODECS = dict(orjson=OrjsonCodec, ujson=UjsonCodec, json=JSONCodec)
+
+
+def get_codec(name: str = None) -> JSONCodec:
+    """
+    Get JSON codec by name, or the fastest installed one
+    :param name: 'orjson', 'ujson' or 'json', None selects the first available in this order
+    """
+    if name is not None:
+        return CODECS[name]()
+    for codec in CODECS.values():
+        try:
+            return codec()
+        except ImportError:
+            continue
+
+
+class BufferPool(object):
+    """
+    Pool of reusable bytearrays which response bodies are read into,
+    so a busy client does not allocate a new buffer for every response
+    """
+    def __init__(self, max_buffers: int = 16, max_size: int = 16 * 1024 * 1024) -> None:
+        """
+        :param max_buffers: maximum number of idle buffers kept in the pool
+        :param max_size: buffers larger than this are not returned to the pool
+        """
+        self.max_buffers = max_buffers
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._buffers = []
+
+    def __repr__(self):
+        return '<BufferPool buffers=%r>' % len(self._buffers)
+
+    def acquire(self, size: int) -> bytearray:
+        """
+        Get buffer of at least `size` bytes
+        """
+        with self._lock:
+            for index, buffer in enumerate(self._buffers):
+                if len(buffer) >= size:
+                    return self._buffers.pop(index)
+        # round up to power of two, so the buffer fits responses of similar size later
+        return bytearray(1 << max(size - 1, 1).bit_length())
+
+    def release(self, buffer: bytearray) -> None:
+        """
+        Return buffer to the pool
+        """
+        if len(buffer) > self.max_size:
+            return
+        with self._lock:
+            if len(self._buffers) < self.max_buffers:
+                self._buffers.append(buffer)
+
+
+default_codec = get_codec()
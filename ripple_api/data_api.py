@@ -1,12 +1,25 @@
-import json
-from urllib.request import Request, urlopen
 from urllib.parse import urljoin, urlencode
 from urllib.error import HTTPError, URLError
 
+from ripple_api.candles import ExchangeSeries
+from ripple_api.codec import JSONCodec, default_codec
+from ripple_api.pagination import DataAPIPaginator, PageSizeTuner
+from ripple_api.streaming import JSONStream
+from ripple_api.time_range import TimeRangeFetcher
+from ripple_api.transport import HTTPTransport
+
 
 class RippleDataAPIClient(object):
-    def __init__(self, node: str = 'https://data.ripple.com'):
+    def __init__(self, node: str = 'https://data.ripple.com',
+                 transport: HTTPTransport = None, codec: JSONCodec = None):
+        """
+        :param node: URL of Data API server
+        :param transport: pool of keep-alive connections, can be shared between clients
+        :param codec: JSON decoder of responses, defaults to the fastest installed one
+        """
         self.node = node
+        self.transport = HTTPTransport() if transport is None else transport
+        self.codec = default_codec if codec is None else codec
 
     def __repr__(self):
         return '<RippleDataAPIClient node=%r>' % self.node
@@ -18,21 +31,78 @@ class RippleDataAPIClient(object):
         :param params: query params
         :return: response dict
         """
-        api_version = "/v2/"
-        endpoint = "/".join(url_params)
-        api_url = "".join((api_version, endpoint))
-        url = urljoin(self.node, api_url)
-        url = url + "?" + urlencode(params)
-        req = Request(method='GET', url=url)
+        url = self._url(url_params, params)
         try:
-            with urlopen(req) as res:
-                res_json = json.loads(res.fp.read().decode('utf-8'))
-                return res_json
+            res = self.transport.request('GET', url, decode=self.codec.loads)
+            return res.body
         except HTTPError as err:
             return {"status": "error", "msg": err}
         except URLError as err:
             return {"status": "error", "msg": err}
 
+    def stream(self, url_params: tuple, params: dict, key: str) -> JSONStream:
+        """
+        Send request to data API and iterate over records of the response as they arrive,
+        without holding the whole response in memory. Other scalar fields of the response
+        (marker, count, etc.) are available in `fields` attribute of the stream after iteration.
+        Errors are raised as RippleAPIError.
+        :param url_params: url parameters which are forming endpoint
+        :param params: query params
+        :param key: name of the array with records, e.g. 'transactions' or 'exchanges'
+        """
+        url = self._url(url_params, params)
+        return JSONStream(lambda: self.transport.stream('GET', url), (key, ))
+
+    def paginate(self, url_params: tuple, params: dict, key: str, marker=None,
+                 tuner: PageSizeTuner = None, max_limit: int = 1000) -> DataAPIPaginator:
+        """
+        Iterate over records of a paginated endpoint, following marker and prefetching the next page.
+        Errors are raised as RippleAPIError.
+        :param url_params: url parameters which are forming endpoint
+        :param params: query params
+        :param key: name of the array with records, e.g. 'transactions' or 'exchanges'
+        :param marker: marker to resume from
+        :param tuner: page size tuner, a new one growing up to `max_limit` if not specified,
+        not used when params contain limit
+        :param max_limit: largest page size the endpoint accepts
+        """
+        if tuner is None:
+            tuner = PageSizeTuner(maximum=max_limit)
+        return DataAPIPaginator(self, url_params, params, key, marker=marker, tuner=tuner)
+
+    def fetch_range(self, url_params: tuple, params: dict, key: str, start, end,
+                    intervals: int = 16, max_concurrency: int = 8, limit: int = 1000,
+                    time_field: str = 'executed_time') -> TimeRangeFetcher:
+        """
+        Iterate over records between `start` and `end` in time order, downloading intervals
+        of the time range concurrently and splitting intervals which do not fit into a page.
+        Errors are raised as RippleAPIError.
+        :param url_params: url parameters which are forming endpoint
+        :param params: query params without start and end
+        :param key: name of the array with records, e.g. 'payments' or 'exchanges'
+        :param start: beginning of the time range, datetime, ISO 8601 string or UNIX timestamp
+        :param end: end of the time range, inclusive
+        :param intervals: number of intervals the range is split into initially
+        :param max_concurrency: maximum number of requests in flight
+        :param limit: page size
+        :param time_field: field of records holding their time
+        """
+        return TimeRangeFetcher(self, url_params, params, key, start, end, intervals=intervals,
+                                max_concurrency=max_concurrency, limit=limit, time_field=time_field)
+
+    def _url(self, url_params: tuple, params: dict) -> str:
+        """
+        Build URL of data API endpoint
+        :param url_params: url parameters which are forming endpoint
+        :param params: query params
+        :return: absolute URL with query string
+        """
+        api_version = "/v2/"
+        endpoint = "/".join(url_params)
+        api_url = "".join((api_version, endpoint))
+        url = urljoin(self.node, api_url)
+        return url + "?" + urlencode(params)
+
     def get_ledger(self, ledger_identifier: str, **query_params) -> dict:
         """
         Retrieve a specific Ledger by hash, index, date, or latest validated.
@@ -75,6 +145,20 @@ class RippleDataAPIClient(object):
         """
         return self._call(('transactions', ), query_params)
 
+    def iter_transactions(self, marker=None, tuner: PageSizeTuner = None,
+                          **query_params) -> DataAPIPaginator:
+        """
+        Iterate over transactions by time, following marker
+        """
+        return self.paginate(('transactions', ), query_params, 'transactions', marker, tuner, max_limit=100)
+
+    def fetch_transactions(self, start, end, max_concurrency: int = 8, **query_params) -> TimeRangeFetcher:
+        """
+        Iterate over transactions between `start` and `end`, downloading parts of the range concurrently
+        """
+        return self.fetch_range(('transactions', ), query_params, 'transactions', start, end,
+                                max_concurrency=max_concurrency, limit=100, time_field='date')
+
     def get_payments(self, currency: str = None, **query_params) -> dict:
         """
         Retrieve Payments over time, where Payments are defined as Payment type transactions where the sender
@@ -86,6 +170,27 @@ class RippleDataAPIClient(object):
             url_params = 'payments', currency
         return self._call(url_params, query_params)
 
+    def iter_payments(self, currency: str = None, marker=None, tuner: PageSizeTuner = None,
+                      **query_params) -> DataAPIPaginator:
+        """
+        Iterate over payments over time, following marker
+        """
+        url_params = ('payments', )
+        if currency:
+            url_params = 'payments', currency
+        return self.paginate(url_params, query_params, 'payments', marker, tuner)
+
+    def fetch_payments(self, start, end, currency: str = None, max_concurrency: int = 8,
+                       **query_params) -> TimeRangeFetcher:
+        """
+        Iterate over payments between `start` and `end`, downloading parts of the range concurrently
+        """
+        url_params = ('payments', )
+        if currency:
+            url_params = 'payments', currency
+        return self.fetch_range(url_params, query_params, 'payments', start, end,
+                                max_concurrency=max_concurrency)
+
     def get_exchanges(self, base: str, counter: str, **query_params) -> dict:
         """
         Retrieve Exchanges for a given currency pair over time. Results can be returned as individual exchanges
@@ -95,6 +200,42 @@ class RippleDataAPIClient(object):
         url_params = 'exchanges', base, counter
         return self._call(url_params, query_params)
 
+    def iter_exchanges(self, base: str, counter: str, marker=None, tuner: PageSizeTuner = None,
+                       **query_params) -> DataAPIPaginator:
+        """
+        Iterate over exchanges for a given currency pair, following marker
+        """
+        url_params = 'exchanges', base, counter
+        return self.paginate(url_params, query_params, 'exchanges', marker, tuner)
+
+    def fetch_exchanges(self, base: str, counter: str, start, end, max_concurrency: int = 8,
+                        **query_params) -> TimeRangeFetcher:
+        """
+        Iterate over exchanges for a given currency pair between `start` and `end`,
+        downloading parts of the range concurrently
+        """
+        url_params = 'exchanges', base, counter
+        return self.fetch_range(url_params, query_params, 'exchanges', start, end,
+                                max_concurrency=max_concurrency)
+
+    def exchange_series(self, base: str, counter: str, series: ExchangeSeries = None,
+                        chunk_size: int = 10000, **query_params) -> ExchangeSeries:
+        """
+        Download raw exchanges for a given currency pair into NumPy arrays, candles of any interval
+        are then computed locally with ExchangeSeries.ohlcv(). Requires numpy.
+        :param series: series to append to, e.g. with exchanges newer than its last trade
+        :param chunk_size: number of exchanges converted to arrays at once
+        """
+        series = ExchangeSeries() if series is None else series
+        chunk = []
+        for exchange in self.iter_exchanges(base, counter, **query_params):
+            chunk.append(exchange)
+            if len(chunk) >= chunk_size:
+                series.extend(chunk)
+                chunk = []
+        series.extend(chunk)
+        return series
+
     def get_exchange_rates(self, base: str, counter: str,
                            **query_params) -> dict:
         """
@@ -371,6 +512,14 @@ class RippleDataAPIClient(object):
         url_params = 'accounts', address, 'transactions'
         return self._call(url_params, query_params)
 
+    def iter_account_transaction_history(self, address: str, marker=None, tuner: PageSizeTuner = None,
+                                         **query_params) -> DataAPIPaginator:
+        """
+        Iterate over the history of transactions that affected a specific account, following marker
+        """
+        url_params = 'accounts', address, 'transactions'
+        return self.paginate(url_params, query_params, 'transactions', marker, tuner)
+
     def get_transaction_by_account_and_sequence(
             self, address: str, sequence: str, **query_params) -> dict:
         """
@@ -409,6 +558,14 @@ class RippleDataAPIClient(object):
         url_params = 'accounts', address, 'balance_changes'
         return self._call(url_params, query_params)
 
+    def iter_account_balance_changes(self, address: str, marker=None, tuner: PageSizeTuner = None,
+                                     **query_params) -> DataAPIPaginator:
+        """
+        Iterate over balance changes of a given account, following marker
+        """
+        url_params = 'accounts', address, 'balance_changes'
+        return self.paginate(url_params, query_params, 'balance_changes', marker, tuner)
+
     def get_account_reports(
             self, address: str, date: str = None, **query_params) -> dict:
         """
@@ -0,0 +1,14 @@
+class RippleAPIError(Exception):
+    """
+    Error response of rippled or Data API.
+    Methods returning response dicts report errors inside the dict, this exception is raised
+    where that is not possible, e.g. by iterators and background workers.
+    """
+    def __init__(self, response: dict) -> None:
+        """
+        :param response: error response
+        """
+        self.response = response
+        message = (response.get('error_message') or response.get('error') or
+                   response.get('message') or response.get('msg') or response)
+        super(RippleAPIError, self).__init__(str(message))
@@ -0,0 +1,290 @@
+from decimal import Decimal
+
+from ripple_api.time_range import to_timestamp
+
+# seconds between UNIX epoch and Ripple epoch (2000-01-01T00:00:00Z)
+RIPPLE_EPOCH = 946684800
+
+# columns of exported transactions and payments: name and type
+TRANSACTION_COLUMNS = (
+    ('hash', 'string'),
+    ('ledger_index', 'int64'),
+    ('time', 'timestamp'),
+    ('type', 'string'),
+    ('account', 'string'),
+    ('destination', 'string'),
+    ('amount', 'int64'),
+    ('amount_exponent', 'int32'),
+    ('currency', 'string'),
+    ('issuer', 'string'),
+    ('fee', 'int64'),
+    ('result', 'string'),
+)
+
+# columns of exported exchanges: name and type
+EXCHANGE_COLUMNS = (
+    ('hash', 'string'),
+    ('ledger_index', 'int64'),
+    ('time', 'timestamp'),
+    ('buyer', 'string'),
+    ('seller', 'string'),
+    ('taker', 'string'),
+    ('provider', 'string'),
+    ('base_amount', 'int64'),
+    ('base_exponent', 'int32'),
+    ('base_currency', 'string'),
+    ('base_issuer', 'string'),
+    ('counter_amount', 'int64'),
+    ('counter_exponent', 'int32'),
+    ('counter_currency', 'string'),
+    ('counter_issuer', 'string'),
+)
+
+
+def unix_time(value) -> int:
+    """
+    Convert Ripple epoch seconds of rippled responses or ISO 8601 time of Data API responses to UNIX timestamp
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value + RIPPLE_EPOCH
+    return to_timestamp(value)
+
+
+def decimal_parts(value) -> tuple:
+    """
+    Split decimal number into integer mantissa and exponent, value = mantissa * 10 ** exponent
+    """
+    sign, digits, exponent = Decimal(str(value)).normalize().as_tuple()
+    mantissa = int(''.join(map(str, digits))) if digits else 0
+    return -mantissa if sign else mantissa, exponent
+
+
+def split_amount(amount) -> tuple:
+    """
+    Split amount of rippled transaction: XRP in drops or issued currency object
+    :return: (mantissa, exponent, currency, issuer), mantissa of XRP amounts is in drops
+    """
+    if amount is None:
+        return None, None, None, None
+    if isinstance(amount, dict):
+        mantissa, exponent = decimal_parts(amount['value'])
+        return mantissa, exponent, amount.get('currency'), amount.get('issuer')
+    return int(amount), 0, 'XRP', None
+
+
+def split_value(value, currency: str, issuer: str = None) -> tuple:
+    """
+    Split amount of Data API record, where XRP amounts are in XRP rather than drops
+    :return: (mantissa, exponent, currency, issuer), mantissa of XRP amounts is in drops
+    """
+    if value is None:
+        return None, None, currency, issuer
+    if currency == 'XRP':
+        return int(Decimal(str(value)) * 1000000), 0, 'XRP', None
+    mantissa, exponent = decimal_parts(value)
+    return mantissa, exponent, currency, issuer
+
+
+def flatten_transaction(item: dict) -> dict:
+    """
+    Flatten entry of rippled account_tx or transaction of Data API into a row of TRANSACTION_COLUMNS
+    """
+    tx = item.get('tx', item)
+    meta = item.get('meta') or item.get('metaData') or {}
+    amount, exponent, currency, issuer = split_amount(tx.get('Amount'))
+    fee = tx.get('Fee')
+    return dict(
+        hash=tx.get('hash', item.get('hash')),
+        ledger_index=tx.get('ledger_index', item.get('ledger_index')),
+        time=unix_time(tx.get('date', item.get('date'))),
+        type=tx.get('TransactionType'),
+        account=tx.get('Account'),
+        destination=tx.get('Destination'),
+        amount=amount,
+        amount_exponent=exponent,
+        currency=currency,
+        issuer=issuer,
+        fee=int(fee) if fee is not None else None,
+        result=meta.get('TransactionResult') if isinstance(meta, dict) else None,
+    )
+
+
+def flatten_payment(record: dict) -> dict:
+    """
+    Flatten payment of Data API into a row of TRANSACTION_COLUMNS
+    """
+    value = record.get('delivered_amount', record.get('amount'))
+    amount, exponent, currency, issuer = split_value(value, record.get('currency'), record.get('issuer'))
+    fee = record.get('transaction_cost')
+    return dict(
+        hash=record.get('tx_hash'),
+        ledger_index=record.get('ledger_index'),
+        time=unix_time(record.get('executed_time')),
+        type='Payment',
+        account=record.get('source'),
+        destination=record.get('destination'),
+        amount=amount,
+        amount_exponent=exponent,
+        currency=currency,
+        issuer=issuer,
+        fee=split_value(fee, 'XRP')[0] if fee is not None else None,
+        result=None,
+    )
+
+
+def flatten_exchange(record: dict) -> dict:
+    """
+    Flatten exchange of Data API into a row of EXCHANGE_COLUMNS
+    """
+    base = split_value(record.get('base_amount'), record.get('base_currency'), record.get('base_issuer'))
+    counter = split_value(record.get('counter_amount'), record.get('counter_currency'),
+                          record.get('counter_issuer'))
+    row = dict(
+        hash=record.get('tx_hash'),
+        ledger_index=record.get('ledger_index'),
+        time=unix_time(record.get('executed_time')),
+        buyer=record.get('buyer'),
+        seller=record.get('seller'),
+        taker=record.get('taker'),
+        provider=record.get('provider'),
+    )
+    for prefix, (amount, exponent, currency, issuer) in (('base', base), ('counter', counter)):
+        row.update({prefix + '_amount': amount, prefix + '_exponent': exponent,
+                    prefix + '_currency': currency, prefix + '_issuer': issuer})
+    return row
+
+
+# kinds of exported records: flattening function and columns
+KINDS = dict(
+    transactions=(flatten_transaction, TRANSACTION_COLUMNS),
+    payments=(flatten_payment, TRANSACTION_COLUMNS),
+    exchanges=(flatten_exchange, EXCHANGE_COLUMNS),
+)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is required for columnar export, install python-ripple-lib[arrow]')
+    return pyarrow
+
+
+class ColumnBatch(object):
+    """
+    Rows collected column-wise until they are written as a record batch
+    """
+    def __init__(self, columns: tuple) -> None:
+        """
+        :param columns: (name, type) pairs
+        """
+        self.names = [name for name, _ in columns]
+        self.values = {name: [] for name in self.names}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, row: dict) -> None:
+        for name in self.names:
+            self.values[name].append(row.get(name))
+        self.size += 1
+
+    def clear(self) -> None:
+        for values in self.values.values():
+            values.clear()
+        self.size = 0
+
+
+class ColumnarWriter(object):
+    """
+    Writes rows to a Parquet or Arrow IPC file in record batches of `batch_size` rows,
+    so memory usage does not depend on the number of rows. Requires pyarrow.
+    """
+    def __init__(self, path: str, columns: tuple = TRANSACTION_COLUMNS, format: str = 'parquet',
+                 batch_size: int = 65536) -> None:
+        """
+        :param path: path of the output file
+        :param columns: (name, type) pairs, types are 'string', 'int32', 'int64' and 'timestamp',
+        timestamps are UNIX seconds in rows and are stored in milliseconds, the coarsest unit of Parquet
+        :param format: 'parquet' or 'arrow'
+        :param batch_size: number of rows in a record batch
+        """
+        pa = _pyarrow()
+        types = dict(string=pa.string(), int32=pa.int32(), int64=pa.int64(),
+                     timestamp=pa.timestamp('ms', tz='UTC'))
+        self.schema = pa.schema([(name, types[type_name]) for name, type_name in columns])
+        self.path = path
+        self.format = format
+        self.batch_size = batch_size
+        self.rows = 0
+        self._batch = ColumnBatch(columns)
+        if format == 'parquet':
+            import pyarrow.parquet
+            self._writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        elif format == 'arrow':
+            self._writer = pa.ipc.new_file(path, self.schema)
+        else:
+            raise ValueError('Unknown format {!r}, expected parquet or arrow'.format(format))
+
+    def __repr__(self):
+        return '<ColumnarWriter path=%r format=%r rows=%r>' % (self.path, self.format, self.rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, row: dict) -> None:
+        """
+        Add row, missing columns are null
+        """
+        self._batch.append(row)
+        self.rows += 1
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write collected rows as a record batch
+        """
+        if not len(self._batch):
+            return
+        pa = _pyarrow()
+        arrays = []
+        for field in self.schema:
+            values = self._batch.values[field.name]
+            if pa.types.is_timestamp(field.type):
+                arrays.append(pa.array(values, type=pa.timestamp('s', tz='UTC')).cast(field.type))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self._batch.clear()
+
+    def close(self) -> None:
+        """
+        Write remaining rows and finish the file
+        """
+        self.flush()
+        self._writer.close()
+
+
+def export_records(records, path: str, kind: str = 'transactions', format: str = 'parquet',
+                   batch_size: int = 65536) -> int:
+    """
+    Stream records into a Parquet or Arrow IPC file with typed columns
+    :param records: iterable of records, e.g. iterator of account_tx entries, Data API payments or exchanges
+    :param path: path of the output file
+    :param kind: 'transactions' (rippled account_tx entries and Data API transactions), 'payments' or 'exchanges'
+    :param format: 'parquet' or 'arrow'
+    :param batch_size: number of rows in a record batch
+    :return: number of rows written
+    """
+    flatten, columns = KINDS[kind]
+    with ColumnarWriter(path, columns, format=format, batch_size=batch_size) as writer:
+        for record in records:
+            writer.write(flatten(record))
+    return writer.rows
@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ripple_api.exceptions import RippleAPIError
+from ripple_api.ledger_dump import resolve_ledger_index
+from ripple_api.pagination import is_error
+
+
+class LedgerFollower(object):
+    """
+    Follows the chain of validated ledgers and yields every ledger once, in strict order of index,
+    with expanded transactions. When the follower falls behind, missing ledgers are fetched concurrently.
+    The index of the last processed ledger is the cursor: it advances when the next ledger is requested
+    from the iterator, and with `cursor` it is saved to a JSON file, so a restarted follower continues
+    after the last ledger which was processed completely.
+    """
+    def __init__(self, client, start: int = None, cursor: str = None, workers: int = 4,
+                 poll_interval: float = 1.0, retries: int = 3, transactions: bool = True,
+                 expand: bool = True) -> None:
+        """
+        :param client: RippleRPCClient sending the requests
+        :param start: index of the first ledger to yield, latest validated ledger if not specified
+        :param cursor: path of the file with the index of the last processed ledger,
+        takes precedence over `start` when it exists
+        :param workers: number of ledgers fetched concurrently while catching up
+        :param poll_interval: seconds between checks for a new validated ledger
+        :param retries: number of attempts to fetch a ledger before RippleAPIError is raised
+        :param transactions: include transactions of ledgers
+        :param expand: include transactions as JSON rather than hashes
+        """
+        self.client = client
+        self.start = start
+        self.cursor = cursor
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retries = retries
+        self.transactions = transactions
+        self.expand = expand
+        self.processed_index = None
+        self.validated_index = None
+        self.ledgers = 0
+        self._stop = threading.Event()
+
+    def __repr__(self):
+        return '<LedgerFollower processed_index=%r validated_index=%r>' % (
+            self.processed_index, self.validated_index)
+
+    @property
+    def lag(self) -> int:
+        """
+        Number of validated ledgers which are not processed yet
+        """
+        if self.validated_index is None or self.processed_index is None:
+            return None
+        return max(0, self.validated_index - self.processed_index)
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: index of the last processed and latest validated ledger, lag and number of ledgers yielded
+        """
+        return dict(processed_index=self.processed_index, validated_index=self.validated_index,
+                    lag=self.lag, ledgers=self.ledgers)
+
+    def stop(self) -> None:
+        """
+        End iteration before the next ledger, the ledger being processed is still recorded in the cursor
+        """
+        self._stop.set()
+
+    def __iter__(self):
+        self._stop.clear()
+        self.processed_index = self._load()
+        if self.processed_index is None:
+            start = self.start if self.start is not None else self._validated()
+            self.processed_index = start - 1
+        with ThreadPoolExecutor(self.workers, thread_name_prefix='ripple-follower') as executor:
+            in_flight = deque()
+            try:
+                while not self._stop.is_set():
+                    next_index = self.processed_index + len(in_flight) + 1
+                    if not in_flight and next_index > (self.validated_index or 0) and \
+                            next_index > self._validated():
+                        self._stop.wait(self.poll_interval)
+                        continue
+                    while len(in_flight) < self.workers and next_index <= self.validated_index:
+                        in_flight.append(executor.submit(self._fetch, next_index))
+                        next_index += 1
+                    ledger = in_flight.popleft().result()
+                    self.ledgers += 1
+                    yield ledger
+                    self.processed_index += 1
+                    self._save()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+    def _validated(self) -> int:
+        self.validated_index = resolve_ledger_index(self.client, 'validated')
+        return self.validated_index
+
+    def _fetch(self, ledger_index: int) -> dict:
+        for attempt in range(self.retries):
+            response = self.client.ledger(ledger_index=ledger_index, transactions=self.transactions,
+                                          expand=self.expand)
+            if not is_error(response):
+                return response
+            if attempt + 1 < self.retries:
+                time.sleep(self.poll_interval)
+        raise RippleAPIError(response)
+
+    def _load(self) -> int:
+        if self.cursor is None or not os.path.exists(self.cursor):
+            return None
+        with open(self.cursor) as fp:
+            return json.load(fp)['processed_index']
+
+    def _save(self) -> None:
+        if self.cursor is None:
+            return
+        temp = self.cursor + '.tmp'
+        with open(temp, 'w') as fp:
+            json.dump(dict(processed_index=self.processed_index), fp)
+        os.replace(temp, self.cursor)
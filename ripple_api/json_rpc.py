@@ -1,24 +1,92 @@
 import base64
-import json
+import time
+from io import BytesIO
 
-from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
 
+from ripple_api.backfill import AccountTxBackfill
+from ripple_api.batch import Batch
+from ripple_api.cache import ResponseCache, CACHEABLE_METHODS
+from ripple_api.codec import JSONCodec, default_codec
+from ripple_api.coalesce import SingleFlight, UNCOALESCED_METHODS, request_key
+from ripple_api.follower import LedgerFollower
+from ripple_api.ledger_dump import LedgerStateDump
+from ripple_api.node_pool import NodePool
+from ripple_api.order_book import OrderBook
+from ripple_api.pagination import Paginator
+from ripple_api.snapshot import AccountSnapshot, fetch_accounts
+from ripple_api.streaming import JSONStream
+from ripple_api.transport import HTTPTransport, ResponseError
+from ripple_api.websocket import WebSocketTransport
+
+# location of the (potentially large) array in responses of paginated methods
+STREAMED_ARRAYS = dict(
+    account_lines=('lines', ),
+    account_objects=('account_objects', ),
+    account_offers=('offers', ),
+    account_tx=('transactions', ),
+    book_offers=('offers', ),
+    ledger=('ledger', 'transactions'),
+    ledger_data=('state', ),
+)
+
 
 class RippleRPCClient(object):
-    def __init__(self, node: str, username: str = None, password: str = None):
+    def __init__(self, node: str, username: str = None, password: str = None,
+                 transport: HTTPTransport = None, coalesce: bool = False,
+                 cache: ResponseCache = None, codec: JSONCodec = None):
         """
-        :param node: URL of rippled node
+        :param node: URL of rippled node, ws:// and wss:// URLs are served over WebSocket.
+        List of URLs or NodePool routes requests to the fastest healthy node with failover
         :param username: username of admin in rippled node
         :param password: password of admin in rippled node
+        :param transport: pool of keep-alive connections, can be shared between clients,
+        or WebSocketTransport to send requests over WebSocket connection
+        :param coalesce: share a single request between concurrent identical calls,
+        coalesced callers receive the same response object
+        :param cache: cache of responses, can be shared between clients of the same node
+        :param codec: JSON encoder/decoder of requests and responses, defaults to the fastest installed one
         """
         self.node = node
         self.username = username
         self.password = password
+        if transport is None:
+            if isinstance(node, str) and node.startswith(('ws://', 'wss://')):
+                transport = WebSocketTransport(node)
+            else:
+                transport = HTTPTransport()
+        self.transport = transport
+        self.single_flight = SingleFlight() if coalesce else None
+        self.cache = cache
+        self.codec = default_codec if codec is None else codec
+        self.node_pool = None
+        self._own_pool = False
+        if isinstance(node, NodePool):
+            self.node_pool = node
+        elif isinstance(node, (list, tuple)):
+            self.node_pool = NodePool(node)
+            self._own_pool = True
+        if self.node_pool is not None:
+            self.node_pool.attach(self.transport, self.codec)
 
     def __repr__(self):
         return '<RippleRPCClient node=%r>' % self.node
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close connections of the transport and stop the node pool created for a list of nodes,
+        NodePool passed as node is left to its owner
+        """
+        if self._own_pool:
+            self.node_pool.close()
+        self.transport.close()
+
     @property
     def request_headers(self):
         headers = {'Content-Type': 'application/json'}
@@ -34,29 +102,165 @@ class RippleRPCClient(object):
         :param method: JSON-RPC method of rippled
         :param params: parameters of the request
         """
-        payload = json.dumps({
+        cached = self.cache is not None and method in CACHEABLE_METHODS
+        coalesced = self.single_flight is not None and method not in UNCOALESCED_METHODS
+        if not cached and not coalesced:
+            return self._request(method, params)
+        key = request_key(method, params)
+        if cached:
+            result = self.cache.get(key)
+            if result is not None:
+                return result
+        if coalesced:
+            result = self.single_flight.do(key, self._request, method, params)
+        else:
+            result = self._request(method, params)
+        if cached:
+            self.cache.put(key, method, params, result)
+        return result
+
+    def _request(self, method: str, params: dict) -> dict:
+        """
+        Send request through the transport
+        :param method: JSON-RPC method of rippled
+        :param params: parameters of the request
+        """
+        if isinstance(self.transport, WebSocketTransport):
+            try:
+                return self.transport.call(method, params)
+            except URLError as err:
+                return self._error(err)
+        payload = self._payload(method, params)
+        if self.node_pool is not None:
+            return self._failover(method, payload)
+        try:
+            res = self.transport.request('POST', self.node, body=payload,
+                                         headers=self.request_headers, decode=self.codec.loads)
+            return self._result(res.status, res.body)
+        except (HTTPError, URLError) as err:
+            return self._error(err)
+
+    def batch(self, max_in_flight: int = 10) -> Batch:
+        """
+        Dispatch calls concurrently, every method called on the batch returns a future of its result.
+        Requests to a single node are also limited by `max_per_host` of HTTPTransport,
+        WebSocket transport sends all of them over one connection.
+        :param max_in_flight: maximum number of requests sent at once
+        :return: context manager waiting for all calls on exit
+        """
+        return Batch(self, max_in_flight)
+
+    def stream(self, method: str, params: dict, path: tuple = None) -> JSONStream:
+        """
+        Send request and iterate over elements of an array in the response as they arrive,
+        without holding the whole response in memory. Other scalar fields of the response
+        (marker, ledger_index, etc.) are available in `fields` attribute of the stream after iteration.
+        Errors are raised as RippleAPIError.
+        :param method: JSON-RPC method of rippled
+        :param params: parameters of the request
+        :param path: keys leading to the array inside 'result', e.g. ('ledger', 'transactions'),
+        defaults to the main array of method's response
+        """
+        path = STREAMED_ARRAYS[method] if path is None else tuple(path)
+        path = ('result', ) + path
+        if isinstance(self.transport, WebSocketTransport):
+            # whole message arrives at once, stream it from memory to keep the same interface
+            return JSONStream(lambda: BytesIO(self.codec.dumps({'result': self._call(method, params)})),
+                              path)
+        url = self.node
+        if self.node_pool is not None:
+            url = self.node_pool.candidates()[0].url
+        payload = self._payload(method, params)
+        return JSONStream(lambda: self.transport.stream('POST', url, body=payload,
+                                                        headers=self.request_headers), path)
+
+    def _failover(self, method: str, payload: bytes) -> dict:
+        """
+        Send request to the fastest healthy node of the pool, trying next one on connection errors and 5xx responses.
+        Requests with side effects are not sent to another node once the connection failed after sending them.
+        :param method: JSON-RPC method of rippled
+        :param payload: encoded JSON-RPC request
+        """
+        err = URLError('no nodes available')
+        for node in self.node_pool.candidates():
+            start = time.monotonic()
+            try:
+                res = self.transport.request('POST', node.url, body=payload,
+                                             headers=self.request_headers, decode=self.codec.loads)
+            except HTTPError as http_err:
+                if http_err.code < 500:
+                    return self._error(http_err)
+                err = http_err
+                self.node_pool.report_failure(node, err)
+                continue
+            except URLError as url_err:
+                err = url_err
+                self.node_pool.report_failure(node, err)
+                if isinstance(err, ResponseError) and method in UNCOALESCED_METHODS:
+                    # the node may have applied the request already, e.g. submitted a transaction
+                    break
+                continue
+            self.node_pool.report_success(node, time.monotonic() - start)
+            return self._result(res.status, res.body)
+        return self._error(err)
+
+    def _payload(self, method: str, params: dict) -> bytes:
+        """
+        Encode JSON-RPC request body
+        :param method: JSON-RPC method of rippled
+        :param params: parameters of the request
+        """
+        return self.codec.dumps({
             "method": method,
             "params": [
                 params
             ]
-        }).encode('utf-8')
-        req = Request(method='POST', url=self.node,
-                      data=payload, headers=self.request_headers)
-        try:
-            with urlopen(req) as res:
-                res_json = json.loads(res.fp.read().decode('utf-8'))
-                if res.status == 200 and res_json.get('result'):
-                    return res_json.get('result')
-                return res_json
-        except HTTPError as err:
+        })
+
+    @staticmethod
+    def _result(status: int, res_json: dict) -> dict:
+        """
+        Unwrap 'result' of successful JSON-RPC responses
+        :param status: HTTP status of the response
+        :param res_json: decoded response body
+        """
+        if status == 200 and res_json.get('result'):
+            return res_json.get('result')
+        return res_json
+
+    @staticmethod
+    def _paged(params: dict, ledger_index, limit: int, marker) -> dict:
+        """
+        Add optional ledger and pagination parameters to the request
+        """
+        for name, value in (('ledger_index', ledger_index), ('limit', limit), ('marker', marker)):
+            if value is not None:
+                params[name] = value
+        return params
+
+    @staticmethod
+    def _ledger(ledger_hash: str, ledger_index) -> dict:
+        """
+        Select ledger version by hash, or by index or shortcut ('validated', 'closed', 'current')
+        """
+        if ledger_hash is not None:
+            return dict(ledger_hash=ledger_hash)
+        return dict(ledger_index='validated' if ledger_index is None else ledger_index)
+
+    @staticmethod
+    def _error(err: URLError) -> dict:
+        """
+        Convert transport error into error response
+        :param err: HTTPError or URLError raised by transport
+        """
+        if isinstance(err, HTTPError):
             if err.code == 403:
                 return {"status": "error",
                         "msg": "{} {}".format(err.code, err.reason),
                         "text": "Admin methods are only allowed on nodes with admin access."}
             return {"status": "error", "msg": err}
-        except URLError as err:
-            return {"status": "error",
-                    "msg": err}
+        return {"status": "error",
+                "msg": err}
 
     def account_info(self, account: str, strict: bool = True,
                      ledger_index: str = 'current', queue: bool = True) ->dict:
@@ -73,13 +277,35 @@ class RippleRPCClient(object):
         )
         return self._call('account_info', params)
 
-    def account_lines(self, account: str) -> dict:
+    def account_info_many(self, addresses, ledger_index='validated',
+                          max_in_flight: int = 16) -> AccountSnapshot:
+        """
+        Fetch many accounts concurrently from a single ledger version into a columnar snapshot
+        with balances in drops, sequences, owner counts and flags as arrays of integers
+        :param addresses: iterable of addresses
+        :param ledger_index: index of the ledger version, or shortcut resolved to an index once
+        :param max_in_flight: maximum number of requests sent at once
+        """
+        return fetch_accounts(self, addresses, ledger_index=ledger_index, max_in_flight=max_in_flight)
+
+    def account_lines(self, account: str, ledger_index: str = None, limit: int = None,
+                      marker=None) -> dict:
         """
         Method returns information about an account's trust lines, including balances in all non-XRP currencies
         and assets. All information retrieved is relative to a particular version of the ledger.
         Reference: https://developers.ripple.com/account_lines.html
         """
-        return self._call('account_lines', params=dict(account=account))
+        params = self._paged(dict(account=account), ledger_index, limit, marker)
+        return self._call('account_lines', params)
+
+    def iter_account_lines(self, account: str, ledger_index: str = 'validated', limit: int = 400,
+                           marker=None) -> Paginator:
+        """
+        Iterate over all trust lines of an account, following marker
+        :param marker: marker to resume from, with ledger_index of the interrupted iteration
+        """
+        params = dict(account=account, ledger_index=ledger_index, limit=limit)
+        return Paginator(self, 'account_lines', params, marker=marker)
 
     def account_channels(
             self, account: str, destination_account: str,
@@ -116,7 +342,7 @@ class RippleRPCClient(object):
 
     def account_objects(
             self, account: str, ledger_index: str = "validated", limit: int = 10,
-            type: str = "state") ->dict:
+            type: str = "state", marker=None) ->dict:
         """
         Method returns the raw ledger format for all objects owned by an account.
         For a higher-level view of an account's trust lines and balances, see the account_lines method instead.
@@ -128,19 +354,44 @@ class RippleRPCClient(object):
             limit=limit,
             type=type
         )
+        if marker is not None:
+            params['marker'] = marker
         return self._call('account_objects', params)
 
-    def account_offers(self, account: str) -> dict:
+    def iter_account_objects(self, account: str, ledger_index: str = "validated", limit: int = 400,
+                             type: str = None, marker=None) -> Paginator:
+        """
+        Iterate over all ledger objects owned by an account, following marker
+        :param type: type of objects, e.g. "offer" or "state", all types if not specified
+        :param marker: marker to resume from, with ledger_index of the interrupted iteration
+        """
+        params = dict(account=account, ledger_index=ledger_index, limit=limit)
+        if type is not None:
+            params['type'] = type
+        return Paginator(self, 'account_objects', params, marker=marker)
+
+    def account_offers(self, account: str, ledger_index: str = None, limit: int = None,
+                       marker=None) -> dict:
         """
          Method retrieves a list of offers made by a given account that are outstanding
          as of a particular ledger version.
          Reference: https://developers.ripple.com/account_offers.html
         """
-        return self._call('account_offers', params=dict(account=account))
+        params = self._paged(dict(account=account), ledger_index, limit, marker)
+        return self._call('account_offers', params)
+
+    def iter_account_offers(self, account: str, ledger_index: str = 'validated', limit: int = 400,
+                            marker=None) -> Paginator:
+        """
+        Iterate over all outstanding offers of an account, following marker
+        :param marker: marker to resume from, with ledger_index of the interrupted iteration
+        """
+        params = dict(account=account, ledger_index=ledger_index, limit=limit)
+        return Paginator(self, 'account_offers', params, marker=marker)
 
     def account_tx(self, account: str, binary: bool = False, forward: bool = False,
                    ledger_index_max: int = -1, ledger_index_min: int = -1,
-                   limit: int = 0) ->dict:
+                   limit: int = 0, marker=None) ->dict:
         """
         Method retrieves a list of transactions that involved the specified account.
         Reference: https://developers.ripple.com/account_tx.html
@@ -153,8 +404,49 @@ class RippleRPCClient(object):
             ledger_index_min=ledger_index_min,
             limit=limit
         )
+        if marker is not None:
+            params['marker'] = marker
         return self._call('account_tx', params)
 
+    def iter_account_tx(self, account: str, binary: bool = False, forward: bool = False,
+                        ledger_index_max: int = -1, ledger_index_min: int = -1,
+                        limit: int = 200, marker=None) -> Paginator:
+        """
+        Iterate over all transactions of an account in the ledger range, following marker
+        :param marker: marker to resume from
+        """
+        params = dict(
+            account=account,
+            binary=binary,
+            forward=forward,
+            ledger_index_max=ledger_index_max,
+            ledger_index_min=ledger_index_min,
+            limit=limit
+        )
+        return Paginator(self, 'account_tx', params, marker=marker)
+
+    def backfill_account_tx(self, account: str, ledger_index_min: int, ledger_index_max: int = None,
+                            window: int = 10000, workers: int = 4, checkpoint: str = None,
+                            forward: bool = True, binary: bool = False, limit: int = 200,
+                            buffer: int = 2) -> AccountTxBackfill:
+        """
+        Iterate over the transaction history of an account in a ledger range. Windows of `window` ledgers
+        are downloaded concurrently, transactions are yielded in ledger order without duplicates.
+        With `checkpoint` an interrupted backfill resumes from the first unfinished window.
+        :param ledger_index_min: first ledger of the range
+        :param ledger_index_max: last ledger of the range, latest validated ledger if not specified
+        :param window: number of ledgers in a window
+        :param workers: number of windows downloaded concurrently
+        :param checkpoint: path of the checkpoint file
+        :param forward: yield oldest transactions first
+        :param binary: request transactions as hex blobs
+        :param limit: number of transactions per page
+        :param buffer: number of pages a window downloads ahead of the consumer
+        """
+        return AccountTxBackfill(self, account, ledger_index_min, ledger_index_max, window=window,
+                                 workers=workers, checkpoint=checkpoint, forward=forward, binary=binary,
+                                 limit=limit, buffer=buffer)
+
     def gateway_balances(
             self, account: str, hotwallet: list = None,
             ledger_index: str = "validated", strict: bool = True) ->dict:
@@ -207,6 +499,18 @@ class RippleRPCClient(object):
         )
         return self._call('ledger', params)
 
+    def follow_ledgers(self, start: int = None, cursor: str = None, workers: int = 4,
+                       poll_interval: float = 1.0) -> LedgerFollower:
+        """
+        Iterate over validated ledgers with expanded transactions, each exactly once and in order,
+        waiting for new ledgers when the follower catches up. Call stop() of the follower to end iteration.
+        :param start: index of the first ledger, latest validated ledger if not specified
+        :param cursor: path of the file keeping the index of the last processed ledger between runs
+        :param workers: number of ledgers fetched concurrently while catching up
+        :param poll_interval: seconds between checks for a new validated ledger
+        """
+        return LedgerFollower(self, start=start, cursor=cursor, workers=workers, poll_interval=poll_interval)
+
     def ledger_closed(self) -> dict:
         """
         Method returns the unique identifiers of the most recently closed ledger.
@@ -223,20 +527,50 @@ class RippleRPCClient(object):
         """
         return self._call('ledger_current', params=dict())
 
-    def ledger_data(self, ledger_hash: str, binary: bool = True,
-                    limit: int = 5) -> dict:
+    def ledger_data(self, ledger_hash: str = None, binary: bool = True,
+                    limit: int = 5, marker=None, ledger_index=None) -> dict:
         """
         Method retrieves contents of the specified ledger. You can iterate through several calls to retrieve the entire
         contents of a single ledger version.
         Reference: https://developers.ripple.com/ledger_data.html
         """
-        params = dict(
-            ledger_hash=ledger_hash,
-            binary=binary,
-            limit=limit
-        )
+        params = self._ledger(ledger_hash, ledger_index)
+        params.update(binary=binary, limit=limit)
+        if marker is not None:
+            params['marker'] = marker
         return self._call('ledger_data', params)
 
+    def iter_ledger_data(self, ledger_hash: str = None, binary: bool = True, limit: int = 2048,
+                         marker=None, ledger_index='validated') -> Paginator:
+        """
+        Iterate over all objects in the state tree of a ledger version, following marker
+        :param marker: marker to resume from, with ledger_index of the interrupted iteration
+        """
+        params = self._ledger(ledger_hash, ledger_index)
+        params.update(binary=binary, limit=limit)
+        return Paginator(self, 'ledger_data', params, marker=marker)
+
+    def dump_ledger_state(self, ledger_index='validated', shards: int = 8, sink=None,
+                          checkpoint: str = None, binary: bool = True, limit: int = 2048,
+                          progress=None) -> dict:
+        """
+        Download the whole state tree of a ledger version, walking `shards` ranges of the key space concurrently.
+        Objects are delivered to `sink`: a callable, a queue or a file receiving one JSON document per line.
+        With `checkpoint` an interrupted dump resumes from the last page of every shard.
+        :param ledger_index: index of the ledger version, or shortcut resolved to an index when the dump starts
+        :param shards: number of key ranges downloaded concurrently
+        :param sink: callable, queue or file receiving state objects
+        :param checkpoint: path of the checkpoint file
+        :param binary: request objects as hex blobs instead of JSON
+        :param limit: number of objects per page
+        :param progress: callable receiving stats after every page
+        :return: ledger index, number of objects, seconds elapsed and objects per second
+        :raises RippleAPIError: if a request fails
+        """
+        dump = LedgerStateDump(self, ledger_index, shards=shards, sink=sink, checkpoint=checkpoint,
+                               binary=binary, limit=limit, progress=progress)
+        return dump.run()
+
     def ledger_entry(
             self, account_root: str, ledger_index: str = "validated",
             type: str = "account_root") ->dict:
@@ -338,7 +672,8 @@ class RippleRPCClient(object):
 
     def book_offers(self, taker: str, issuer: str,
                     taker_gets_currency: str = "XRP",
-                    taker_pays_currency: str = "USD", limit: int = 10) ->dict:
+                    taker_pays_currency: str = "USD", limit: int = 10,
+                    marker=None) ->dict:
         """
         Method retrieves a list of offers, also known as the order book, between two currencies.
         If the results are very large, a partial result is returned with a marker so that later requests
@@ -356,8 +691,45 @@ class RippleRPCClient(object):
             ),
             limit=limit
         )
+        if marker is not None:
+            params['marker'] = marker
         return self._call('book_offers', params)
 
+    def iter_book_offers(self, taker: str, issuer: str,
+                         taker_gets_currency: str = "XRP",
+                         taker_pays_currency: str = "USD", limit: int = 400,
+                         marker=None, ledger_index: str = 'validated') -> Paginator:
+        """
+        Iterate over all offers of the order book, following marker
+        :param marker: marker to resume from, with ledger_index of the interrupted iteration
+        """
+        params = dict(
+            taker=taker,
+            taker_gets=dict(
+                currency=taker_gets_currency
+            ),
+            taker_pays=dict(
+                currency=taker_pays_currency,
+                issuer=issuer
+            ),
+            limit=limit,
+            ledger_index=ledger_index
+        )
+        return Paginator(self, 'book_offers', params, marker=marker)
+
+    def order_book(self, base, counter, ledger_index='validated', limit: int = 400) -> OrderBook:
+        """
+        Load both sides of a market into a local order book, which can be kept current
+        with OrderBook.follow() or OrderBook.apply_ledger()
+        :param base: currency traded, 'XRP', 'USD+rIssuer' or {'currency': 'USD', 'issuer': 'rIssuer'}
+        :param counter: currency prices are quoted in
+        :param ledger_index: index of the ledger version, or shortcut resolved to an index
+        :param limit: number of offers per page
+        """
+        book = OrderBook(base, counter)
+        book.seed(self, ledger_index=ledger_index, limit=limit)
+        return book
+
     def ripple_path_find(self, destination_account: str, currency: str,
                          issuer: str, value: str, source_account: str,
                          source_currencies: list = None) ->dict:
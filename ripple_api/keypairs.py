@@ -0,0 +1,463 @@
+"""
+Key derivation and signing of XRPL transactions without a node: secp256k1 (deterministic, low-S DER
+signatures as produced by rippled) and ed25519, in pure Python.
+"""
+import hashlib
+import hmac
+from concurrent.futures import ProcessPoolExecutor
+
+from ripple_api import binary_codec
+from ripple_api.utils import encode_account_id, seed_entropy
+
+SECP256K1 = 'secp256k1'
+ED25519 = 'ed25519'
+
+ED25519_KEY_PREFIX = b'\xed'
+
+# prefix of the data hashed into transaction ID, 'TXN\0'
+TRANSACTION_ID_PREFIX = b'\x54\x58\x4e\x00'
+
+
+def sha512_half(data: bytes) -> bytes:
+    """
+    First 32 bytes of SHA-512, the hash used throughout the XRPL
+    """
+    return hashlib.sha512(data).digest()[:32]
+
+
+def account_id(public_key: bytes) -> bytes:
+    """
+    Account ID of a public key: RIPEMD-160 of SHA-256
+    """
+    return hashlib.new('ripemd160', hashlib.sha256(public_key).digest()).digest()
+
+
+def parse_seed(secret: str) -> tuple:
+    """
+    Decode secret accepted by rippled: base58 seed, RFC1751 words, 32 hex digits or a passphrase
+    :return: (16 bytes of seed entropy, key type encoded in the seed or None)
+    """
+    try:
+        return seed_entropy(secret)
+    except ValueError:
+        return sha512_half(secret.encode('utf-8'))[:16], None
+
+
+# secp256k1, points in Jacobian coordinates, None is the point at infinity
+
+_P = 2 ** 256 - 2 ** 32 - 977
+_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+      0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+
+def _double(point):
+    if point is None:
+        return None
+    x, y, z = point
+    if not y:
+        return None
+    yy = y * y % _P
+    s = 4 * x * yy % _P
+    m = 3 * x * x % _P
+    x3 = (m * m - 2 * s) % _P
+    return x3, (m * (s - x3) - 8 * yy * yy) % _P, 2 * y * z % _P
+
+
+def _add_affine(point, affine):
+    """
+    Add affine point to Jacobian one
+    """
+    if point is None:
+        return affine[0], affine[1], 1
+    x1, y1, z1 = point
+    zz = z1 * z1 % _P
+    h = (affine[0] * zz - x1) % _P
+    r = (affine[1] * zz * z1 - y1) % _P
+    if not h:
+        return _double(point) if not r else None
+    hh = h * h % _P
+    hhh = h * hh % _P
+    v = x1 * hh % _P
+    x3 = (r * r - hhh - 2 * v) % _P
+    return x3, (r * (v - x3) - y1 * hhh) % _P, z1 * h % _P
+
+
+def _affine(point) -> tuple:
+    x, y, z = point
+    inverse = pow(z, -1, _P)
+    zz = inverse * inverse % _P
+    return x * zz % _P, y * zz * inverse % _P
+
+
+def _multiply(affine, scalar: int):
+    point = None
+    for bit in bin(scalar)[2:]:
+        point = _double(point)
+        if bit == '1':
+            point = _add_affine(point, affine)
+    return point
+
+
+_WINDOW = 8
+_DIGIT = (1 << _WINDOW) - 1
+_G_TABLE = []
+
+
+def _affine_many(points: list) -> list:
+    """
+    Convert many Jacobian points to affine ones with a single modular inversion
+    """
+    products = []
+    product = 1
+    for point in points:
+        product = product * point[2] % _P
+        products.append(product)
+    inverse = pow(product, -1, _P)
+    result = [None] * len(points)
+    for index in range(len(points) - 1, -1, -1):
+        x, y, z = points[index]
+        z_inverse = inverse * products[index - 1] % _P if index else inverse
+        inverse = inverse * z % _P
+        zz = z_inverse * z_inverse % _P
+        result[index] = x * zz % _P, y * zz * z_inverse % _P
+    return result
+
+
+def _base_table() -> list:
+    """
+    Multiples i * 256^j * G of the generator for every 8-bit window j, so multiplying G
+    takes one addition per window and no doublings
+    """
+    if not _G_TABLE:
+        base = _G
+        for _ in range(256 // _WINDOW):
+            points = [(base[0], base[1], 1)]
+            for _ in range(2, 1 << _WINDOW):
+                points.append(_add_affine(points[-1], base))
+            row = [None] + _affine_many(points)
+            _G_TABLE.append(row)
+            base = _affine(_add_affine(points[-1], base))
+    return _G_TABLE
+
+
+def _multiply_g(scalar: int):
+    point = None
+    for row in _base_table():
+        digit = scalar & _DIGIT
+        if digit:
+            point = _add_affine(point, row[digit])
+        scalar >>= _WINDOW
+    return point
+
+
+def _compress(affine: tuple) -> bytes:
+    return bytes((2 + (affine[1] & 1), )) + affine[0].to_bytes(32, 'big')
+
+
+def _decompress(public_key: bytes) -> tuple:
+    x = int.from_bytes(public_key[1:], 'big')
+    y = pow((x * x * x + 7) % _P, (_P + 1) // 4, _P)
+    if (y & 1) != (public_key[0] & 1):
+        y = _P - y
+    return x, y
+
+
+def _secp256k1_private_key(seed: bytes) -> int:
+    """
+    Private key of the first account derived from the seed, as rippled does
+    """
+    def scalar(data: bytes) -> int:
+        for sequence in range(2 ** 32):
+            value = int.from_bytes(sha512_half(data + sequence.to_bytes(4, 'big')), 'big')
+            if 0 < value < _N:
+                return value
+
+    root = scalar(seed)
+    root_public = _compress(_affine(_multiply_g(root)))
+    # account index 0
+    return (root + scalar(root_public + bytes(4))) % _N
+
+
+def _nonces(private_key: int, digest: bytes):
+    """
+    Deterministic nonces of RFC 6979 with HMAC-SHA256
+    """
+    key = bytes(32)
+    value = b'\x01' * 32
+    data = private_key.to_bytes(32, 'big') + (int.from_bytes(digest, 'big') % _N).to_bytes(32, 'big')
+    key = hmac.new(key, value + b'\x00' + data, hashlib.sha256).digest()
+    value = hmac.new(key, value, hashlib.sha256).digest()
+    key = hmac.new(key, value + b'\x01' + data, hashlib.sha256).digest()
+    value = hmac.new(key, value, hashlib.sha256).digest()
+    while True:
+        value = hmac.new(key, value, hashlib.sha256).digest()
+        nonce = int.from_bytes(value, 'big')
+        if 0 < nonce < _N:
+            yield nonce
+        key = hmac.new(key, value + b'\x00', hashlib.sha256).digest()
+        value = hmac.new(key, value, hashlib.sha256).digest()
+
+
+def _der_integer(value: int) -> bytes:
+    data = value.to_bytes((value.bit_length() + 8) // 8, 'big')
+    return b'\x02' + bytes((len(data), )) + data
+
+
+def _secp256k1_sign(private_key: int, digest: bytes) -> bytes:
+    z = int.from_bytes(digest, 'big')
+    for nonce in _nonces(private_key, digest):
+        r = _affine(_multiply_g(nonce))[0] % _N
+        if not r:
+            continue
+        s = pow(nonce, -1, _N) * (z + r * private_key) % _N
+        if not s:
+            continue
+        # canonical signatures have low S
+        s = min(s, _N - s)
+        body = _der_integer(r) + _der_integer(s)
+        return b'\x30' + bytes((len(body), )) + body
+
+
+def _secp256k1_verify(public_key: bytes, digest: bytes, signature: bytes) -> bool:
+    try:
+        if signature[0] != 0x30 or signature[2] != 0x02:
+            return False
+        r_size = signature[3]
+        r = int.from_bytes(signature[4:4 + r_size], 'big')
+        s_size = signature[5 + r_size]
+        s = int.from_bytes(signature[6 + r_size:6 + r_size + s_size], 'big')
+    except IndexError:
+        return False
+    if not (0 < r < _N and 0 < s < _N):
+        return False
+    inverse = pow(s, -1, _N)
+    z = int.from_bytes(digest, 'big')
+    point = _multiply_g(z * inverse % _N)
+    other = _multiply(_decompress(public_key), r * inverse % _N)
+    if other is not None:
+        point = _add_affine(point, _affine(other))
+    return point is not None and _affine(point)[0] % _N == r
+
+
+# ed25519, points in extended coordinates (X, Y, Z, T)
+
+_Q = 2 ** 255 - 19
+_L = 2 ** 252 + 27742317777372353535851937790883648493
+_D = -121665 * pow(121666, -1, _Q) % _Q
+_SQRT_M1 = pow(2, (_Q - 1) // 4, _Q)
+
+
+def _ed_add(p, q):
+    a = (p[1] - p[0]) * (q[1] - q[0]) % _Q
+    b = (p[1] + p[0]) * (q[1] + q[0]) % _Q
+    c = 2 * _D * p[3] * q[3] % _Q
+    d = 2 * p[2] * q[2] % _Q
+    e, f, g, h = b - a, d - c, d + c, b + a
+    return e * f % _Q, g * h % _Q, f * g % _Q, e * h % _Q
+
+
+def _ed_recover_x(y: int, sign: int):
+    xx = (y * y - 1) * pow(_D * y * y + 1, -1, _Q) % _Q
+    x = pow(xx, (_Q + 3) // 8, _Q)
+    if (x * x - xx) % _Q:
+        x = x * _SQRT_M1 % _Q
+    if (x * x - xx) % _Q:
+        return None
+    if (x & 1) != sign:
+        x = _Q - x
+    return x
+
+
+_ED_IDENTITY = (0, 1, 1, 0)
+_B_Y = 4 * pow(5, -1, _Q) % _Q
+_B_X = _ed_recover_x(_B_Y, 0)
+_B = (_B_X, _B_Y, 1, _B_X * _B_Y % _Q)
+_B_TABLE = []
+
+
+def _ed_base_table() -> list:
+    if not _B_TABLE:
+        base = _B
+        for _ in range(256 // _WINDOW):
+            row = [_ED_IDENTITY, base]
+            for _ in range(2, 1 << _WINDOW):
+                row.append(_ed_add(row[-1], base))
+            _B_TABLE.append(row)
+            base = _ed_add(row[-1], base)
+    return _B_TABLE
+
+
+def _ed_multiply_b(scalar: int):
+    point = _ED_IDENTITY
+    for row in _ed_base_table():
+        digit = scalar & _DIGIT
+        if digit:
+            point = _ed_add(point, row[digit])
+        scalar >>= _WINDOW
+    return point
+
+
+def _ed_multiply(point, scalar: int):
+    result = _ED_IDENTITY
+    while scalar:
+        if scalar & 1:
+            result = _ed_add(result, point)
+        point = _ed_add(point, point)
+        scalar >>= 1
+    return result
+
+
+def _ed_encode(point) -> bytes:
+    inverse = pow(point[2], -1, _Q)
+    x, y = point[0] * inverse % _Q, point[1] * inverse % _Q
+    return (y | (x & 1) << 255).to_bytes(32, 'little')
+
+
+def _ed_decode(data: bytes):
+    y = int.from_bytes(data, 'little')
+    sign, y = y >> 255, y & ((1 << 255) - 1)
+    x = None if y >= _Q else _ed_recover_x(y, sign)
+    if x is None:
+        raise ValueError('Invalid ed25519 point')
+    return x, y, 1, x * y % _Q
+
+
+def _ed_expand(secret: bytes) -> tuple:
+    digest = hashlib.sha512(secret).digest()
+    scalar = int.from_bytes(digest[:32], 'little')
+    scalar &= (1 << 254) - 8
+    scalar |= 1 << 254
+    return scalar, digest[32:]
+
+
+def _ed_hash(data: bytes) -> int:
+    return int.from_bytes(hashlib.sha512(data).digest(), 'little') % _L
+
+
+def _ed25519_sign(secret: bytes, public_key: bytes, message: bytes) -> bytes:
+    scalar, prefix = _ed_expand(secret)
+    nonce = _ed_hash(prefix + message)
+    r = _ed_encode(_ed_multiply_b(nonce))
+    s = (nonce + _ed_hash(r + public_key + message) * scalar) % _L
+    return r + s.to_bytes(32, 'little')
+
+
+def _ed25519_verify(public_key: bytes, message: bytes, signature: bytes) -> bool:
+    if len(signature) != 64:
+        return False
+    s = int.from_bytes(signature[32:], 'little')
+    if s >= _L:
+        return False
+    try:
+        point = _ed_decode(public_key)
+        r = _ed_decode(signature[:32])
+    except ValueError:
+        return False
+    k = _ed_hash(signature[:32] + public_key + message)
+    left = _ed_multiply_b(s)
+    right = _ed_add(r, _ed_multiply(point, k))
+    # compare projective points
+    return (left[0] * right[2] - right[0] * left[2]) % _Q == 0 and \
+        (left[1] * right[2] - right[1] * left[2]) % _Q == 0
+
+
+class Keypair(object):
+    """
+    Key pair of an account, signs transactions locally
+    """
+    def __init__(self, private_key: bytes, public_key: bytes, key_type: str = SECP256K1) -> None:
+        """
+        :param private_key: 32 bytes of the private key
+        :param public_key: 33 bytes of the public key, ed25519 keys are prefixed with 0xED
+        :param key_type: 'secp256k1' or 'ed25519'
+        """
+        self.private_key = private_key
+        self.public_key = public_key
+        self.key_type = key_type
+        self.account_id = account_id(public_key)
+        self.address = encode_account_id(self.account_id)
+
+    def __repr__(self):
+        return '<Keypair address={} key_type={}>'.format(self.address, self.key_type)
+
+    @classmethod
+    def from_seed(cls, seed: str, key_type: str = None) -> 'Keypair':
+        """
+        Derive key pair of the account controlled by a secret
+        :param seed: base58 seed, 32 hex digits or passphrase
+        :param key_type: 'secp256k1' or 'ed25519', ed25519 seeds ('sEd...') select ed25519 themselves
+        """
+        entropy, seed_type = parse_seed(seed)
+        return cls.from_entropy(entropy, key_type or seed_type or SECP256K1)
+
+    @classmethod
+    def from_entropy(cls, entropy: bytes, key_type: str = SECP256K1) -> 'Keypair':
+        """
+        Derive key pair from 16 bytes of seed
+        """
+        if key_type == ED25519:
+            private_key = sha512_half(entropy)
+            public_key = ED25519_KEY_PREFIX + _ed_encode(_ed_multiply_b(_ed_expand(private_key)[0]))
+            return cls(private_key, public_key, ED25519)
+        if key_type != SECP256K1:
+            raise ValueError('Unknown key type: {!r}'.format(key_type))
+        private_key = _secp256k1_private_key(entropy)
+        return cls(private_key.to_bytes(32, 'big'), _compress(_affine(_multiply_g(private_key))), SECP256K1)
+
+    def sign(self, message: bytes) -> bytes:
+        """
+        Sign message: secp256k1 keys sign its SHA-512Half, ed25519 keys sign the message itself
+        :return: DER encoded secp256k1 signature or 64 bytes of ed25519 signature
+        """
+        if self.key_type == ED25519:
+            return _ed25519_sign(self.private_key, self.public_key[1:], message)
+        return _secp256k1_sign(int.from_bytes(self.private_key, 'big'), sha512_half(message))
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        """
+        Check signature of a message made with this key pair
+        """
+        if self.key_type == ED25519:
+            return _ed25519_verify(self.public_key[1:], message, signature)
+        return _secp256k1_verify(self.public_key, sha512_half(message), signature)
+
+    def sign_transaction(self, tx_json: dict) -> dict:
+        """
+        Sign transaction, which must have all fields filled, including Sequence and Fee
+        :param tx_json: transaction JSON
+        :return: tx_blob and tx_json with signature and hash, as in response of sign method
+        """
+        tx_json = dict(tx_json, SigningPubKey=self.public_key.hex().upper())
+        tx_json.pop('TxnSignature', None)
+        tx_json.pop('hash', None)
+        signature = self.sign(binary_codec.encode_for_signing(tx_json))
+        tx_json['TxnSignature'] = signature.hex().upper()
+        blob = binary_codec.encode(tx_json)
+        tx_json['hash'] = sha512_half(TRANSACTION_ID_PREFIX + blob).hex().upper()
+        return dict(tx_blob=blob.hex().upper(), tx_json=tx_json)
+
+
+def _sign_chunk(seed: str, key_type: str, transactions: list) -> list:
+    keypair = Keypair.from_seed(seed, key_type)
+    return [keypair.sign_transaction(tx_json) for tx_json in transactions]
+
+
+def sign_transactions(transactions, seed: str, key_type: str = None, workers: int = None,
+                      chunk_size: int = 256) -> list:
+    """
+    Sign many transactions of one account, large batches are spread across worker processes
+    :param transactions: iterable of complete transaction JSONs
+    :param seed: secret of the account
+    :param key_type: 'secp256k1' or 'ed25519'
+    :param workers: number of processes, defaults to the number of CPUs, 1 signs in this process
+    :param chunk_size: number of transactions signed by a process at once
+    :return: list of tx_blob and tx_json dicts in order of transactions
+    """
+    transactions = list(transactions)
+    if workers == 1 or len(transactions) <= chunk_size:
+        return _sign_chunk(seed, key_type, transactions)
+    chunks = [transactions[index:index + chunk_size] for index in range(0, len(transactions), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        signed = executor.map(_sign_chunk, [seed] * len(chunks), [key_type] * len(chunks), chunks)
+        return [item for chunk in signed for item in chunk]
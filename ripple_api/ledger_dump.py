@@ -0,0 +1,205 @@
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ripple_api.exceptions import RippleAPIError
+from ripple_api.pagination import Paginator, is_error
+
+KEY_SPACE = 1 << 256
+
+
+def shard_bounds(shards: int) -> list:
+    """
+    Split the 256-bit key space of the state tree into equal ranges
+    :param shards: number of ranges
+    :return: list of (start, end) hex keys, objects of a range have start < key <= end,
+    start of the first range is None
+    """
+    bounds = []
+    for index in range(shards):
+        start = None if index == 0 else '{:064X}'.format(index * KEY_SPACE // shards)
+        end = '{:064X}'.format((index + 1) * KEY_SPACE // shards - 1 if index == shards - 1
+                               else (index + 1) * KEY_SPACE // shards)
+        bounds.append((start, end))
+    return bounds
+
+
+def is_numeric(ledger_index) -> bool:
+    """
+    Check if ledger is selected by numeric index rather than by shortcut
+    """
+    return isinstance(ledger_index, int) or (isinstance(ledger_index, str) and ledger_index.isdigit())
+
+
+def resolve_ledger_index(client, ledger_index) -> int:
+    """
+    Get numeric index of a ledger version selected by index or shortcut ('validated', 'closed', 'current')
+    :raises RippleAPIError: if the ledger is not available
+    """
+    if is_numeric(ledger_index):
+        return int(ledger_index)
+    response = client._call('ledger', dict(ledger_index=ledger_index))
+    if is_error(response):
+        raise RippleAPIError(response)
+    return int(response.get('ledger_index') or response['ledger']['ledger_index'])
+
+
+class Shard(object):
+    """
+    Range of the state key space walked by a single worker
+    """
+    __slots__ = ('start', 'end', 'marker', 'objects', 'done')
+
+    def __init__(self, start: str, end: str, marker=None, objects: int = 0, done: bool = False) -> None:
+        self.start = start
+        self.end = end
+        self.marker = start if marker is None else marker
+        self.objects = objects
+        self.done = done
+
+    def __repr__(self):
+        return '<Shard start=%r end=%r objects=%r done=%r>' % (self.start, self.end, self.objects, self.done)
+
+    def to_dict(self) -> dict:
+        return dict(start=self.start, end=self.end, marker=self.marker, objects=self.objects, done=self.done)
+
+
+class LedgerStateDump(object):
+    """
+    Downloads the whole state tree of a ledger version with ledger_data.
+    The key space is split into `shards` ranges walked concurrently, each starting from a marker
+    synthesized from the first key of its range. Objects are delivered to `sink`: a callable, a queue
+    (anything with `put`) or a file receiving one JSON document per line. Deliveries are serialized,
+    so the sink does not need to be thread-safe.
+    With `checkpoint` the position of every shard is saved to a JSON file after each page,
+    and an interrupted dump of the same ledger resumes from it. Objects of the page being delivered
+    when the dump was interrupted may be delivered again.
+    """
+    def __init__(self, client, ledger_index, shards: int = 8, sink=None, checkpoint: str = None,
+                 binary: bool = True, limit: int = 2048, progress=None) -> None:
+        """
+        :param client: RippleRPCClient sending the requests
+        :param ledger_index: index of the ledger version, or shortcut which is resolved to an index once
+        :param shards: number of key ranges downloaded concurrently
+        :param sink: callable, queue or file receiving state objects, objects are dropped if not specified
+        :param checkpoint: path of the checkpoint file
+        :param binary: request objects as hex blobs instead of JSON
+        :param limit: number of objects per page
+        :param progress: callable receiving stats after every page
+        """
+        self.client = client
+        self.ledger_index = ledger_index
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.binary = binary
+        self.limit = limit
+        self.progress = progress
+        self.shards = [Shard(start, end) for start, end in shard_bounds(shards)]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started = None
+        self._resumed = 0
+
+    def __repr__(self):
+        return '<LedgerStateDump ledger_index=%r shards=%r>' % (self.ledger_index, len(self.shards))
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: ledger index, number of objects downloaded (including those of an interrupted run),
+        seconds elapsed, objects per second in this run and number of finished shards
+        """
+        with self._lock:
+            objects = sum(shard.objects for shard in self.shards)
+            done = sum(shard.done for shard in self.shards)
+        elapsed = time.monotonic() - self._started if self._started is not None else 0.0
+        return dict(ledger_index=self.ledger_index, objects=objects, elapsed=elapsed,
+                    objects_per_second=(objects - self._resumed) / elapsed if elapsed else 0.0,
+                    shards_done=done, shards=len(self.shards))
+
+    def run(self) -> dict:
+        """
+        Download all shards which are not finished yet
+        :return: stats of the dump
+        :raises RippleAPIError: if a request fails, positions of the shards are kept in the checkpoint
+        """
+        # a dump interrupted by a failure can be run again, it continues from the positions of its shards
+        self._stop.clear()
+        state = self._load()
+        if state is not None and not is_numeric(self.ledger_index):
+            # continue the interrupted dump rather than starting over on a newer ledger
+            self.ledger_index = state['ledger_index']
+        self.ledger_index = resolve_ledger_index(self.client, self.ledger_index)
+        if state is not None and state['ledger_index'] == self.ledger_index and \
+                len(state['shards']) == len(self.shards):
+            self.shards = [Shard(**shard) for shard in state['shards']]
+        self._resumed = sum(shard.objects for shard in self.shards)
+        self._started = time.monotonic()
+        pending = [shard for shard in self.shards if not shard.done]
+        if pending:
+            with ThreadPoolExecutor(len(pending), thread_name_prefix='ripple-dump') as executor:
+                futures = [executor.submit(self._walk, shard) for shard in pending]
+                errors = [future.exception() for future in futures]
+            errors = [error for error in errors if error is not None]
+            if errors:
+                raise errors[0]
+        return self.stats
+
+    def _walk(self, shard: Shard) -> None:
+        params = dict(ledger_index=self.ledger_index, binary=self.binary, limit=self.limit)
+        end = int(shard.end, 16)
+        pages = Paginator(self.client, 'ledger_data', params, marker=shard.marker)
+        try:
+            for page in pages.pages():
+                if self._stop.is_set():
+                    return
+                marker = page.get('marker')
+                objects = [obj for obj in page.get('state', ()) if int(obj['index'], 16) <= end]
+                with self._lock:
+                    self._deliver(objects)
+                    shard.objects += len(objects)
+                    shard.marker = marker
+                    shard.done = marker is None or int(marker, 16) >= end
+                    self._save()
+                if self.progress is not None:
+                    self.progress(self.stats)
+                if shard.done:
+                    return
+        except Exception:
+            # let other shards stop at the next page, their positions are checkpointed
+            self._stop.set()
+            raise
+
+    def _deliver(self, objects: list) -> None:
+        sink = self.sink
+        if sink is None:
+            return
+        if hasattr(sink, 'put'):
+            for obj in objects:
+                sink.put(obj)
+        elif hasattr(sink, 'write'):
+            lines = b''.join(self.client.codec.dumps(obj) + b'\n' for obj in objects)
+            sink.write(lines.decode('utf-8') if isinstance(sink, io.TextIOBase) else lines)
+            # objects must reach the file before the checkpoint moves past them
+            sink.flush()
+        else:
+            for obj in objects:
+                sink(obj)
+
+    def _load(self) -> dict:
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return None
+        with open(self.checkpoint) as fp:
+            return json.load(fp)
+
+    def _save(self) -> None:
+        if self.checkpoint is None:
+            return
+        state = dict(ledger_index=self.ledger_index, shards=[shard.to_dict() for shard in self.shards])
+        temp = self.checkpoint + '.tmp'
+        with open(temp, 'w') as fp:
+            json.dump(state, fp)
+        os.replace(temp, self.checkpoint)
@@ -0,0 +1,177 @@
+import threading
+import time
+from urllib.error import HTTPError, URLError
+
+from ripple_api.codec import JSONCodec, default_codec
+from ripple_api.transport import HTTPTransport
+
+SYNCED_STATES = ('full', 'validating', 'proposing')
+
+
+class Node(object):
+    """
+    Health and latency state of a single rippled node
+    """
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.latency = None
+        self.server_state = None
+        self.validated_ledger = None
+        self.healthy = True
+        self.failures = 0
+        self.last_error = None
+
+    def __repr__(self):
+        return '<Node url=%r healthy=%r latency=%r>' % (self.url, self.healthy, self.latency)
+
+
+class NodePool(object):
+    """
+    Set of rippled nodes probed in background with server_info.
+    Requests are routed to the healthy node with the lowest EWMA latency, nodes which are not synced,
+    lag behind the others on validated ledger or fail requests are taken out of rotation until the next
+    successful probe.
+    Background probing starts when the pool is first used and runs until close().
+    """
+    def __init__(self, nodes: list, transport: HTTPTransport = None,
+                 probe_interval: float = 10.0, max_ledger_lag: int = 5,
+                 alpha: float = 0.3, codec: JSONCodec = None) -> None:
+        """
+        :param nodes: URLs of rippled nodes
+        :param transport: pool of keep-alive connections used for probes,
+        defaults to the transport of the first client using the pool
+        :param probe_interval: seconds between background probes, None disables background probing
+        :param max_ledger_lag: maximum number of validated ledgers a node can be behind the most recent one
+        :param alpha: smoothing factor of EWMA latency
+        :param codec: JSON encoder/decoder of probes, defaults to the codec of the first client using the pool
+        """
+        self.nodes = [Node(url) for url in nodes]
+        self.transport = transport
+        self.codec = codec
+        self.probe_interval = probe_interval
+        self.max_ledger_lag = max_ledger_lag
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._own_transport = False
+
+    def __repr__(self):
+        return '<NodePool nodes=%r>' % [node.url for node in self.nodes]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def attach(self, transport: HTTPTransport, codec: JSONCodec) -> None:
+        """
+        Probe with transport and codec of a client, unless the pool was given its own
+        :param transport: pool of keep-alive connections of the client
+        :param codec: JSON encoder/decoder of the client
+        """
+        with self._lock:
+            if self.transport is None and isinstance(transport, HTTPTransport):
+                self.transport = transport
+            if self.codec is None:
+                self.codec = codec
+
+    def candidates(self) -> list:
+        """
+        Nodes in order they should be tried
+        :return: healthy nodes sorted by latency, or all nodes if none of them is healthy
+        """
+        self._start()
+        with self._lock:
+            nodes = [node for node in self.nodes if node.healthy] or list(self.nodes)
+        return sorted(nodes, key=lambda node: node.latency or 0)
+
+    def report_success(self, node: Node, latency: float) -> None:
+        """
+        Record latency of a successful request
+        """
+        with self._lock:
+            if node.latency is None:
+                node.latency = latency
+            else:
+                node.latency = self.alpha * latency + (1 - self.alpha) * node.latency
+            node.failures = 0
+
+    def report_failure(self, node: Node, err: Exception) -> None:
+        """
+        Take node out of rotation until it passes the next probe
+        """
+        with self._lock:
+            node.healthy = False
+            node.failures += 1
+            node.last_error = err
+
+    def probe(self) -> None:
+        """
+        Query server_info of every node and update its health
+        """
+        transport, codec = self._client()
+        payload = codec.dumps({"method": "server_info", "params": [{}]})
+        headers = {'Content-Type': 'application/json'}
+        for node in self.nodes:
+            start = time.monotonic()
+            try:
+                res = transport.request('POST', node.url, body=payload, headers=headers, decode=codec.loads)
+                info = res.body['result']['info']
+            except (HTTPError, URLError, ValueError, KeyError, TypeError) as err:
+                self.report_failure(node, err)
+                continue
+            self.report_success(node, time.monotonic() - start)
+            with self._lock:
+                node.server_state = info.get('server_state')
+                node.validated_ledger = info.get('validated_ledger', {}).get('seq')
+        self._update_health()
+
+    def close(self) -> None:
+        """
+        Stop background probing and wait for the probe in progress
+        """
+        self._stopped.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        if self._own_transport:
+            self.transport.close()
+
+    def _client(self) -> tuple:
+        with self._lock:
+            if self.transport is None:
+                self.transport = HTTPTransport()
+                self._own_transport = True
+            if self.codec is None:
+                self.codec = default_codec
+            return self.transport, self.codec
+
+    def _start(self) -> None:
+        if not self.probe_interval or self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None and not self._stopped.is_set():
+                self._thread = threading.Thread(target=self._probe_loop, daemon=True)
+                self._thread.start()
+
+    def _update_health(self) -> None:
+        with self._lock:
+            ledgers = [node.validated_ledger for node in self.nodes
+                       if node.validated_ledger is not None]
+            newest = max(ledgers) if ledgers else None
+            for node in self.nodes:
+                if node.failures:
+                    node.healthy = False
+                    continue
+                synced = node.server_state in SYNCED_STATES
+                behind = (newest is not None and (node.validated_ledger is None or
+                          newest - node.validated_ledger > self.max_ledger_lag))
+                node.healthy = synced and not behind
+
+    def _probe_loop(self) -> None:
+        while not self._stopped.is_set():
+            self.probe()
+            self._stopped.wait(self.probe_interval)
@@ -0,0 +1,217 @@
+from array import array
+from bisect import bisect_left
+
+from ripple_api.ledger_dump import resolve_ledger_index
+from ripple_api.pagination import Paginator
+
+BIDS = 'bids'
+ASKS = 'asks'
+
+
+def parse_issue(issue) -> dict:
+    """
+    Normalize currency of a market: 'XRP', 'USD+rIssuer' or {'currency': 'USD', 'issuer': 'rIssuer'}
+    """
+    if isinstance(issue, dict):
+        return issue
+    currency, _, issuer = issue.partition('+')
+    return dict(currency=currency, issuer=issuer) if issuer else dict(currency=currency)
+
+
+def amount_value(amount) -> float:
+    """
+    Value of rippled amount, XRP amounts in drops are converted to XRP
+    """
+    if isinstance(amount, dict):
+        return float(amount['value'])
+    return int(amount) / 1000000.0
+
+
+def _matches(amount, issue: dict) -> bool:
+    if isinstance(amount, dict):
+        return amount.get('currency') == issue['currency'] and amount.get('issuer') == issue.get('issuer')
+    return issue['currency'] == 'XRP'
+
+
+class _Levels(object):
+    """
+    Price levels of one side of the book: prices from best to worst with aggregated sizes,
+    cumulative sizes and cumulative notional
+    """
+    __slots__ = ('prices', 'sizes', 'cumulative_sizes', 'cumulative_notional')
+
+    def __init__(self, levels: list) -> None:
+        self.prices = array('d')
+        self.sizes = array('d')
+        self.cumulative_sizes = array('d')
+        self.cumulative_notional = array('d')
+        size_total = notional_total = 0.0
+        for price, size in levels:
+            size_total += size
+            notional_total += price * size
+            self.prices.append(price)
+            self.sizes.append(size)
+            self.cumulative_sizes.append(size_total)
+            self.cumulative_notional.append(notional_total)
+
+
+class OrderBook(object):
+    """
+    Order book of a market kept current locally: seeded from paginated book_offers of both sides
+    and updated with Offer nodes from metadata of later transactions. Prices are in `counter` per unit of `base`,
+    sizes in `base`, XRP in XRP rather than drops. Offers are taken at face value, their funding is not checked.
+    """
+    def __init__(self, base, counter) -> None:
+        """
+        :param base: currency traded, 'XRP', 'USD+rIssuer' or {'currency': 'USD', 'issuer': 'rIssuer'}
+        :param counter: currency prices are quoted in
+        """
+        self.base = parse_issue(base)
+        self.counter = parse_issue(counter)
+        self.ledger_index = None
+        self.offers = {}
+        self._levels = {}
+
+    def __repr__(self):
+        return '<OrderBook base=%r counter=%r ledger_index=%r offers=%r>' % (
+            self.base['currency'], self.counter['currency'], self.ledger_index, len(self.offers))
+
+    def seed(self, client, ledger_index='validated', limit: int = 400) -> None:
+        """
+        Load all offers of both sides from a single ledger version
+        :param client: RippleRPCClient sending the requests
+        :param ledger_index: index of the ledger version, or shortcut resolved to an index
+        :param limit: number of offers per page
+        :raises RippleAPIError: if a request fails
+        """
+        self.ledger_index = resolve_ledger_index(client, ledger_index)
+        self.offers = {}
+        for gets, pays in ((self.base, self.counter), (self.counter, self.base)):
+            params = dict(taker_gets=gets, taker_pays=pays, ledger_index=self.ledger_index, limit=limit)
+            for offer in Paginator(client, 'book_offers', params):
+                self._update(offer['index'], offer)
+        self._levels = {}
+
+    def follow(self, client, workers: int = 4, poll_interval: float = 1.0):
+        """
+        Apply every validated ledger after the seeded one, yielding the book after each ledger
+        :param client: RippleRPCClient sending the requests
+        :param workers: number of ledgers fetched concurrently while catching up
+        :param poll_interval: seconds between checks for a new validated ledger
+        """
+        follower = client.follow_ledgers(start=self.ledger_index + 1, workers=workers, poll_interval=poll_interval)
+        for ledger in follower:
+            self.apply_ledger(ledger)
+            yield self
+
+    def apply_ledger(self, ledger: dict) -> None:
+        """
+        Apply transactions of a ledger newer than the book
+        :param ledger: result of ledger method with expanded transactions
+        """
+        index = int(ledger.get('ledger_index', ledger.get('ledger', {}).get('ledger_index', 0)))
+        if self.ledger_index is not None and index <= self.ledger_index:
+            return
+        transactions = ledger.get('ledger', ledger).get('transactions', ())
+        metas = [tx.get('metaData') or tx.get('meta') or {} for tx in transactions]
+        # the ledger lists transactions by hash, they were applied in order of TransactionIndex
+        for meta in sorted(metas, key=lambda meta: meta.get('TransactionIndex', 0)):
+            self.apply_transaction(meta)
+        self.ledger_index = index
+
+    def apply_transaction(self, meta: dict) -> None:
+        """
+        Apply Offer nodes of transaction metadata
+        :param meta: metadata of a transaction
+        """
+        for affected in meta.get('AffectedNodes', ()):
+            kind, node = next(iter(affected.items()))
+            if node.get('LedgerEntryType') != 'Offer':
+                continue
+            index = node['LedgerIndex']
+            if kind == 'DeletedNode':
+                if self.offers.pop(index, None) is not None:
+                    self._levels = {}
+            else:
+                self._update(index, node.get('NewFields') or node.get('FinalFields') or {})
+
+    def best_bid(self) -> tuple:
+        """
+        :return: (price, size) of the highest bid level, None if there are no bids
+        """
+        return self._best(BIDS)
+
+    def best_ask(self) -> tuple:
+        """
+        :return: (price, size) of the lowest ask level, None if there are no asks
+        """
+        return self._best(ASKS)
+
+    def depth(self, side: str, levels: int = 10) -> list:
+        """
+        Best price levels of a side
+        :param side: 'bids' or 'asks'
+        :param levels: number of levels
+        :return: list of (price, size), best first
+        """
+        book = self.levels(side)
+        return list(zip(book.prices[:levels], book.sizes[:levels]))
+
+    def vwap(self, side: str, size: float) -> float:
+        """
+        Average price of taking `size` from a side: buying from asks or selling to bids
+        :return: volume weighted average price, None if the side is not deep enough
+        """
+        book = self.levels(side)
+        index = bisect_left(book.cumulative_sizes, size)
+        if size <= 0 or index >= len(book.prices):
+            return None
+        filled = book.cumulative_sizes[index - 1] if index else 0.0
+        notional = book.cumulative_notional[index - 1] if index else 0.0
+        return (notional + (size - filled) * book.prices[index]) / size
+
+    def market_impact(self, side: str, size: float) -> float:
+        """
+        Relative difference between the average price of taking `size` from a side and its best price
+        :return: fraction of the best price, None if the side is not deep enough
+        """
+        price = self.vwap(side, size)
+        if price is None:
+            return None
+        best = self.levels(side).prices[0]
+        return abs(price - best) / best
+
+    def levels(self, side: str) -> _Levels:
+        """
+        Price levels of a side, rebuilt after the book has changed
+        """
+        book = self._levels.get(side)
+        if book is None:
+            aggregated = {}
+            for offer_side, price, size in self.offers.values():
+                if offer_side == side:
+                    aggregated[price] = aggregated.get(price, 0.0) + size
+            book = self._levels[side] = _Levels(sorted(aggregated.items(), reverse=side == BIDS))
+        return book
+
+    def _best(self, side: str) -> tuple:
+        book = self.levels(side)
+        if not book.prices:
+            return None
+        return book.prices[0], book.sizes[0]
+
+    def _update(self, index: str, fields: dict) -> None:
+        gets, pays = fields.get('TakerGets'), fields.get('TakerPays')
+        if gets is None or pays is None:
+            return
+        if _matches(gets, self.base) and _matches(pays, self.counter):
+            side, size, notional = ASKS, amount_value(gets), amount_value(pays)
+        elif _matches(gets, self.counter) and _matches(pays, self.base):
+            side, size, notional = BIDS, amount_value(pays), amount_value(gets)
+        else:
+            return
+        if size > 0:
+            self.offers[index] = (side, notional / size, size)
+        else:
+            self.offers.pop(index, None)
+        self._levels = {}
@@ -0,0 +1,186 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ripple_api.exceptions import RippleAPIError
+
+# location of the list of items in responses of paginated methods
+PAGE_ITEMS = dict(
+    account_lines='lines',
+    account_objects='account_objects',
+    account_offers='offers',
+    account_tx='transactions',
+    book_offers='offers',
+    ledger_data='state',
+)
+
+
+def is_error(response: dict) -> bool:
+    """
+    Check if response of rippled or Data API reports an error
+    """
+    return not isinstance(response, dict) or response.get('status') == 'error' or \
+        response.get('result') == 'error' or 'error' in response
+
+
+class Paginator(object):
+    """
+    Iterator over items of a paginated rippled method which follows `marker` from page to page.
+    The next page is requested in background while items of the current one are consumed,
+    so at most two pages are held in memory.
+    `marker` is the position to resume from: the marker of the page being consumed, or of the next page
+    once the current page is exhausted. Resuming from it repeats at most the items of one page.
+    Requests are pinned to the ledger of the first response, so all pages come from the same ledger version,
+    account_tx is pinned to the ledger range of the first response instead.
+    """
+    def __init__(self, client, method: str, params: dict, marker=None, prefetch: bool = True) -> None:
+        """
+        :param client: RippleRPCClient sending the requests
+        :param method: JSON-RPC method of rippled
+        :param params: parameters of the request without marker
+        :param marker: marker of a previous iteration to resume from
+        :param prefetch: request the next page while the current one is consumed
+        """
+        self.client = client
+        self.method = method
+        self.key = PAGE_ITEMS.get(method)
+        self.params = dict(params)
+        self.marker = marker
+        self.prefetch = prefetch
+        self.pages_fetched = 0
+        self.done = False
+
+    def __repr__(self):
+        return '<Paginator method=%r marker=%r>' % (self.method, self.marker)
+
+    def __iter__(self):
+        for page in self.pages():
+            yield from page.get(self.key, ())
+
+    def pages(self):
+        """
+        Iterate over whole responses, following marker
+        :raises RippleAPIError: if a request fails
+        """
+        if self.done:
+            return
+        executor = ThreadPoolExecutor(1) if self.prefetch else None
+        try:
+            future = None
+            page = self._fetch(self.marker)
+            while True:
+                marker = page.get('marker')
+                if marker is not None and executor is not None:
+                    future = executor.submit(self._fetch, marker)
+                yield page
+                self.marker = marker
+                if marker is None:
+                    self.done = True
+                    return
+                page = future.result() if future is not None else self._fetch(marker)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def _fetch(self, marker) -> dict:
+        params = dict(self.params)
+        if marker is not None:
+            params['marker'] = marker
+        page = self.client._call(self.method, params)
+        if is_error(page):
+            raise RippleAPIError(page)
+        self.pages_fetched += 1
+        self._pin(page)
+        return page
+
+    def _pin(self, page: dict) -> None:
+        if 'ledger_hash' in self.params:
+            return
+        if self.method == 'account_tx':
+            # responses carry the range of validated ledgers searched, open ends of the range
+            # (-1) are fixed so that later pages do not include ledgers validated meanwhile
+            if 'ledger_index' not in self.params:
+                for name in ('ledger_index_min', 'ledger_index_max'):
+                    if self.params.get(name, -1) == -1 and isinstance(page.get(name), int):
+                        self.params[name] = page[name]
+        elif isinstance(page.get('ledger_index'), int):
+            # markers are only valid for the ledger version they were issued on
+            self.params['ledger_index'] = page['ledger_index']
+
+
+class PageSizeTuner(object):
+    """
+    Adjusts page size to the latency of the server: `limit` doubles after a full page
+    which arrived faster than `target_latency` and halves after a slower one, staying within bounds.
+    Can be shared between iterators of the same endpoint.
+    """
+    def __init__(self, initial: int = 100, minimum: int = 10, maximum: int = 1000,
+                 target_latency: float = 1.0) -> None:
+        """
+        :param initial: page size of the first request
+        :param minimum: smallest page size
+        :param maximum: largest page size the server accepts
+        :param target_latency: seconds a page is allowed to take
+        """
+        self.limit = min(max(initial, minimum), maximum)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<PageSizeTuner limit=%r>' % self.limit
+
+    def record(self, limit: int, items: int, latency: float) -> None:
+        """
+        Adjust page size after a response
+        :param limit: page size of the request
+        :param items: number of records in the response
+        :param latency: seconds the request took
+        """
+        with self._lock:
+            if latency > self.target_latency:
+                self.limit = max(self.minimum, limit // 2)
+            elif items >= limit:
+                self.limit = min(self.maximum, max(self.limit, limit * 2))
+
+
+class DataAPIPaginator(Paginator):
+    """
+    Iterator over records of a paginated Data API endpoint which follows `marker` from page to page,
+    requesting the next page in background while the current one is consumed.
+    Without explicit `limit` in params the page size is adjusted by `tuner`.
+    """
+    def __init__(self, client, url_params: tuple, params: dict, key: str, marker=None,
+                 prefetch: bool = True, tuner: PageSizeTuner = None) -> None:
+        """
+        :param client: RippleDataAPIClient sending the requests
+        :param url_params: url parameters which are forming endpoint
+        :param params: query params without marker
+        :param key: name of the array with records, e.g. 'transactions' or 'exchanges'
+        :param marker: marker of a previous iteration to resume from
+        :param prefetch: request the next page while the current one is consumed
+        :param tuner: page size tuner, used unless params specify limit
+        """
+        super(DataAPIPaginator, self).__init__(client, None, params, marker=marker, prefetch=prefetch)
+        self.url_params = url_params
+        self.key = key
+        self.tuner = tuner if 'limit' not in params else None
+
+    def __repr__(self):
+        return '<DataAPIPaginator url_params=%r marker=%r>' % (self.url_params, self.marker)
+
+    def _fetch(self, marker) -> dict:
+        params = dict(self.params)
+        if marker is not None:
+            params['marker'] = marker
+        if self.tuner is not None:
+            params['limit'] = self.tuner.limit
+        start = time.monotonic()
+        page = self.client._call(self.url_params, params)
+        if is_error(page):
+            raise RippleAPIError(page)
+        if self.tuner is not None:
+            self.tuner.record(params['limit'], len(page.get(self.key, ())), time.monotonic() - start)
+        self.pages_fetched += 1
+        return page
@@ -0,0 +1,115 @@
+import heapq
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ripple_api.ledger_dump import resolve_ledger_index
+from ripple_api.pagination import is_error
+
+# columns of the snapshot: name, array typecode and field of AccountRoot,
+# 'L' is the smallest unsigned typecode guaranteed to hold 32 bits ('I' may be 16 bits wide)
+COLUMNS = (
+    ('balances', 'q', 'Balance'),
+    ('sequences', 'L', 'Sequence'),
+    ('owner_counts', 'L', 'OwnerCount'),
+    ('flags', 'L', 'Flags'),
+)
+
+
+class AccountSnapshot(object):
+    """
+    State of many accounts in a single ledger version stored column-wise: `addresses` is a list
+    and `balances` (drops), `sequences`, `owner_counts` and `flags` are parallel arrays of integers.
+    Accounts which could not be fetched are listed in `errors` with their error responses.
+    """
+    def __init__(self, ledger_index: int) -> None:
+        """
+        :param ledger_index: index of the ledger version the accounts were read from
+        """
+        self.ledger_index = ledger_index
+        self.addresses = []
+        for name, typecode, _ in COLUMNS:
+            setattr(self, name, array(typecode))
+        self.errors = {}
+        self._positions = None
+
+    def __repr__(self):
+        return '<AccountSnapshot ledger_index=%r accounts=%r>' % (self.ledger_index, len(self.addresses))
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def append(self, address: str, account_data: dict) -> None:
+        """
+        Add account to the snapshot
+        :param address: address of the account
+        :param account_data: AccountRoot object from account_info response
+        """
+        self.addresses.append(address)
+        for name, _, field in COLUMNS:
+            getattr(self, name).append(int(account_data.get(field, 0)))
+        self._positions = None
+
+    def get(self, address: str) -> dict:
+        """
+        Get columns of a single account
+        :return: dict with address, Balance, Sequence, OwnerCount and Flags, None if account is not in the snapshot
+        """
+        if self._positions is None:
+            self._positions = {address: index for index, address in enumerate(self.addresses)}
+        index = self._positions.get(address)
+        if index is None:
+            return None
+        row = dict(address=address)
+        for name, _, field in COLUMNS:
+            row[field] = getattr(self, name)[index]
+        return row
+
+    def sum(self, column: str = 'balances') -> int:
+        """
+        Sum of a column, e.g. total balance in drops
+        """
+        return sum(getattr(self, column))
+
+    def top(self, n: int, column: str = 'balances') -> list:
+        """
+        Accounts with the largest values of a column
+        :return: list of (address, value), largest first
+        """
+        values = getattr(self, column)
+        indexes = heapq.nlargest(n, range(len(values)), key=values.__getitem__)
+        return [(self.addresses[index], values[index]) for index in indexes]
+
+
+def fetch_accounts(client, addresses, ledger_index='validated', max_in_flight: int = 16) -> AccountSnapshot:
+    """
+    Fetch account_info of many accounts concurrently, all from the same ledger version
+    :param client: RippleRPCClient sending the requests
+    :param addresses: iterable of addresses
+    :param ledger_index: index of the ledger version, or shortcut resolved to an index once
+    :param max_in_flight: maximum number of requests sent at once
+    """
+    snapshot = AccountSnapshot(resolve_ledger_index(client, ledger_index))
+
+    def fetch(address: str) -> dict:
+        # queue data is only available for the current ledger
+        return client.account_info(address, ledger_index=snapshot.ledger_index, queue=False)
+
+    with ThreadPoolExecutor(max_in_flight, thread_name_prefix='ripple-accounts') as executor:
+        # keep a bounded window of requests ahead of the results being collected
+        window = deque()
+        for address in addresses:
+            window.append((address, executor.submit(fetch, address)))
+            if len(window) >= max_in_flight * 4:
+                _collect(snapshot, *window.popleft())
+        while window:
+            _collect(snapshot, *window.popleft())
+    return snapshot
+
+
+def _collect(snapshot: AccountSnapshot, address: str, future) -> None:
+    response = future.result()
+    if is_error(response) or 'account_data' not in response:
+        snapshot.errors[address] = response
+    else:
+        snapshot.append(address, response['account_data'])
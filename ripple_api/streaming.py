@@ -0,0 +1,186 @@
+import codecs
+import json
+import re
+from urllib.error import URLError
+
+from ripple_api.exceptions import RippleAPIError
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+_SCALAR = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null')
+# characters which may follow a scalar, a match ending elsewhere may continue in the next chunk
+_DELIMITERS = frozenset(',]} \t\n\r')
+
+
+class _Reader(object):
+    """
+    Buffer over a file-like object holding only the part of the document that is being decoded
+    """
+    def __init__(self, fp, chunk_size: int) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self.decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError('Expecting one of {!r}, got {!r}'.format(chars, char))
+        self.pos += 1
+        return char
+
+    def value(self):
+        if self.peek() in ('{', '[', '"'):
+            self._end(keep=True)
+            value, self.pos = self.json.raw_decode(self.buf, self.pos)
+            return value
+        while True:
+            match = _SCALAR.match(self.buf, self.pos)
+            if match is not None and (self.eof or (match.end() < len(self.buf) and
+                                                   self.buf[match.end()] in _DELIMITERS)):
+                self.pos = match.end()
+                return json.loads(match.group())
+            if not self.fill():
+                raise ValueError('Invalid JSON value at {!r}'.format(self.buf[self.pos:self.pos + 20]))
+
+    def skip(self) -> None:
+        if self.peek() in ('{', '[', '"'):
+            self.pos = self._end(keep=False)
+        else:
+            self.value()
+
+    def _end(self, keep: bool) -> int:
+        """
+        Find end of the container or string starting at current position, reading more data when needed.
+        If keep is False, scanned data is dropped from the buffer as scanning goes.
+        """
+        depth = 0
+        index = self.pos
+        while True:
+            match = _STRUCTURE.search(self.buf, index)
+            if match is not None and match.group() == '"':
+                string = _STRING.match(self.buf, match.start())
+                if string is not None:
+                    index = string.end()
+                    if depth == 0:
+                        return index
+                    continue
+                index = match.start()
+            elif match is not None:
+                index = match.end()
+                depth += 1 if match.group() in '[{' else -1
+                if depth == 0:
+                    return index
+                continue
+            else:
+                index = len(self.buf)
+            if not keep:
+                self.pos = index
+            offset = self.pos
+            if not self.fill():
+                raise ValueError('Unexpected end of JSON document')
+            index -= offset
+
+
+class JSONStream(object):
+    """
+    Iterator over elements of a JSON array nested in a response, decoded incrementally as the body arrives,
+    so memory usage is bounded by a single element rather than the whole response.
+    Scalar fields met on the way to the array and after it (e.g. ledger_index, status) and fields listed
+    in `keep` are collected into `fields`, which is complete once iteration is over.
+    """
+    def __init__(self, open_response, path: tuple, chunk_size: int = 64 * 1024,
+                 keep: tuple = ('marker', )) -> None:
+        """
+        :param open_response: callable returning context manager which yields file-like response body
+        :param path: keys of nested objects leading to the array, e.g. ('result', 'ledger', 'transactions')
+        :param chunk_size: number of bytes read at once
+        :param keep: names of fields collected even if their values are objects or arrays
+        """
+        self.open_response = open_response
+        self.path = tuple(path)
+        self.chunk_size = chunk_size
+        self.keep = keep
+        self.fields = {}
+        self.found = False
+
+    def __repr__(self):
+        return '<JSONStream path=%r>' % (self.path, )
+
+    def __iter__(self):
+        try:
+            with self.open_response() as fp:
+                yield from self._items(_Reader(fp, self.chunk_size))
+        except URLError as err:
+            raise RippleAPIError({"status": "error", "msg": err})
+        if not self.found and (self.fields.get('status') == 'error' or
+                               self.fields.get('result') == 'error' or 'error' in self.fields):
+            raise RippleAPIError(self.fields)
+
+    def _items(self, reader: _Reader):
+        depth = 0
+        for key in self.path:
+            reader.expect('{')
+            depth += 1
+            if not self._find(reader, key):
+                depth -= 1
+                break
+        else:
+            if reader.peek() == '[':
+                reader.expect('[')
+                self.found = True
+                if reader.peek() == ']':
+                    reader.expect(']')
+                else:
+                    while True:
+                        yield reader.value()
+                        if reader.expect(',]') == ']':
+                            break
+            else:
+                reader.skip()
+        for _ in range(depth):
+            self._find(reader, None)
+
+    def _find(self, reader: _Reader, key) -> bool:
+        """
+        Read members of an object until `key`, collecting scalar values
+        :return: True if reader is positioned at the value of `key`, False if the object has ended
+        """
+        while True:
+            char = reader.peek()
+            if char == ',':
+                reader.expect(',')
+                char = reader.peek()
+            if char == '}':
+                reader.expect('}')
+                return False
+            name = reader.value()
+            reader.expect(':')
+            if name == key:
+                return True
+            if reader.peek() in ('{', '[') and name not in self.keep:
+                reader.skip()
+            else:
+                self.fields[name] = reader.value()
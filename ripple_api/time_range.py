@@ -0,0 +1,176 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from ripple_api.exceptions import RippleAPIError
+from ripple_api.pagination import DataAPIPaginator, is_error
+
+
+def to_timestamp(value) -> int:
+    """
+    Convert datetime, ISO 8601 string or UNIX timestamp to UNIX timestamp, naive times are UTC
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def to_iso(timestamp: int) -> str:
+    """
+    Format UNIX timestamp as ISO 8601 time accepted by Data API
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class _Interval(object):
+    __slots__ = ('start', 'end', 'records')
+
+    def __init__(self, start: int, end: int) -> None:
+        self.start = start
+        self.end = end
+        self.records = None
+
+
+class TimeRangeFetcher(object):
+    """
+    Downloads records of a Data API endpoint between `start` and `end` by splitting the time range
+    into intervals which are paged concurrently, at most `max_concurrency` requests at once.
+    An interval whose first page is full is split: the seconds completely covered by that page are kept,
+    the rest is split in halves, so busy periods are spread over more workers.
+    Records are yielded ordered by `time_field`; records of finished intervals wait in memory
+    until all earlier intervals are finished.
+    """
+    def __init__(self, client, url_params: tuple, params: dict, key: str, start, end,
+                 intervals: int = 16, max_concurrency: int = 8, limit: int = 1000,
+                 min_interval: int = 60, time_field: str = 'executed_time') -> None:
+        """
+        :param client: RippleDataAPIClient sending the requests
+        :param url_params: url parameters which are forming endpoint
+        :param params: query params without start, end, limit and marker
+        :param key: name of the array with records, e.g. 'payments' or 'exchanges'
+        :param start: beginning of the time range, datetime, ISO 8601 string or UNIX timestamp
+        :param end: end of the time range, inclusive
+        :param intervals: number of intervals the range is split into initially
+        :param max_concurrency: maximum number of requests in flight
+        :param limit: page size
+        :param min_interval: seconds, shorter intervals are paged by marker instead of being split
+        :param time_field: field of records holding their time
+        """
+        self.client = client
+        self.url_params = url_params
+        self.params = dict(params)
+        self.key = key
+        self.start = to_timestamp(start)
+        self.end = to_timestamp(end)
+        self.intervals = intervals
+        self.max_concurrency = max_concurrency
+        self.limit = limit
+        self.min_interval = min_interval
+        self.time_field = time_field
+        self._lock = threading.Lock()
+        self._stats = dict(requests=0, splits=0, records=0)
+
+    def __repr__(self):
+        return '<TimeRangeFetcher url_params=%r start=%r end=%r>' % (
+            self.url_params, to_iso(self.start), to_iso(self.end))
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: number of pages requested, intervals split and records yielded
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def split(self, start: int, end: int, parts: int) -> list:
+        """
+        Split closed range of whole seconds into up to `parts` adjacent intervals
+        """
+        span = end - start + 1
+        parts = max(1, min(parts, span))
+        bounds = [start + span * index // parts for index in range(parts + 1)]
+        return [_Interval(bounds[index], bounds[index + 1] - 1) for index in range(parts)]
+
+    def __iter__(self):
+        pending = self.split(self.start, self.end, self.intervals)
+        with ThreadPoolExecutor(self.max_concurrency, thread_name_prefix='ripple-range') as executor:
+            futures = {executor.submit(self._fetch, interval): interval for interval in pending}
+            # an interval is done once its records are set
+            try:
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        interval = futures.pop(future)
+                        parts = future.result()
+                        if parts:
+                            self._count('splits', 1)
+                            index = pending.index(interval)
+                            pending[index:index + 1] = parts
+                            for part in parts:
+                                if part.records is None:
+                                    futures[executor.submit(self._fetch, part)] = part
+                    while pending and pending[0].records is not None:
+                        records = pending.pop(0).records
+                        self._count('records', len(records))
+                        yield from records
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _count(self, name: str, value: int) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def _time(self, record: dict) -> int:
+        value = record.get(self.time_field)
+        return to_timestamp(value) if value else 0
+
+    def _fetch(self, interval: _Interval) -> list:
+        """
+        Download records of the interval, or split it if it does not fit into a page
+        :return: sub-intervals replacing the interval, None if records of the interval are downloaded
+        """
+        params = dict(self.params, start=to_iso(interval.start), end=to_iso(interval.end), limit=self.limit)
+        page = self.client._call(self.url_params, params)
+        self._count('requests', 1)
+        if is_error(page):
+            raise RippleAPIError(page)
+        records = list(page.get(self.key, ()))
+        marker = page.get('marker')
+        if marker is not None and interval.end - interval.start + 1 >= 2 * self.min_interval:
+            return self._split_page(interval, records)
+        if marker is not None:
+            pages = DataAPIPaginator(self.client, self.url_params, params, self.key, marker=marker, prefetch=False)
+            records.extend(pages)
+            self._count('requests', pages.pages_fetched)
+        records.sort(key=self._time)
+        interval.records = records
+        return None
+
+    def _split_page(self, interval: _Interval, records: list) -> list:
+        """
+        Split interval whose first page is full. Records of the page are the earliest ones of the interval
+        (the latest ones if the query is descending), all of them except those of its last second are complete,
+        so they form a finished sub-interval and only the rest is downloaded again.
+        """
+        times = [self._time(record) for record in records]
+        if str(self.params.get('descending', '')).lower() != 'true':
+            last = max(times, default=interval.start)
+            if last <= interval.start:
+                return self.split(interval.start, interval.end, 2)
+            covered = _Interval(interval.start, last - 1)
+            rest = self.split(last, interval.end, 2)
+            parts = [covered] + rest
+        else:
+            first = min(times, default=interval.end)
+            if first >= interval.end:
+                return self.split(interval.start, interval.end, 2)
+            covered = _Interval(first + 1, interval.end)
+            parts = self.split(interval.start, first, 2) + [covered]
+        covered.records = sorted((record for record, timestamp in zip(records, times)
+                                  if covered.start <= timestamp <= covered.end), key=self._time)
+        return parts
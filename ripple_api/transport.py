@@ -0,0 +1,386 @@
+import gzip
+import http.client
+import select
+import ssl
+import threading
+import time
+import zlib
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from io import BytesIO
+from urllib.parse import urlsplit
+from urllib.error import HTTPError, URLError
+
+from ripple_api.codec import BufferPool
+
+Response = namedtuple('Response', ('status', 'reason', 'headers', 'body'))
+
+ACCEPT_ENCODING = 'gzip, deflate'
+
+
+def decompressor(encoding: str):
+    """
+    Create decompressor for Content-Encoding of a response
+    :param encoding: value of Content-Encoding header
+    :return: zlib decompress object, or None if body is not compressed
+    """
+    encoding = (encoding or '').strip().lower()
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        # detect gzip or zlib header automatically
+        return zlib.decompressobj(zlib.MAX_WBITS | 32)
+    return None
+
+
+def _dropped(conn: http.client.HTTPConnection) -> bool:
+    """
+    Check if an idle connection was closed by the server
+    :param conn: idle connection
+    :return: True if the socket is closed or has pending data, which for an idle
+    HTTP connection can only be the end of stream or garbage
+    """
+    if conn.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class BodyReader(object):
+    """
+    File-like reader of a response body which decompresses it on the fly
+    and reports bytes received and decompression time to the transport
+    """
+    def __init__(self, fp, encoding: str, stats) -> None:
+        """
+        :param fp: raw response body
+        :param encoding: value of Content-Encoding header
+        :param stats: callable receiving (bytes on wire, decoded bytes, decompression time)
+        """
+        self.fp = fp
+        self.stats = stats
+        self.decompressor = decompressor(encoding)
+        self.raw_deflate = False
+        self.buffer = b''
+        self.eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        if self.decompressor is None:
+            data = self.fp.read() if size is None or size < 0 else self.fp.read(size)
+            self.stats(len(data), len(data), 0)
+            return data
+        if size is None or size < 0:
+            chunks = [self.read(64 * 1024)]
+            while chunks[-1]:
+                chunks.append(self.read(64 * 1024))
+            return b''.join(chunks)
+        while len(self.buffer) < size and not self.eof:
+            raw = self.fp.read(max(size, 8192))
+            self.buffer += self._decompress(raw)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def _decompress(self, raw: bytes) -> bytes:
+        start = time.perf_counter()
+        try:
+            if raw:
+                data = self.decompressor.decompress(raw)
+            else:
+                self.eof = True
+                data = self.decompressor.flush()
+        except zlib.error:
+            if self.raw_deflate:
+                raise
+            # some servers send deflate without zlib header
+            self.raw_deflate = True
+            self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decompress(raw)
+        self.stats(len(raw), len(data), time.perf_counter() - start)
+        return data
+
+
+class ResponseError(URLError):
+    """
+    Connection failed after the request was sent, the server may have processed it
+    """
+
+
+class StreamReader(object):
+    """
+    Body of a streamed response handed to the caller, failures of the connection while reading
+    are raised as URLError, exceptions of the caller's own code pass through unchanged
+    """
+    def __init__(self, reader: BodyReader) -> None:
+        self.reader = reader
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            return self.reader.read(size)
+        except (http.client.HTTPException, OSError, zlib.error) as err:
+            raise ResponseError(err)
+
+
+class HTTPTransport(object):
+    """
+    Thread-safe pool of persistent HTTP(S) connections.
+    Connections are kept alive between requests and reused per (scheme, host, port),
+    so consecutive calls to the same node skip the TCP and TLS handshakes.
+    """
+    def __init__(self, pool_size: int = 10, max_per_host: int = 10,
+                 idle_timeout: float = 30.0, timeout: float = 60.0,
+                 ssl_context: ssl.SSLContext = None, compression: bool = True,
+                 compress_requests: int = None) -> None:
+        """
+        :param pool_size: maximum number of idle connections kept open across all hosts
+        :param max_per_host: maximum number of simultaneously open connections to a single host,
+        callers above the limit wait for a free slot
+        :param idle_timeout: seconds after which an idle connection is closed instead of reused
+        :param timeout: socket timeout of each connection
+        :param ssl_context: SSL context for https connections
+        :param compression: ask servers for gzip/deflate compressed responses
+        :param compress_requests: gzip request bodies of at least this many bytes,
+        only for servers accepting compressed requests, None disables compression of requests
+        """
+        self.pool_size = pool_size
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.compression = compression
+        self.compress_requests = compress_requests
+        self.buffers = BufferPool()
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+        self._idle_count = 0
+        self._stats = dict(
+            requests=0,
+            connections_opened=0,
+            connections_reused=0,
+            connections_evicted=0,
+            bytes_sent=0,
+            bytes_received=0,
+            bytes_decoded=0,
+            decompress_time=0.0,
+        )
+
+    def __repr__(self):
+        return '<HTTPTransport pool_size=%r max_per_host=%r>' % (
+            self.pool_size, self.max_per_host)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Connection reuse and traffic statistics
+        :return: counters of requests made, connections opened, reused and evicted,
+        bytes sent, bytes received on the wire, bytes after decompression and seconds spent decompressing
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle_connections'] = self._idle_count
+        return stats
+
+    def request(self, method: str, url: str, body: bytes = None,
+                headers: dict = None, decode=None) -> Response:
+        """
+        Send request over a pooled connection
+        :param method: HTTP method
+        :param url: absolute URL of the resource
+        :param body: request body
+        :param headers: request headers
+        :param decode: callable decoding successful response body, it receives a memoryview
+        of a pooled buffer which is reused after the call, so it must not keep references to it
+        :return: response with fully read body, or result of decode as body
+        :raises HTTPError: if server responded with status code >= 400
+        :raises URLError: if connection to the server failed, ResponseError if it failed after the request was sent
+        """
+        key, path = self._split(url)
+        body, headers = self._prepare(body, headers)
+        slot = self._slot(key)
+        slot.acquire()
+        try:
+            conn, res = self._open(key, method, path, body, headers)
+            try:
+                if decode is not None and res.status < 400:
+                    data = self._decode(res, decode)
+                else:
+                    data = self._reader(res).read()
+            except (http.client.HTTPException, OSError, zlib.error) as err:
+                raise ResponseError(err)
+            finally:
+                # connection is closed unless the body was read to the end
+                self._finish(key, conn, res)
+        finally:
+            slot.release()
+        if res.status >= 400:
+            raise HTTPError(url, res.status, res.reason, res.headers, BytesIO(data))
+        return Response(res.status, res.reason, res.headers, data)
+
+    @contextmanager
+    def stream(self, method: str, url: str, body: bytes = None, headers: dict = None):
+        """
+        Send request over a pooled connection without reading the response body,
+        connection returns to the pool on exit if the body was read to the end
+        :param method: HTTP method
+        :param url: absolute URL of the resource
+        :param body: request body
+        :param headers: request headers
+        :return: context manager yielding file-like decompressed response body
+        :raises HTTPError: if server responded with status code >= 400
+        :raises URLError: if connection to the server failed, ResponseError if it failed after the request was sent
+        """
+        key, path = self._split(url)
+        body, headers = self._prepare(body, headers)
+        slot = self._slot(key)
+        slot.acquire()
+        try:
+            conn, res = self._open(key, method, path, body, headers)
+            try:
+                reader = StreamReader(self._reader(res))
+                if res.status >= 400:
+                    data = reader.read()
+                    raise HTTPError(url, res.status, res.reason, res.headers, BytesIO(data))
+                yield reader
+            finally:
+                # connection is closed unless the body was read to the end
+                self._finish(key, conn, res)
+        finally:
+            slot.release()
+
+    def close(self) -> None:
+        """
+        Close all idle connections
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+            self._idle_count = 0
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+    def _prepare(self, body: bytes, headers: dict) -> tuple:
+        headers = {} if headers is None else dict(headers)
+        if self.compression:
+            headers.setdefault('Accept-Encoding', ACCEPT_ENCODING)
+        if body and self.compress_requests is not None and len(body) >= self.compress_requests:
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        if body:
+            with self._lock:
+                self._stats['bytes_sent'] += len(body)
+        return body, headers
+
+    def _decode(self, res: http.client.HTTPResponse, decode):
+        reader = self._reader(res)
+        length = res.length
+        if reader.decompressor is not None or length is None:
+            return decode(memoryview(reader.read()))
+        buffer = self.buffers.acquire(length)
+        try:
+            view = memoryview(buffer)[:length]
+            received = 0
+            while received < length:
+                size = res.readinto(view[received:])
+                if not size:
+                    raise http.client.IncompleteRead(view[:received].tobytes(), length - received)
+                received += size
+            self._count(length, length, 0)
+            return decode(view)
+        finally:
+            self.buffers.release(buffer)
+
+    def _reader(self, res: http.client.HTTPResponse) -> BodyReader:
+        return BodyReader(res, res.headers.get('Content-Encoding'), self._count)
+
+    def _count(self, received: int, decoded: int, elapsed: float) -> None:
+        with self._lock:
+            self._stats['bytes_received'] += received
+            self._stats['bytes_decoded'] += decoded
+            self._stats['decompress_time'] += elapsed
+
+    @staticmethod
+    def _split(url: str) -> tuple:
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path = '{}?{}'.format(path, parts.query)
+        return (parts.scheme, parts.hostname, parts.port), path
+
+    def _open(self, key: tuple, method: str, path: str, body: bytes,
+              headers: dict) -> tuple:
+        conn, reused = self._acquire(key)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+        except (http.client.HTTPException, OSError) as err:
+            conn.close()
+            if reused:
+                # keep-alive connection was closed by the server while idle and
+                # the request did not reach it, so it is safe to send it again on a fresh one
+                return self._open(key, method, path, body, headers)
+            raise URLError(err)
+        try:
+            res = conn.getresponse()
+        except (http.client.HTTPException, OSError) as err:
+            # the server may have processed the request already, it is never resent
+            # as that could e.g. submit a transaction twice
+            conn.close()
+            raise ResponseError(err)
+        return conn, res
+
+    def _finish(self, key: tuple, conn: http.client.HTTPConnection,
+                res: http.client.HTTPResponse) -> None:
+        with self._lock:
+            self._stats['requests'] += 1
+        if res.isclosed() and not res.will_close:
+            self._release(key, conn)
+        else:
+            conn.close()
+
+    def _slot(self, key: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def _acquire(self, key: tuple) -> tuple:
+        now = time.monotonic()
+        stale = []
+        conn = None
+        with self._lock:
+            connections = self._idle.get(key)
+            while connections:
+                candidate, last_used = connections.pop()
+                self._idle_count -= 1
+                if now - last_used > self.idle_timeout or _dropped(candidate):
+                    stale.append(candidate)
+                    self._stats['connections_evicted'] += 1
+                    continue
+                conn = candidate
+                self._stats['connections_reused'] += 1
+                break
+            if conn is None:
+                self._stats['connections_opened'] += 1
+        for candidate in stale:
+            candidate.close()
+        if conn is not None:
+            return conn, True
+        return self._connect(key), False
+
+    def _release(self, key: tuple, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if self._idle_count < self.pool_size:
+                self._idle.setdefault(key, deque()).append((conn, time.monotonic()))
+                self._idle_count += 1
+                return
+            self._stats['connections_evicted'] += 1
+        conn.close()
+
+    def _connect(self, key: tuple) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == 'https':
+            context = self.ssl_context or ssl.create_default_context()
+            return http.client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
@@ -1,8 +1,154 @@
+import hashlib
+import json
+import secrets
 import string
+from concurrent.futures import ProcessPoolExecutor
 from random import choice
 
 RIPPLED_B58_DICT = 'rpshnaf39wBUDNEGHJKLM4PQRST7VWXYZ2bcdeCg65jkm8oFqi1tuvAxyz'
 
+ACCOUNT_ID_PREFIX = 0x00
+ACCOUNT_PUBLIC_KEY_PREFIX = b'\x23'
+SEED_PREFIX = b'\x21'
+ED25519_SEED_PREFIX = b'\x01\xe1\x4b'
+
+
+def _decode_table() -> bytes:
+    table = bytearray(b'\xff' * 256)
+    for index, char in enumerate(RIPPLED_B58_DICT):
+        table[ord(char)] = index
+    return bytes(table)
+
+
+# byte of a character -> its value, 0xff for characters outside of the alphabet
+_B58_VALUES = _decode_table()
+# every pair of characters, so encoding takes one division per two characters
+_B58_PAIRS = [first + second for first in RIPPLED_B58_DICT for second in RIPPLED_B58_DICT]
+_ZERO_CHAR = RIPPLED_B58_DICT[0]
+
+
+def _checksum(data: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4]
+
+
+def b58encode(data: bytes) -> str:
+    """
+    Encode bytes in the Ripple base58 alphabet
+    """
+    number = int.from_bytes(data, 'big')
+    chunks = []
+    while number:
+        number, rest = divmod(number, 3364)
+        chunks.append(_B58_PAIRS[rest])
+    # every leading zero byte is encoded as the first character of the alphabet
+    zeros = len(data) - len(data.lstrip(b'\0'))
+    return _ZERO_CHAR * zeros + ''.join(reversed(chunks)).lstrip(_ZERO_CHAR)
+
+
+def _b58decode(text: str):
+    try:
+        digits = text.encode('ascii').translate(_B58_VALUES)
+    except UnicodeEncodeError:
+        return None
+    if 0xff in digits:
+        return None
+    # two digits per step halves the number of big integer operations
+    number = digits[0] if len(digits) & 1 else 0
+    pairs = iter(digits[len(digits) & 1:])
+    for high, low in zip(pairs, pairs):
+        number = number * 3364 + high * 58 + low
+    zeros = len(text) - len(text.lstrip(_ZERO_CHAR))
+    return bytes(zeros) + number.to_bytes((number.bit_length() + 7) // 8, 'big')
+
+
+def b58decode(text: str) -> bytes:
+    """
+    Decode string in the Ripple base58 alphabet
+    :raises ValueError: if text has characters outside of the alphabet
+    """
+    data = _b58decode(text)
+    if data is None:
+        raise ValueError('Invalid base58 string: {!r}'.format(text))
+    return data
+
+
+def b58check_encode(payload: bytes) -> str:
+    """
+    Encode version prefix and payload with checksum in the Ripple base58 alphabet
+    """
+    return b58encode(payload + _checksum(payload))
+
+
+def b58check_decode(text: str) -> bytes:
+    """
+    Decode base58check string to version prefix and payload
+    :raises ValueError: if text has characters outside of the alphabet or its checksum does not match
+    """
+    data = _b58decode(text)
+    if data is None or len(data) < 5 or _checksum(data[:-4]) != data[-4:]:
+        raise ValueError('Invalid base58 string: {!r}'.format(text))
+    return data[:-4]
+
+
+def encode_account_id(account_id: bytes) -> str:
+    """
+    Encode 20-byte account ID as classic address
+    """
+    return b58check_encode(bytes((ACCOUNT_ID_PREFIX, )) + account_id)
+
+
+def decode_account_id(address: str) -> bytes:
+    """
+    Decode classic address to 20-byte account ID
+    :raises ValueError: if address is malformed or its checksum does not match
+    """
+    data = b58check_decode(address)
+    if len(data) != 21 or data[0] != ACCOUNT_ID_PREFIX:
+        raise ValueError('Invalid address: {!r}'.format(address))
+    return data[1:]
+
+
+def is_valid_address(address: str) -> bool:
+    """
+    Check that classic address is well-formed and its checksum matches
+    """
+    if not isinstance(address, str) or not 25 <= len(address) <= 35 or address[0] != _ZERO_CHAR:
+        return False
+    data = _b58decode(address)
+    return data is not None and len(data) == 25 and data[0] == ACCOUNT_ID_PREFIX and \
+        _checksum(data[:21]) == data[21:]
+
+
+def validate_addresses(addresses) -> list:
+    """
+    Check many classic addresses locally, without asking a node
+    :param addresses: iterable of addresses
+    :return: list of booleans, True for every valid address, in order of addresses
+    """
+    return [is_valid_address(address) for address in addresses]
+
+
+def encode_seed(entropy: bytes, key_type: str = 'secp256k1') -> str:
+    """
+    Encode 16 bytes of seed entropy as base58 seed, 'sEd...' for ed25519 keys
+    """
+    prefix = ED25519_SEED_PREFIX if key_type == 'ed25519' else SEED_PREFIX
+    return b58check_encode(prefix + entropy)
+
+
+def decode_seed(seed: str) -> tuple:
+    """
+    Decode base58 seed
+    :return: (16 bytes of seed entropy, 'ed25519' for ed25519 seeds or None)
+    :raises ValueError: if seed is malformed or its checksum does not match
+    """
+    data = b58check_decode(seed)
+    if len(data) == 17 and data[:1] == SEED_PREFIX:
+        return data[1:], None
+    if len(data) == 19 and data[:3] == ED25519_SEED_PREFIX:
+        return data[3:], 'ed25519'
+    raise ValueError('Invalid seed: {!r}'.format(seed))
+
 
 def generate_seed(type: str = 'base58') -> str:
     if type == 'base58':
@@ -19,15 +165,188 @@ def generate_seed(type: str = 'base58') -> str:
 
 
 def b58_seed() -> str:
-    raise NotImplementedError()
+    """
+    Random base58 seed of secp256k1 keys, as master_seed of wallet_propose
+    """
+    return encode_seed(secrets.token_bytes(16))
 
 
 def rfc1751_seed() -> str:
-    raise NotImplementedError()
+    """
+    Random seed as RFC1751 words, as master_key of wallet_propose
+    """
+    return seed_to_rfc1751(secrets.token_bytes(16))
 
 
 def hex_seed() -> str:
-    raise NotImplementedError()
+    """
+    Random seed as 32 hex digits, as master_seed_hex of wallet_propose
+    """
+    return secrets.token_bytes(16).hex().upper()
+
+
+def _pair_sums() -> list:
+    # sum of the four 2-bit pairs of every byte
+    return [(byte & 3) + (byte >> 2 & 3) + (byte >> 4 & 3) + (byte >> 6) for byte in range(256)]
+
+
+_PAIR_SUMS = _pair_sums()
+_RFC1751_STANDARD = str.maketrans('105', 'LOS')
+
+
+def key_to_english(key: bytes) -> str:
+    """
+    Encode key as RFC1751 words, six words with two parity bits for every 8 bytes
+    """
+    if not key or len(key) % 8:
+        raise ValueError('Key length must be a multiple of 8 bytes')
+    words = []
+    for start in range(0, len(key), 8):
+        block = key[start:start + 8]
+        parity = sum(_PAIR_SUMS[byte] for byte in block) & 3
+        bits = int.from_bytes(block, 'big') << 2 | parity
+        words.extend(word_list[bits >> shift & 0x7ff] for shift in (55, 44, 33, 22, 11, 0))
+    return ' '.join(words)
+
+
+def english_to_key(english: str) -> bytes:
+    """
+    Decode RFC1751 words to key, words are case-insensitive
+    :raises ValueError: if a word is unknown, number of words is not a multiple of six or parity does not match
+    """
+    words = english.upper().translate(_RFC1751_STANDARD).split()
+    if not words or len(words) % 6:
+        raise ValueError('Number of words must be a multiple of 6')
+    key = b''
+    for start in range(0, len(words), 6):
+        bits = 0
+        for word in words[start:start + 6]:
+            index = _WORD_INDEX.get(word)
+            if index is None:
+                raise ValueError('Unknown RFC1751 word: {!r}'.format(word))
+            bits = bits << 11 | index
+        block = (bits >> 2).to_bytes(8, 'big')
+        if sum(_PAIR_SUMS[byte] for byte in block) & 3 != bits & 3:
+            raise ValueError('Parity of RFC1751 words does not match')
+        key += block
+    return key
+
+
+def seed_to_rfc1751(entropy: bytes) -> str:
+    """
+    Encode 16 bytes of seed entropy as RFC1751 words the way rippled does, with bytes reversed
+    """
+    return key_to_english(entropy[::-1])
+
+
+def rfc1751_to_seed(english: str) -> bytes:
+    """
+    Decode RFC1751 words of rippled to 16 bytes of seed entropy
+    :raises ValueError: if words are malformed
+    """
+    key = english_to_key(english)
+    if len(key) != 16:
+        raise ValueError('RFC1751 seed must be 12 words long')
+    return key[::-1]
+
+
+SEED_FORMATS = dict(
+    base58=encode_seed,
+    rfc1751=seed_to_rfc1751,
+    hex=lambda entropy: entropy.hex().upper(),
+)
+
+
+def seed_entropy(seed: str) -> tuple:
+    """
+    Decode seed in any of the formats of wallet_propose: base58, RFC1751 words or 32 hex digits
+    :return: (16 bytes of seed entropy, 'ed25519' for ed25519 seeds or None)
+    :raises ValueError: if seed is in neither of the formats
+    """
+    if ' ' in seed.strip():
+        return rfc1751_to_seed(seed), None
+    if len(seed) == 32:
+        try:
+            return bytes.fromhex(seed), None
+        except ValueError:
+            pass
+    return decode_seed(seed)
+
+
+def convert_seeds(seeds, to: str = 'base58') -> list:
+    """
+    Convert many seeds between formats locally, without wallet_propose
+    :param seeds: iterable of seeds in base58, RFC1751 words or 32 hex digits, may be mixed
+    :param to: 'base58', 'rfc1751' or 'hex'
+    :return: list of converted seeds in order of seeds
+    :raises ValueError: if a seed is malformed
+    """
+    encode = SEED_FORMATS[to]
+    converted = []
+    for seed in seeds:
+        entropy, key_type = seed_entropy(seed)
+        converted.append(encode_seed(entropy, key_type) if to == 'base58' else encode(entropy))
+    return converted
+
+
+def wallet(entropy: bytes, key_type: str = 'secp256k1') -> dict:
+    """
+    Keys and address of a seed in the shape of wallet_propose result
+    :param entropy: 16 bytes of seed entropy
+    :param key_type: 'secp256k1' or 'ed25519'
+    """
+    # keypairs depends on this module
+    from ripple_api.keypairs import Keypair
+
+    keypair = Keypair.from_entropy(entropy, key_type)
+    return dict(
+        account_id=keypair.address,
+        key_type=key_type,
+        master_key=seed_to_rfc1751(entropy),
+        # like rippled, master_seed has the prefix of secp256k1 seeds whatever the key type
+        master_seed=encode_seed(entropy),
+        master_seed_hex=entropy.hex().upper(),
+        public_key=b58check_encode(ACCOUNT_PUBLIC_KEY_PREFIX + keypair.public_key),
+        public_key_hex=keypair.public_key.hex().upper(),
+    )
+
+
+def _wallets(count: int, key_type: str) -> list:
+    return [wallet(secrets.token_bytes(16), key_type) for _ in range(count)]
+
+
+def generate_wallets(n: int, key_type: str = 'secp256k1', workers: int = None, path: str = None,
+                     chunk_size: int = 1000):
+    """
+    Generate random wallets locally, without wallet_propose of an admin node.
+    Large numbers of wallets are generated by worker processes in chunks.
+    :param n: number of wallets
+    :param key_type: 'secp256k1' or 'ed25519'
+    :param workers: number of processes, defaults to the number of CPUs, 1 generates in this process
+    :param path: file to write wallets to as JSON lines, chunk by chunk, instead of returning them
+    :param chunk_size: number of wallets generated by a process at once
+    :return: list of dicts with fields of wallet_propose result, or number of wallets written to path
+    """
+    if key_type not in ('secp256k1', 'ed25519'):
+        raise ValueError('Unknown key type: {!r}'.format(key_type))
+    sizes = [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+    if workers == 1 or len(sizes) <= 1:
+        chunks = (_wallets(size, key_type) for size in sizes)
+        return _collect(chunks, path)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _collect(executor.map(_wallets, sizes, [key_type] * len(sizes)), path)
+
+
+def _collect(chunks, path: str):
+    if path is None:
+        return [item for chunk in chunks for item in chunk]
+    written = 0
+    with open(path, 'w') as fp:
+        for chunk in chunks:
+            fp.write(''.join(json.dumps(item) + '\n' for item in chunk))
+            fp.flush()
+            written += len(chunk)
+    return written
 
 
 word_list = ["A", "ABE", "ACE", "ACT", "AD", "ADA", "ADD",
@@ -273,3 +592,6 @@ word_list = ["A", "ABE", "ACE", "ACT", "AD", "ADA", "ADD",
              "WORE", "WORK", "WORM", "WORN", "WOVE", "WRIT", "WYNN", "YALE",
              "YANG", "YANK", "YARD", "YARN", "YAWL", "YAWN", "YEAH", "YEAR",
              "YELL", "YOGA", "YOKE"]
+
+# word -> position in word_list, RFC1751 decoding looks words up in constant time
+_WORD_INDEX = {word: index for index, word in enumerate(word_list)}
@@ -0,0 +1,292 @@
+import base64
+import hashlib
+import http.client
+import itertools
+import os
+import socket
+import ssl
+import struct
+import threading
+from concurrent.futures import Future, TimeoutError
+from urllib.parse import urlsplit
+from urllib.error import URLError
+
+from ripple_api.codec import JSONCodec, default_codec
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+def accept_key(key: str) -> str:
+    """
+    Compute Sec-WebSocket-Accept value for a Sec-WebSocket-Key of the handshake
+    """
+    digest = hashlib.sha1((key + WEBSOCKET_GUID).encode('ascii')).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def mask_payload(payload: bytes, key: bytes) -> bytes:
+    """
+    Apply (or remove) WebSocket masking of the payload
+    """
+    length = len(payload)
+    mask = (key * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(mask, 'big')).to_bytes(length, 'big')
+
+
+def encode_frame(opcode: int, payload: bytes, mask: bool = True) -> bytes:
+    """
+    Encode single final WebSocket frame, frames sent by clients must be masked
+    """
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    header = bytearray((0x80 | opcode, ))
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack('>H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('>Q', length)
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = mask_payload(payload, key)
+    return bytes(header) + payload
+
+
+def read_frame(rfile) -> tuple:
+    """
+    Read single WebSocket frame from a buffered socket file
+    :return: tuple of (fin, opcode, unmasked payload)
+    """
+    def read_exactly(size):
+        data = rfile.read(size)
+        if len(data) < size:
+            raise ConnectionResetError('WebSocket connection closed')
+        return data
+
+    first, second = read_exactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack('>H', read_exactly(2))[0]
+    elif length == 127:
+        length = struct.unpack('>Q', read_exactly(8))[0]
+    key = read_exactly(4) if second & 0x80 else None
+    payload = read_exactly(length)
+    if key is not None:
+        payload = mask_payload(payload, key)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+class WebSocketTransport(object):
+    """
+    Multiplexed rippled WebSocket connection.
+    Every command is tagged with an id, any number of commands can be in flight on a single socket,
+    responses are matched to waiting callers by id regardless of the order they arrive in.
+    """
+    def __init__(self, url: str, timeout: float = 60.0,
+                 ssl_context: ssl.SSLContext = None, on_message=None,
+                 codec: JSONCodec = None) -> None:
+        """
+        :param url: ws:// or wss:// URL of rippled node
+        :param timeout: seconds to wait for connection and for each response
+        :param ssl_context: SSL context for wss connections
+        :param on_message: callback receiving messages which are not responses to commands (e.g. subscriptions),
+        it runs in the reader thread, exceptions it raises are counted in stats and do not break the connection
+        :param codec: JSON encoder/decoder of messages, defaults to the fastest installed one
+        """
+        self.url = url
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.on_message = on_message
+        self.codec = default_codec if codec is None else codec
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._sock = None
+        self._pending = {}
+        self._stats = dict(requests=0, connections_opened=0, callback_errors=0)
+
+    def __repr__(self):
+        return '<WebSocketTransport url=%r>' % self.url
+
+    @property
+    def stats(self) -> dict:
+        """
+        Connection statistics
+        :return: counters of commands sent, connections opened, exceptions raised by on_message callback
+        and commands awaiting response
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._pending)
+        return stats
+
+    def call(self, method: str, params: dict) -> dict:
+        """
+        Send command and wait for its response
+        :param method: rippled command
+        :param params: parameters of the command
+        :return: result of the command, or the whole response if command failed
+        :raises URLError: if connection failed or response did not arrive in time
+        """
+        request_id, future = self._send(method, params)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            raise URLError('timed out waiting for response to {}'.format(method))
+        finally:
+            # response arriving after the timeout goes to on_message like any unknown message
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def call_async(self, method: str, params: dict) -> Future:
+        """
+        Send command without waiting for its response
+        :param method: rippled command
+        :param params: parameters of the command
+        :return: future resolved with the same value as call() returns
+        """
+        return self._send(method, params)[1]
+
+    def _send(self, method: str, params: dict) -> tuple:
+        future = Future()
+        request_id = next(self._ids)
+        message = dict(params, id=request_id, command=method)
+        frame = encode_frame(OP_TEXT, self.codec.dumps(message))
+        try:
+            sock = self._connect()
+        except (OSError, URLError) as err:
+            future.set_exception(err if isinstance(err, URLError) else URLError(err))
+            return request_id, future
+        with self._lock:
+            if self._sock is not sock:
+                future.set_exception(URLError('WebSocket connection closed'))
+                return request_id, future
+            self._pending[request_id] = future
+            self._stats['requests'] += 1
+        try:
+            with self._send_lock:
+                sock.sendall(frame)
+        except OSError as err:
+            self._disconnect(sock, err)
+        return request_id, future
+
+    def close(self) -> None:
+        """
+        Close connection, commands in flight fail with URLError
+        """
+        with self._lock:
+            sock = self._sock
+        if sock is not None:
+            try:
+                with self._send_lock:
+                    sock.sendall(encode_frame(OP_CLOSE, b''))
+            except OSError:
+                pass
+            self._disconnect(sock, ConnectionAbortedError('WebSocket connection closed by client'))
+
+    def _connect(self) -> socket.socket:
+        with self._lock:
+            if self._sock is not None:
+                return self._sock
+        # handshake may take long, only callers waiting for the connection are blocked meanwhile
+        with self._connect_lock:
+            with self._lock:
+                if self._sock is not None:
+                    return self._sock
+            return self._open()
+
+    def _open(self) -> socket.socket:
+        parts = urlsplit(self.url)
+        secure = parts.scheme == 'wss'
+        port = parts.port or (443 if secure else 80)
+        sock = socket.create_connection((parts.hostname, port), timeout=self.timeout)
+        try:
+            if secure:
+                context = self.ssl_context or ssl.create_default_context()
+                sock = context.wrap_socket(sock, server_hostname=parts.hostname)
+            path = parts.path or '/'
+            if parts.query:
+                path = '{}?{}'.format(path, parts.query)
+            key = base64.b64encode(os.urandom(16)).decode('ascii')
+            handshake = ('GET {} HTTP/1.1\r\n'
+                         'Host: {}\r\n'
+                         'Upgrade: websocket\r\n'
+                         'Connection: Upgrade\r\n'
+                         'Sec-WebSocket-Key: {}\r\n'
+                         'Sec-WebSocket-Version: 13\r\n\r\n').format(path, parts.netloc, key)
+            sock.sendall(handshake.encode('latin-1'))
+            rfile = sock.makefile('rb')
+            status = rfile.readline().split()
+            headers = http.client.parse_headers(rfile)
+            if len(status) < 2 or status[1] != b'101':
+                raise URLError('WebSocket handshake failed: {}'.format(b' '.join(status).decode('latin-1')))
+            if headers.get('Sec-WebSocket-Accept') != accept_key(key):
+                raise URLError('WebSocket handshake failed: invalid Sec-WebSocket-Accept')
+        except Exception:
+            sock.close()
+            raise
+        sock.settimeout(None)
+        with self._lock:
+            self._sock = sock
+            self._stats['connections_opened'] += 1
+        reader = threading.Thread(target=self._read_loop, args=(sock, rfile), daemon=True)
+        reader.start()
+        return sock
+
+    def _disconnect(self, sock: socket.socket, err: Exception) -> None:
+        with self._lock:
+            if self._sock is not sock:
+                return
+            self._sock = None
+            pending, self._pending = self._pending, {}
+        sock.close()
+        for future in pending.values():
+            future.set_exception(URLError(err))
+
+    def _read_loop(self, sock: socket.socket, rfile) -> None:
+        fragments = []
+        try:
+            while True:
+                fin, opcode, payload = read_frame(rfile)
+                if opcode == OP_PING:
+                    with self._send_lock:
+                        sock.sendall(encode_frame(OP_PONG, payload))
+                elif opcode == OP_CLOSE:
+                    raise ConnectionAbortedError('WebSocket connection closed by server')
+                elif opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                    fragments.append(payload)
+                    if fin:
+                        self._dispatch(b''.join(fragments))
+                        fragments = []
+        except Exception as err:
+            # commands in flight fail instead of waiting for a reader which is gone
+            self._disconnect(sock, err)
+
+    def _dispatch(self, data: bytes) -> None:
+        message = self.codec.loads(data)
+        with self._lock:
+            future = self._pending.pop(message.get('id'), None)
+        if future is None:
+            if self.on_message is not None:
+                try:
+                    self.on_message(message)
+                except Exception:
+                    with self._lock:
+                        self._stats['callback_errors'] += 1
+            return
+        if message.get('status') == 'success' and 'result' in message:
+            future.set_result(message['result'])
+        else:
+            message.pop('id', None)
+            future.set_result(message)
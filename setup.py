@@ -6,6 +6,12 @@ setup(
     name='python-ripple-lib',
     version=version,
     packages=['ripple_api'],
+    package_data={'ripple_api': ['definitions.json']},
+    python_requires='>=3.7',
+    extras_require={
+        'arrow': ['pyarrow'],
+        'numpy': ['numpy'],
+    },
     url='https://github.com/arsenlosenko/python-ripple-lib',
     license='MIT',
     author='Arsen Losenko',
@@ -18,6 +24,12 @@ setup(
             'Intended Audience :: Developers',
             'Topic :: Utilities',
             'License :: OSI Approved :: MIT License',
-            'Programming Language :: Python :: 3.6'
+            'Programming Language :: Python :: 3',
+            'Programming Language :: Python :: 3 :: Only',
+            'Programming Language :: Python :: 3.7',
+            'Programming Language :: Python :: 3.8',
+            'Programming Language :: Python :: 3.9',
+            'Programming Language :: Python :: 3.10',
+            'Programming Language :: Python :: 3.11'
     ]
 )
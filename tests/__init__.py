@@ -1,6 +1,15 @@
+import gzip
+import http.client
+import json
+import socket
+import socketserver
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
 
 from ripple_api.json_rpc import RippleRPCClient
+from ripple_api import websocket
 
 
 class BaseTestClass(unittest.TestCase):
@@ -11,4 +20,180 @@ class BaseTestClass(unittest.TestCase):
         cls.rpc = RippleRPCClient(cls.node)
         cls.valid_address = 'r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59'
         cls.invalid_long_address = 'r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk591313'
-        cls.invalid_address = '19cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59'
\ No newline at end of file
+        cls.invalid_address = '19cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59'
+
+
+class LocalNode(object):
+    """
+    Local stand-in for rippled JSON-RPC and Data API servers.
+    `handler` receives (method, params) for POST requests and (path, query) for GET requests
+    and returns a JSON-serializable response body. With `compress` responses are gzipped
+    for clients accepting gzip.
+    """
+    def __init__(self, handler, compress=False):
+        self.handler = handler
+        self.compress = compress
+        self.requests = []
+        self.headers = []
+        self.connections = 0
+        node = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super(RequestHandler, self).setup()
+                node.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                node.headers.append(self.headers)
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                payload = json.loads(body.decode('utf-8'))
+                method, params = payload['method'], payload['params'][0]
+                node.requests.append((method, params))
+                self.respond(node.handler(method, params))
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                node.headers.append(self.headers)
+                query = dict(parse_qsl(url.query))
+                node.requests.append((url.path, query))
+                self.respond(node.handler(url.path, query))
+
+            def respond(self, response):
+                status = 200
+                if isinstance(response, tuple):
+                    status, response = response
+                data = json.dumps(response).encode('utf-8')
+                self.send_response(status)
+                if node.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    data = gzip.compress(data)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.server.daemon_threads = True
+        self.url = 'http://127.0.0.1:{}/'.format(self.server.server_port)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class RawNode(object):
+    """
+    JSON-RPC server on a plain socket, `actions` tells for each received request
+    whether to 'respond', 'respond_close' (respond and close the connection),
+    'respond_chunked' (respond with a chunked body followed by trailers) or 'drop'
+    (close the connection without responding)
+    """
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.requests = []
+        self.server = socket.create_server(('127.0.0.1', 0))
+        self.url = 'http://127.0.0.1:{}/'.format(self.server.getsockname()[1])
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while self.actions:
+            conn, _ = self.server.accept()
+            with conn, conn.makefile('rb') as fp:
+                while self.actions:
+                    headers = {}
+                    line = fp.readline()
+                    if not line:
+                        break
+                    while line not in (b'\r\n', b''):
+                        line = fp.readline()
+                        name, _, value = line.decode().partition(':')
+                        headers[name.lower()] = value.strip()
+                    self.requests.append(json.loads(fp.read(int(headers['content-length']))))
+                    action = self.actions.pop(0)
+                    if action == 'drop':
+                        break
+                    data = json.dumps({'result': {'status': 'success'}}).encode()
+                    if action == 'respond_chunked':
+                        conn.sendall(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n'
+                                     b'%x\r\n%s\r\n0\r\nX-Checksum: 1\r\nX-Elapsed: 2\r\n\r\n' % (len(data), data))
+                    else:
+                        conn.sendall(b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s' % (len(data), data))
+                    if action == 'respond_close':
+                        break
+
+    def close(self):
+        self.server.close()
+        self.thread.join(1)
+
+
+class LocalWebSocketNode(object):
+    """
+    Local stand-in for rippled WebSocket API.
+    `handler` receives (command, params) and returns result of the command,
+    each command is handled in its own thread so responses may be sent out of order.
+    """
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.connections = 0
+        node = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.rfile.readline()
+                headers = http.client.parse_headers(self.rfile)
+                self.wfile.write((
+                    'HTTP/1.1 101 Switching Protocols\r\n'
+                    'Upgrade: websocket\r\n'
+                    'Connection: Upgrade\r\n'
+                    'Sec-WebSocket-Accept: {}\r\n\r\n'
+                ).format(websocket.accept_key(headers['Sec-WebSocket-Key'])).encode('latin-1'))
+                node.connections += 1
+                lock = threading.Lock()
+                while True:
+                    try:
+                        fin, opcode, payload = websocket.read_frame(self.rfile)
+                    except ConnectionError:
+                        return
+                    if opcode == websocket.OP_CLOSE:
+                        return
+                    message = json.loads(payload.decode('utf-8'))
+                    node.requests.append(dict(message))
+                    threading.Thread(target=self.respond, args=(message, lock), daemon=True).start()
+
+            def respond(self, message, lock):
+                request_id = message.pop('id')
+                result = node.handler(message.pop('command'), message)
+                if 'error' in result:
+                    response = dict(result, id=request_id, status='error', type='response')
+                else:
+                    response = dict(id=request_id, result=result, status='success', type='response')
+                frame = websocket.encode_frame(websocket.OP_TEXT, json.dumps(response).encode('utf-8'), mask=False)
+                with lock:
+                    self.wfile.write(frame)
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), RequestHandler)
+        self.server.daemon_threads = True
+        self.url = 'ws://127.0.0.1:{}/'.format(self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
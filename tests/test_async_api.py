@@ -0,0 +1,123 @@
+import asyncio
+import unittest
+from decimal import Decimal
+
+from ripple_api import AsyncAccount, AsyncHTTPTransport, AsyncRippleRPCClient, AsyncRippleDataAPIClient
+from tests import LocalNode, RawNode
+
+
+def handler(method, params):
+    if method == 'account_info':
+        return {'result': {'status': 'success',
+                           'account_data': {'Account': params['account'], 'Balance': '25000000'}}}
+    if method == 'sign':
+        return {'result': {'status': 'success', 'tx_blob': 'DEADBEEF'}}
+    if method == 'submit':
+        return {'result': {'status': 'success', 'tx_blob': params['tx_blob'], 'engine_result': 'tesSUCCESS'}}
+    if method == 'stop':
+        return 403, {}
+    return {'result': 'success', 'path': method}
+
+
+class TestAsyncClients(unittest.TestCase):
+    def test_concurrent_calls(self):
+        async def run(url):
+            transport = AsyncHTTPTransport(max_concurrency=8)
+            rpc = AsyncRippleRPCClient(url, transport=transport)
+            accounts = ['r{}'.format(i) for i in range(50)]
+            infos = await asyncio.gather(*(rpc.account_info(account) for account in accounts))
+            transport.close()
+            return accounts, infos, transport.stats
+
+        with LocalNode(handler) as node:
+            accounts, infos, stats = asyncio.run(run(node.url))
+            self.assertEqual([info['account_data']['Account'] for info in infos], accounts)
+            self.assertEqual(stats['requests'], 50)
+            self.assertLessEqual(stats['connections_opened'], 8)
+
+    def test_data_api(self):
+        async def run(url):
+            api = AsyncRippleDataAPIClient(url)
+            return await api.get_exchanges('XRP', 'USD+rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B', limit=2)
+
+        with LocalNode(handler) as node:
+            info = asyncio.run(run(node.url))
+            self.assertEqual(info['path'], '/v2/exchanges/XRP/USD+rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B')
+            self.assertEqual(node.requests[0][1], {'limit': '2'})
+
+    def test_errors(self):
+        async def run(url):
+            rpc = AsyncRippleRPCClient(url)
+            return await rpc.stop(), await AsyncRippleRPCClient('http://127.0.0.1:1/').ping()
+
+        with LocalNode(handler) as node:
+            forbidden, unreachable = asyncio.run(run(node.url))
+            self.assertIn('Admin methods', forbidden['text'])
+            self.assertEqual(unreachable['status'], 'error')
+
+    def test_account(self):
+        async def run(url):
+            account = AsyncAccount(url, 'rMEmLrfkfooLjdkerU5TKTcAVpfy9fpSxt', 'seed')
+            return await account.balance(), await account.send_xrp(
+                issuer=account.account, taker='rYuHe4VogMzYmvHpSsgGxRH97UvqumgER', amount='1', secret='seed')
+
+        with LocalNode(handler) as node:
+            balance, tx_info = asyncio.run(run(node.url))
+            self.assertEqual(balance, Decimal(25))
+            self.assertEqual(tx_info['engine_result'], 'tesSUCCESS')
+            self.assertEqual(node.requests[1][1]['tx_json']['Amount'], '1000000')
+
+    def test_sync_helpers(self):
+        rpc = AsyncRippleRPCClient('http://127.0.0.1:1/')
+        with self.assertRaises(TypeError):
+            rpc.iter_account_lines('rMEmLrfkfooLjdkerU5TKTcAVpfy9fpSxt')
+        with self.assertRaises(TypeError):
+            rpc.batch()
+        with self.assertRaises(TypeError):
+            rpc.order_book('XRP', 'USD+rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B')
+        with self.assertRaises(TypeError):
+            AsyncAccount('http://127.0.0.1:1/', 'rMEmLrfkfooLjdkerU5TKTcAVpfy9fpSxt', 'seed').account_info_many([])
+        with self.assertRaises(TypeError):
+            AsyncRippleDataAPIClient('http://127.0.0.1:1/').iter_transactions()
+
+    def test_single_node(self):
+        with self.assertRaises(TypeError):
+            AsyncRippleRPCClient(['http://127.0.0.1:1/', 'http://127.0.0.1:2/'])
+        with self.assertRaises(ValueError):
+            AsyncRippleRPCClient('wss://s1.ripple.com/')
+
+    def test_event_loops(self):
+        async def run(rpc):
+            return await rpc.account_info('rMEmLrfkfooLjdkerU5TKTcAVpfy9fpSxt')
+
+        with LocalNode(handler) as node:
+            rpc = AsyncRippleRPCClient(node.url, transport=AsyncHTTPTransport(max_concurrency=1))
+            self.assertEqual(asyncio.run(run(rpc))['status'], 'success')
+            self.assertEqual(asyncio.run(run(rpc))['status'], 'success')
+            self.assertEqual(rpc.transport.stats['connections_opened'], 2)
+
+    def test_stale_connection(self):
+        async def run(rpc):
+            return [(await rpc.ping())['status'] for _ in range(2)]
+
+        node = RawNode(['respond', 'drop', 'respond'])
+        try:
+            rpc = AsyncRippleRPCClient(node.url)
+            self.assertEqual(asyncio.run(run(rpc)), ['success', 'success'])
+            self.assertEqual(rpc.transport.stats['connections_opened'], 2)
+            self.assertEqual([request['method'] for request in node.requests], ['ping'] * 3)
+        finally:
+            node.close()
+
+    def test_chunked_trailers(self):
+        async def run(rpc):
+            return [(await rpc.ping())['status'] for _ in range(2)]
+
+        node = RawNode(['respond_chunked', 'respond'])
+        try:
+            rpc = AsyncRippleRPCClient(node.url)
+            self.assertEqual(asyncio.run(run(rpc)), ['success', 'success'])
+            self.assertEqual(rpc.transport.stats['connections_opened'], 1)
+            self.assertEqual(rpc.transport.stats['connections_reused'], 1)
+        finally:
+            node.close()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from ripple_api import RippleRPCClient, RippleAPIError, binary_codec
+from tests import LocalNode
+
+ACCOUNT = 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh'
+HISTORY = [{'tx': {'hash': '{:064X}'.format(ledger * 10 + position), 'ledger_index': ledger},
+            'meta': {'TransactionIndex': position}, 'validated': True}
+           for ledger in range(1000, 1200, 3) for position in range(ledger % 4)]
+
+
+class History(object):
+    """
+    account_tx over HISTORY, transactions are returned in the requested order and the last
+    transaction of every page is repeated on the next one
+    """
+    def __init__(self, delay: float = 0.0, fail_window: int = None) -> None:
+        self.delay = delay
+        self.fail_window = fail_window
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, method, params):
+        if method == 'ledger':
+            return {'result': {'status': 'success', 'ledger_index': 1199}}
+        if params['ledger_index_min'] == self.fail_window:
+            return {'result': {'status': 'error', 'error': 'lgrIdxsInvalid'}}
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        items = [item for item in (HISTORY if params['forward'] else reversed(HISTORY))
+                 if params['ledger_index_min'] <= item['tx']['ledger_index'] <= params['ledger_index_max']]
+        start = params.get('marker', {}).get('offset', 0)
+        result = {'status': 'success', 'transactions': items[start:start + params['limit']]}
+        if start + params['limit'] < len(items):
+            result['marker'] = {'offset': start + params['limit'] - 1}
+        return {'result': result}
+
+
+class TestAccountTxBackfill(unittest.TestCase):
+    def test_ordered_without_duplicates(self):
+        history = History(delay=0.05)
+        with LocalNode(history) as node:
+            rpc = RippleRPCClient(node.url)
+            backfill = rpc.backfill_account_tx(ACCOUNT, 1000, window=20, workers=4, limit=5)
+            self.assertEqual(list(backfill), HISTORY)
+            self.assertEqual(backfill.ledger_index_max, 1199)
+            self.assertEqual(backfill.stats['windows'], 10)
+            self.assertGreater(backfill.stats['duplicates'], 0)
+            self.assertGreater(history.max_active, 1)
+
+    def test_backward(self):
+        with LocalNode(History()) as node:
+            rpc = RippleRPCClient(node.url)
+            backfill = rpc.backfill_account_tx(ACCOUNT, 1000, 1199, window=50, forward=False)
+            self.assertEqual(list(backfill), list(reversed(HISTORY)))
+
+    def test_resume_from_checkpoint(self):
+        with LocalNode(History(fail_window=1100)) as node, tempfile.TemporaryDirectory() as directory:
+            rpc = RippleRPCClient(node.url)
+            checkpoint = os.path.join(directory, 'backfill.json')
+            received = []
+            with self.assertRaises(RippleAPIError):
+                for item in rpc.backfill_account_tx(ACCOUNT, 1000, 1199, window=25, checkpoint=checkpoint):
+                    received.append(item)
+            self.assertEqual(received[-1]['tx']['ledger_index'], 1099)
+            node.handler.fail_window = None
+            resumed = rpc.backfill_account_tx(ACCOUNT, 1000, 1199, window=25, checkpoint=checkpoint)
+            self.assertEqual(received + list(resumed), HISTORY)
+            self.assertEqual(resumed.stats['windows'], 4)
+
+    def test_stops_downloading_when_closed(self):
+        history = History()
+        with LocalNode(history) as node:
+            rpc = RippleRPCClient(node.url)
+            backfill = rpc.backfill_account_tx(ACCOUNT, 1000, 1199, window=20, workers=2, limit=2, buffer=1)
+            for item in backfill:
+                break
+            time.sleep(0.3)
+            # every worker holds at most the buffered page and the one it could not hand over
+            self.assertLessEqual(len(node.requests), 2 * 3)
+
+    def test_binary(self):
+        def entry(position):
+            tx_json = dict(TransactionType='AccountSet', Account=ACCOUNT, Fee='10', Sequence=position + 1,
+                           SigningPubKey='')
+            meta = dict(TransactionIndex=position, TransactionResult='tesSUCCESS', AffectedNodes=[])
+            return dict(tx_blob=binary_codec.encode_hex(tx_json), meta=binary_codec.encode_hex(meta),
+                        ledger_index=1000, validated=True)
+
+        entries = [entry(position) for position in (2, 0, 1)]
+        with LocalNode(lambda method, params: {'result': {'status': 'success', 'transactions': entries}}) as node:
+            rpc = RippleRPCClient(node.url)
+            backfill = rpc.backfill_account_tx(ACCOUNT, 1000, 1000, binary=True)
+            self.assertEqual([binary_codec.decode(item['meta'])['TransactionIndex'] for item in backfill], [0, 1, 2])
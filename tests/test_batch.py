@@ -0,0 +1,64 @@
+import time
+import unittest
+
+from ripple_api import RippleRPCClient, HTTPTransport
+from tests import LocalNode, LocalWebSocketNode
+
+ADDRESSES = ['r{}'.format(index) for index in range(40)]
+
+
+def handler(method, params):
+    time.sleep(0.05)
+    return {'result': {'status': 'success', 'method': method, 'account': params.get('account')}}
+
+
+class TestBatch(unittest.TestCase):
+    def test_results_in_submission_order(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url, transport=HTTPTransport(max_per_host=20))
+            start = time.monotonic()
+            with rpc.batch(max_in_flight=20) as batch:
+                futures = [batch.account_info(address) for address in ADDRESSES]
+                futures.append(batch.call('tx', dict(transaction='A')))
+            elapsed = time.monotonic() - start
+            self.assertTrue(all(future.done() for future in futures))
+            results = batch.results()
+            self.assertEqual([result['account'] for result in results[:-1]], ADDRESSES)
+            self.assertEqual(results[-1]['method'], 'tx')
+            self.assertEqual([future.result() for future in futures], results)
+            # 41 calls of 50 ms each, sequentially they take over 2 seconds
+            self.assertLess(elapsed, 1.0)
+            self.assertLessEqual(rpc.transport.stats['connections_opened'], 20)
+
+    def test_as_completed(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            with rpc.batch(max_in_flight=4) as batch:
+                for address in ADDRESSES[:8]:
+                    batch.account_info(address)
+                accounts = {future.result()['account'] for future in batch.as_completed()}
+            self.assertEqual(accounts, set(ADDRESSES[:8]))
+
+    def test_errors_are_results(self):
+        rpc = RippleRPCClient('http://127.0.0.1:1')
+        with rpc.batch() as batch:
+            future = batch.ping()
+        self.assertEqual(future.result()['status'], 'error')
+
+    def test_private_and_missing_attributes(self):
+        with RippleRPCClient('http://localhost').batch() as batch:
+            with self.assertRaises(AttributeError):
+                batch._request
+            with self.assertRaises(AttributeError):
+                batch.node
+            with self.assertRaises(AttributeError):
+                batch.unknown_method
+
+    def test_websocket(self):
+        with LocalWebSocketNode(lambda method, params: {'account': params['account']}) as node:
+            rpc = RippleRPCClient(node.url)
+            with rpc.batch(max_in_flight=8) as batch:
+                for address in ADDRESSES:
+                    batch.account_info(address)
+            self.assertEqual([result['account'] for result in batch.results()], ADDRESSES)
+            self.assertEqual(rpc.transport.stats['connections_opened'], 1)
@@ -0,0 +1,197 @@
+import unittest
+
+from ripple_api import binary_codec
+from ripple_api.backfill import transaction_hash
+from ripple_api.utils import decode_account_id, encode_account_id
+
+OFFER = dict(
+    Account='rMBzp8CgpE441cp5PVyA9rpVV7oT8hP3ys',
+    Expiration=595640108,
+    Fee='10',
+    Flags=524288,
+    OfferSequence=1752791,
+    Sequence=1752792,
+    SigningPubKey='03EE83BB432547885C219634A1BC407A9DB0474145D69737D09CCDC63E1DEE7FE3',
+    TakerGets='15000000000',
+    TakerPays=dict(currency='USD', issuer='rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B', value='7072.8'),
+    TransactionType='OfferCreate',
+    TxnSignature='30440220143759437C04F7B61F012563AFE90D8DAFC46E86035E1D965A9CED282C97D4CE'
+                 '02204CFD241E86F17E011298FC1A39B63386C74306A5DE047E213B0F29EFA4571C2C',
+)
+OFFER_HASH = '73734B611DDA23D3F5F62E20A173B78AB8406AC5015094DA53F53D39B9EDB06C'
+OFFER_BLOB = (
+    '120007220008000024001ABED82A2380BF2C2019001ABED764D55920AC939140000000000000000000000000005553440000'
+    '0000000A20B3C85F482532A9578DBB3950B85CA06594D165400000037E11D60068400000000000000A732103EE83BB43254788'
+    '5C219634A1BC407A9DB0474145D69737D09CCDC63E1DEE7FE3744630440220143759437C04F7B61F012563AFE90D8DAFC46E'
+    '86035E1D965A9CED282C97D4CE02204CFD241E86F17E011298FC1A39B63386C74306A5DE047E213B0F29EFA4571C2C8114DD'
+    '76483FACDEE26E60D8A586BB58D09F27045C46'
+)
+
+ACCOUNT = 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh'
+ISSUER = 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B'
+LP_TOKEN = '03930D02208264E2E40EC1B0C09E4DB96EE197B1'
+AMM = dict(
+    LedgerEntryType='AMM',
+    Account=ACCOUNT,
+    Asset=dict(currency='XRP'),
+    Asset2=dict(currency='USD', issuer=ISSUER),
+    LPTokenBalance=dict(currency=LP_TOKEN, issuer=ACCOUNT, value='71150.53584131501'),
+    TradingFee=600,
+    OwnerNode='0000000000000000',
+    Flags=0,
+    VoteSlots=[dict(VoteEntry=dict(Account=ISSUER, TradingFee=600, VoteWeight=100000))],
+)
+AMM_BLOB = (
+    '1100791502582200000000340000000000000000601FD599471A8170A5AD03930D02208264E2E40EC1B0C09E4DB96EE197B1'
+    'B5F762798A53D543A014CAF8B297CFF8F2F937E88114B5F762798A53D543A014CAF8B297CFF8F2F937E8FCE0191502582030'
+    '000186A081140A20B3C85F482532A9578DBB3950B85CA06594D1E1F10318000000000000000000000000000000000000000004'
+    '1800000000000000000000000055534400000000000A20B3C85F482532A9578DBB3950B85CA06594D1'
+)
+MPT_PAYMENT = dict(
+    TransactionType='Payment',
+    Account=ACCOUNT,
+    Destination=ISSUER,
+    NetworkID=21337,
+    Amount=dict(mpt_issuance_id='0000012FFD9EE5DA93AC614B4DB94D7E0FCE415CA51BED47', value='100'),
+    Fee='12',
+    Sequence=7,
+    SigningPubKey='',
+)
+MPT_PAYMENT_BLOB = (
+    '12000021000053592400000007616000000000000000640000012FFD9EE5DA93AC614B4DB94D7E0FCE415CA51BED476840000000'
+    '0000000C73008114B5F762798A53D543A014CAF8B297CFF8F2F937E883140A20B3C85F482532A9578DBB3950B85CA06594D1'
+)
+
+
+class TestBinaryCodec(unittest.TestCase):
+    def test_encode(self):
+        blob = binary_codec.encode_hex(dict(OFFER, hash=OFFER_HASH, date=595640000))
+        self.assertEqual(blob, OFFER_BLOB)
+        self.assertEqual(transaction_hash(dict(tx_blob=blob)), OFFER_HASH)
+
+    def test_decode(self):
+        self.assertEqual(binary_codec.decode(OFFER_BLOB), OFFER)
+        self.assertEqual(binary_codec.decode(bytes.fromhex(OFFER_BLOB)), OFFER)
+
+    def test_signing(self):
+        data = binary_codec.encode_for_signing(OFFER)
+        self.assertTrue(data.startswith(binary_codec.SIGNING_PREFIX))
+        unsigned = dict(OFFER)
+        del unsigned['TxnSignature']
+        self.assertEqual(binary_codec.decode(data[4:]), unsigned)
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            binary_codec.encode(dict(OFFER, Bogus=1))
+
+    def test_amounts(self):
+        issuer = 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B'
+        for value in ('1', '-0.5', '1234567890123456', '0.000001', '1000000000000000e5', '0'):
+            amount = dict(currency='USD', issuer=issuer, value=value)
+            decoded = binary_codec.decode(binary_codec.encode(dict(Amount=amount)))['Amount']
+            self.assertEqual(float(decoded['value']), float(value))
+        self.assertEqual(binary_codec.encode_amount('1')[:8], bytes.fromhex('4000000000000001'))
+        self.assertEqual(binary_codec.encode_amount(dict(currency='USD', issuer=issuer, value='0'))[:8],
+                         bytes.fromhex('8000000000000000'))
+        with self.assertRaises(ValueError):
+            binary_codec.encode_amount(dict(currency='USD', issuer=issuer, value='12345678901234567'))
+        for value in (0.1, 1e-20, 25, -7.5):
+            amount = dict(currency='USD', issuer=issuer, value=value)
+            self.assertEqual(binary_codec.encode_amount(amount),
+                             binary_codec.encode_amount(dict(amount, value=str(value))))
+        self.assertEqual(binary_codec.decode(binary_codec.encode(dict(Amount=dict(
+            currency='USD', issuer=issuer, value=0.1))))['Amount']['value'], '0.1')
+        with self.assertRaises(ValueError):
+            binary_codec.encode_amount(dict(currency='USD', issuer=issuer, value=None))
+
+    def test_length_prefix(self):
+        for length in (0, 192, 193, 12480, 12481, 918744):
+            prefix = binary_codec.length_prefix(length)
+            self.assertEqual(binary_codec._read_length(prefix, 0), (length, len(prefix)))
+        with self.assertRaises(ValueError):
+            binary_codec.length_prefix(918745)
+
+    def test_field_order(self):
+        fields = binary_codec.FIELDS
+        self.assertEqual(fields['TransactionType'].header, b'\x12')
+        self.assertEqual(fields['TickSize'].header, b'\x00\x10\x10')
+        self.assertEqual(fields['Paths'].header, b'\x01\x12')
+        self.assertEqual(fields['LastLedgerSequence'].header, b'\x20\x1b')
+        self.assertLess(binary_codec.FIELD_ORDER['Sequence'], binary_codec.FIELD_ORDER['Fee'])
+
+    def test_round_trip(self):
+        account = 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh'
+        payment = dict(
+            TransactionType='Payment',
+            Account=account,
+            Destination='rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B',
+            Amount=dict(currency='0158415500000000C1F76FF6ECB0BAC600000000', issuer=account, value='2.5'),
+            SendMax='1000000',
+            Paths=[[dict(currency='XRP'), dict(account=account)],
+                   [dict(currency='USD', issuer=account)]],
+            Memos=[dict(Memo=dict(MemoType='74657874', MemoData='AB' * 300))],
+            Fee='12',
+            Sequence=5,
+            Flags=2147483648,
+            InvoiceID='00' * 32,
+            SigningPubKey='',
+        )
+        self.assertEqual(binary_codec.decode(binary_codec.encode(payment)), payment)
+        meta = dict(
+            TransactionIndex=3,
+            TransactionResult='tecPATH_DRY',
+            AffectedNodes=[dict(ModifiedNode=dict(
+                LedgerEntryType='AccountRoot',
+                LedgerIndex='AB' * 32,
+                FinalFields=dict(Account=account, Balance='99999988', OwnerNode='0000000000000001'),
+                PreviousFields=dict(Balance='100000000'),
+            ))],
+        )
+        self.assertEqual(binary_codec.decode(binary_codec.encode(meta)), meta)
+        self.assertEqual(binary_codec.decode_field(binary_codec.encode_hex(meta), 'TransactionIndex'), 3)
+        self.assertIsNone(binary_codec.decode_field(binary_codec.encode(meta), 'DeliveredAmount'))
+        directory = dict(LedgerEntryType='DirectoryNode', Flags=0, Indexes=['01' * 32, '02' * 32],
+                         RootIndex='03' * 32)
+        blob = binary_codec.encode_hex(directory)
+        self.assertEqual(binary_codec.decode_ledger_entry(dict(data=blob, index='04' * 32)),
+                         dict(directory, index='04' * 32))
+        item = binary_codec.decode_transaction(dict(tx_blob=binary_codec.encode_hex(payment),
+                                                    meta=binary_codec.encode_hex(meta), ledger_index=7))
+        self.assertEqual(item, dict(tx=payment, meta=meta, ledger_index=7))
+
+    def test_amendment_fields(self):
+        self.assertEqual(binary_codec.encode_hex(AMM), AMM_BLOB)
+        self.assertEqual(binary_codec.decode(AMM_BLOB), AMM)
+        self.assertEqual(binary_codec.encode_hex(MPT_PAYMENT), MPT_PAYMENT_BLOB)
+        self.assertEqual(binary_codec.decode(MPT_PAYMENT_BLOB), MPT_PAYMENT)
+        objects = [
+            dict(LedgerEntryType='NFTokenPage', Flags=0, PreviousPageMin='AB' * 32, PreviousTxnLgrSeq=5,
+                 NFTokens=[dict(NFToken=dict(NFTokenID='000B0000' + '11' * 28, URI='697066733A2F2F'))]),
+            dict(TransactionType='NFTokenAcceptOffer', Account=ACCOUNT, NFTokenSellOffer='22' * 32,
+                 NFTokenBrokerFee='1000', Fee='10', Sequence=4, SigningPubKey=''),
+            dict(LedgerEntryType='FeeSettings', BaseFeeDrops='10', ReserveBaseDrops='10000000',
+                 ReserveIncrementDrops='2000000', Flags=0),
+            dict(LedgerEntryType='NegativeUNL', Flags=0, ValidatorToDisable='ED' + '44' * 32,
+                 ValidatorToReEnable='ED' + '55' * 32),
+            dict(TransactionType='XChainCommit', Account=ACCOUNT, Amount='10000', XChainClaimID='0000000000000001',
+                 XChainBridge=dict(LockingChainDoor=ACCOUNT, LockingChainIssue=dict(currency='XRP'),
+                                   IssuingChainDoor=ISSUER, IssuingChainIssue=dict(currency='XRP'))),
+            dict(LedgerEntryType='MPTokenIssuance', Issuer=ACCOUNT, Sequence=303, OutstandingAmount='100',
+                 MaximumAmount='9223372036854775807', AssetScale=2),
+            dict(TransactionType='AMMClawback', Account=ACCOUNT, Holder=ISSUER, Asset2=dict(currency='XRP'),
+                 Asset=dict(mpt_issuance_id='0000012FFD9EE5DA93AC614B4DB94D7E0FCE415CA51BED47')),
+            dict(LedgerEntryType='Vault', AssetsTotal='1234.5', AssetsAvailable='0', LossUnrealized='-0.001',
+                 AssetsMaximum='1e30'),
+            dict(LedgerEntryType='Oracle', PriceDataSeries=[dict(PriceData=dict(
+                BaseAsset='XRP', QuoteAsset='USD', AssetPrice='00000000000002EE', Scale=3))]),
+        ]
+        for obj in objects:
+            self.assertEqual(binary_codec.decode(binary_codec.encode(obj)), obj)
+
+    def test_account_id(self):
+        account = 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh'
+        self.assertEqual(encode_account_id(decode_account_id(account)), account)
+        self.assertEqual(encode_account_id(bytes(20)), 'rrrrrrrrrrrrrrrrrrrrrhoLvTp')
+        for address in ('rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTj', 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyT0', ''):
+            with self.assertRaises(ValueError):
+                decode_account_id(address)
@@ -0,0 +1,82 @@
+import time
+import unittest
+
+from ripple_api import RippleRPCClient, ResponseCache
+from ripple_api.coalesce import request_key
+from tests import LocalNode
+
+
+class Ledger(object):
+    current = 100
+
+    def __call__(self, method, params):
+        if method == 'ledger':
+            index = params['ledger_index']
+            validated = index != 'current' and (index == 'validated' or index < self.current)
+            index = self.current if index in ('current', 'validated') else index
+            return {'result': {'ledger_index': index, 'validated': validated, 'status': 'success'}}
+        if method == 'tx':
+            return {'result': {'hash': params['transaction'], 'validated': params['transaction'] == 'A',
+                               'status': 'success'}}
+        if method == 'account_info':
+            if params['account'].startswith('1'):
+                return {'result': {'error': 'actMalformed', 'status': 'error'}}
+            return {'result': {'ledger_current_index': self.current, 'status': 'success'}}
+        return {'result': {'status': 'success'}}
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_validated_ledger_is_cached(self):
+        with LocalNode(Ledger()) as node:
+            rpc = RippleRPCClient(node.url, cache=ResponseCache(ttl=0.1))
+            first = rpc.ledger(ledger_index=90)
+            self.assertIs(rpc.ledger(ledger_index=90), first)
+            rpc.tx('A')
+            rpc.tx('B')
+            time.sleep(0.2)
+            rpc.tx('A')
+            rpc.tx('B')
+            self.assertEqual(len(node.requests), 4)
+            self.assertEqual(rpc.cache.stats['hits'], 2)
+            self.assertEqual(rpc.cache.stats['misses'], 4)
+
+    def test_volatile_responses(self):
+        ledger = Ledger()
+        with LocalNode(ledger) as node:
+            rpc = RippleRPCClient(node.url, cache=ResponseCache(ttl=0.2))
+            rpc.account_info('r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+            rpc.account_info('r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+            self.assertEqual(len(node.requests), 1)
+            time.sleep(0.3)
+            rpc.account_info('r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+            self.assertEqual(len(node.requests), 2)
+
+            # a response from a newer ledger invalidates volatile entries
+            rpc.cache.ttl = 60
+            rpc.ledger(ledger_index='validated')
+            ledger.current = 101
+            rpc.account_info('rMEmLrfkfooLjdkerU5TKTcAVpfy9fpSxt')
+            rpc.ledger(ledger_index='validated')
+            self.assertEqual(len(node.requests), 5)
+
+    def test_errors_and_side_effects_are_not_cached(self):
+        with LocalNode(Ledger()) as node:
+            rpc = RippleRPCClient(node.url, cache=ResponseCache())
+            rpc.account_info('19cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+            rpc.account_info('19cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+            rpc.submit('DEADBEEF')
+            rpc.submit('DEADBEEF')
+            self.assertEqual(len(node.requests), 4)
+            self.assertEqual(rpc.cache.stats['entries'], 0)
+
+    def test_size_limit(self):
+        cache = ResponseCache(max_bytes=100)
+        for index in range(10):
+            params = dict(ledger_index=index)
+            cache.put(request_key('ledger', params), 'ledger', params,
+                      {'ledger_index': index, 'validated': True, 'data': 'x' * 20})
+        stats = cache.stats
+        self.assertLessEqual(stats['bytes'], 100)
+        self.assertEqual(stats['entries'] + stats['evictions'], 10)
+        self.assertIsNotNone(cache.get(request_key('ledger', dict(ledger_index=9))))
+        self.assertIsNone(cache.get(request_key('ledger', dict(ledger_index=0))))
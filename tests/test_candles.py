@@ -0,0 +1,82 @@
+import unittest
+
+from ripple_api import RippleDataAPIClient
+from ripple_api.time_range import to_iso
+from tests import LocalNode
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+START = 1546300800
+# (seconds after START, price, base amount)
+TRADES = [(5, 0.30, 100), (30, 0.32, 50), (59, 0.31, 10), (61, 0.33, 20), (310, 0.29, 40), (3700, 0.35, 5)]
+EXCHANGES = [{'executed_time': to_iso(START + offset), 'rate': str(price), 'base_amount': amount,
+              'counter_amount': str(price * amount), 'base_currency': 'XRP', 'counter_currency': 'USD'}
+             for offset, price, amount in TRADES]
+
+
+def handler(path, query):
+    start = int(query.get('marker', 0))
+    limit = int(query['limit'])
+    result = {'result': 'success', 'exchanges': EXCHANGES[start:start + limit]}
+    if start + limit < len(EXCHANGES):
+        result['marker'] = str(start + limit)
+    return result
+
+
+@unittest.skipIf(numpy is not None, 'numpy is installed')
+class TestWithoutNumpy(unittest.TestCase):
+    def test_import_error(self):
+        from ripple_api.candles import ExchangeSeries
+        with self.assertRaises(ImportError):
+            ExchangeSeries()
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestExchangeSeries(unittest.TestCase):
+    def setUp(self):
+        with LocalNode(handler) as node:
+            self.series = RippleDataAPIClient(node.url).exchange_series(
+                'XRP', 'USD+rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B', limit=2, chunk_size=3)
+
+    def test_ohlcv(self):
+        self.assertEqual(len(self.series), 6)
+        candles = self.series.ohlcv(('1m', '1h'))
+        minute = candles['1m']
+        self.assertEqual(list(minute['time'] - START), [0, 60, 300, 3660])
+        self.assertEqual(list(minute['count']), [3, 1, 1, 1])
+        numpy.testing.assert_allclose(minute['open'], [0.30, 0.33, 0.29, 0.35])
+        numpy.testing.assert_allclose(minute['high'], [0.32, 0.33, 0.29, 0.35])
+        numpy.testing.assert_allclose(minute['low'], [0.30, 0.33, 0.29, 0.35])
+        numpy.testing.assert_allclose(minute['close'], [0.31, 0.33, 0.29, 0.35])
+        numpy.testing.assert_allclose(minute['volume'], [160, 20, 40, 5])
+        numpy.testing.assert_allclose(minute['vwap'][0], (30 + 16 + 3.1) / 160)
+        hour = candles['1h']
+        self.assertEqual(list(hour['count']), [5, 1])
+        numpy.testing.assert_allclose(hour['volume'], [220, 5])
+
+    def test_incremental_append(self):
+        series = self.series
+        before = series.candles('5m')
+        series.append([START + 3800, START + 7300], [0.36, 0.40], [10, 1])
+        after = series.candles('5m')
+        self.assertEqual(list(after['time'][:len(before['time']) - 1]), list(before['time'][:-1]))
+        self.assertEqual(list(after['time'] - START), [0, 300, 3600, 7200])
+        self.assertEqual(list(after['count']), [4, 1, 2, 1])
+        numpy.testing.assert_allclose(after['close'], [0.33, 0.29, 0.36, 0.40])
+        # trades older than the last one are merged in time order
+        series.append([START + 1], [0.10], [1])
+        self.assertEqual(series.candles('1h')['open'][0], 0.10)
+        fresh = series.candles('5m')
+        self.assertEqual(list(fresh['count']), [5, 1, 2, 1])
+
+    def test_rolling(self):
+        from ripple_api.candles import rolling
+        candles = self.series.candles('1m')
+        stats = rolling(candles, 2)
+        self.assertTrue(numpy.isnan(stats['mean'][0]))
+        numpy.testing.assert_allclose(stats['mean'][1:], [0.32, 0.31, 0.32])
+        numpy.testing.assert_allclose(stats['std'][1:], [0.01, 0.02, 0.03], atol=1e-9)
+        numpy.testing.assert_allclose(stats['vwap'][1], (49.1 + 6.6) / 180)
@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from ripple_api import RippleRPCClient
+from ripple_api.coalesce import SingleFlight, request_key
+from tests import LocalNode
+
+
+def handler(method, params):
+    time.sleep(0.2)
+    return {'result': {'status': 'success', 'method': method, 'params': params}}
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_identical_calls(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url, coalesce=True)
+            barrier = threading.Barrier(8)
+
+            def call(_):
+                barrier.wait()
+                return rpc.account_info('r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+
+            with ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(call, range(8)))
+            self.assertEqual(len(node.requests), 1)
+            self.assertTrue(all(result is results[0] for result in results))
+            self.assertEqual(rpc.single_flight.stats, {'executed': 1, 'coalesced': 7})
+
+    def test_different_and_uncoalesced_calls(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url, coalesce=True)
+            with ThreadPoolExecutor(4) as executor:
+                list(executor.map(lambda args: rpc._call(*args), [
+                    ('ledger', dict(ledger_index=1)), ('ledger', dict(ledger_index=2)),
+                    ('random', {}), ('random', {})]))
+            self.assertEqual(len(node.requests), 4)
+
+    def test_key_ignores_parameter_order(self):
+        self.assertEqual(request_key('tx', dict(transaction='A', binary=False)),
+                         request_key('tx', dict(binary=False, transaction='A')))
+
+    def test_error_is_shared(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('failed')
+
+        def follow():
+            started.wait()
+            return single_flight.do('key', fail)
+
+        with ThreadPoolExecutor(2) as executor:
+            leader = executor.submit(single_flight.do, 'key', fail)
+            follower = executor.submit(follow)
+            self.assertRaises(ValueError, leader.result)
+            self.assertRaises(ValueError, follower.result)
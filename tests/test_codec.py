@@ -0,0 +1,71 @@
+import unittest
+
+from ripple_api import RippleRPCClient, RippleDataAPIClient, HTTPTransport, get_codec
+from ripple_api.codec import CODECS, BufferPool, JSONCodec
+from tests import LocalNode
+
+TRANSACTIONS = [{'hash': '{:064X}'.format(index), 'Account': 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh',
+                 'Amount': str(index * 1000), 'Memo': 'päyment'} for index in range(200)]
+
+
+def handler(method, params):
+    if method == 'echo':
+        return {'result': {'status': 'success', 'params': params}}
+    return {'result': {'status': 'success', 'transactions': TRANSACTIONS}}
+
+
+def available_codecs():
+    codecs = []
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            continue
+    return codecs
+
+
+class TestCodec(unittest.TestCase):
+    def test_round_trip(self):
+        document = {'transactions': TRANSACTIONS, 'ledger_index': 1, 'validated': True}
+        for codec in available_codecs():
+            with self.subTest(codec=codec.name):
+                data = codec.dumps(document)
+                self.assertIsInstance(data, bytes)
+                self.assertEqual(codec.loads(data), document)
+                self.assertEqual(codec.loads(bytearray(data)), document)
+                self.assertEqual(codec.loads(memoryview(bytearray(data))), document)
+
+    def test_default_codec(self):
+        self.assertIsInstance(get_codec(), JSONCodec)
+        self.assertEqual(get_codec('json').name, 'json')
+        self.assertIsInstance(RippleRPCClient('http://localhost').codec, JSONCodec)
+
+    def test_clients_use_codec(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec.name), LocalNode(handler) as node:
+                rpc = RippleRPCClient(node.url, codec=codec)
+                self.assertEqual(rpc._call('echo', {'account': 'rä'})['params'], {'account': 'rä'})
+                self.assertEqual(rpc._call('account_tx', {})['transactions'], TRANSACTIONS)
+                api = RippleDataAPIClient(node.url, transport=rpc.transport, codec=codec)
+                self.assertEqual(api.get_payments()['result']['transactions'], TRANSACTIONS)
+                self.assertEqual(rpc.transport.stats['connections_opened'], 1)
+
+    def test_buffers_are_reused(self):
+        transport = HTTPTransport()
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url, transport=transport)
+            for _ in range(3):
+                self.assertEqual(rpc._call('account_tx', {})['transactions'], TRANSACTIONS)
+        self.assertEqual(len(transport.buffers._buffers), 1)
+
+    def test_buffer_pool(self):
+        pool = BufferPool(max_buffers=1, max_size=4096)
+        buffer = pool.acquire(1000)
+        self.assertEqual(len(buffer), 1024)
+        pool.release(buffer)
+        self.assertIs(pool.acquire(500), buffer)
+        pool.release(bytearray(8192))
+        self.assertEqual(pool._buffers, [])
+        pool.release(buffer)
+        pool.release(bytearray(2048))
+        self.assertEqual([len(item) for item in pool._buffers], [1024])
@@ -0,0 +1,61 @@
+import asyncio
+import json
+import unittest
+import zlib
+from io import BytesIO
+
+from ripple_api import RippleRPCClient, RippleDataAPIClient, HTTPTransport, AsyncRippleDataAPIClient
+from ripple_api.transport import BodyReader
+from tests import LocalNode
+
+PAYMENTS = [{'amount': str(index), 'currency': 'USD', 'issuer': 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B'}
+            for index in range(500)]
+
+
+def handler(method, params):
+    if method == 'submit_multisigned':
+        return {'result': {'status': 'success', 'tx_json': params['tx_json']}}
+    return {'result': 'success', 'payments': PAYMENTS}
+
+
+class TestCompression(unittest.TestCase):
+    def test_compressed_responses(self):
+        with LocalNode(handler, compress=True) as node:
+            api = RippleDataAPIClient(node.url)
+            self.assertEqual(api.get_payments()['payments'], PAYMENTS)
+            self.assertEqual(list(api.stream(('payments', ), {}, 'payments')), PAYMENTS)
+            self.assertEqual(node.headers[0]['Accept-Encoding'], 'gzip, deflate')
+            stats = api.transport.stats
+            self.assertLess(stats['bytes_received'] * 5, stats['bytes_decoded'])
+            self.assertGreater(stats['decompress_time'], 0)
+
+    def test_async_compressed_responses(self):
+        with LocalNode(handler, compress=True) as node:
+            api = AsyncRippleDataAPIClient(node.url)
+            info = asyncio.run(api.get_payments())
+            self.assertEqual(info['payments'], PAYMENTS)
+            self.assertLess(api.transport.stats['bytes_received'] * 5, api.transport.stats['bytes_decoded'])
+
+    def test_disabled_compression(self):
+        with LocalNode(handler, compress=True) as node:
+            api = RippleDataAPIClient(node.url, transport=HTTPTransport(compression=False))
+            self.assertEqual(api.get_payments()['payments'], PAYMENTS)
+            self.assertNotIn('gzip', node.headers[0].get('Accept-Encoding', ''))
+            self.assertEqual(api.transport.stats['bytes_received'], api.transport.stats['bytes_decoded'])
+
+    def test_compressed_requests(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url, transport=HTTPTransport(compress_requests=1024))
+            rpc.ping()
+            tx_json = dict(Signers=[dict(Signer=dict(Account='r{}'.format(index))) for index in range(100)])
+            info = rpc.submit_mutlisigned(tx_json=tx_json)
+            self.assertEqual(info['tx_json'], tx_json)
+            self.assertNotIn('Content-Encoding', node.headers[0])
+            self.assertEqual(node.headers[1]['Content-Encoding'], 'gzip')
+
+    def test_raw_deflate(self):
+        data = json.dumps(PAYMENTS).encode('utf-8')
+        compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        compressed = compressor.compress(data) + compressor.flush()
+        reader = BodyReader(BytesIO(compressed), 'deflate', lambda *args: None)
+        self.assertEqual(reader.read(), data)
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from ripple_api import export_records
+from ripple_api.export import (ColumnBatch, TRANSACTION_COLUMNS, decimal_parts, flatten_exchange,
+                               flatten_payment, flatten_transaction, unix_time)
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+ACCOUNT_TX = {
+    'meta': {'TransactionIndex': 3, 'TransactionResult': 'tesSUCCESS'},
+    'tx': {'Account': 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh', 'Destination': 'ra5nK24KXen9AHvsdFTKHSANinZseWnPcX',
+           'Amount': {'currency': 'USD', 'issuer': 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B', 'value': '-12.5e3'},
+           'Fee': '12', 'TransactionType': 'Payment', 'date': 600000000, 'hash': 'AB' * 32, 'ledger_index': 45000000},
+    'validated': True,
+}
+PAYMENT = {'amount': '1.5', 'delivered_amount': '1.25', 'currency': 'XRP', 'destination': 'rB',
+           'executed_time': '2019-01-01T00:00:10Z', 'ledger_index': 44000000, 'source': 'rA',
+           'transaction_cost': '0.000012', 'tx_hash': 'CD' * 32}
+EXCHANGE = {'base_amount': 100.5, 'base_currency': 'XRP', 'counter_amount': '30.15', 'counter_currency': 'USD',
+            'counter_issuer': 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B', 'executed_time': '2019-01-01T00:00:00Z',
+            'ledger_index': 44000001, 'buyer': 'rA', 'seller': 'rB', 'taker': 'rA', 'provider': 'rB',
+            'tx_hash': 'EF' * 32}
+
+
+class TestFlatten(unittest.TestCase):
+    def test_decimal_parts(self):
+        self.assertEqual(decimal_parts('12.50'), (125, -1))
+        self.assertEqual(decimal_parts('-12.5e3'), (-125, 2))
+        self.assertEqual(decimal_parts('1000000000000000e-96'), (1, -81))
+        self.assertEqual(decimal_parts(0), (0, 0))
+
+    def test_account_tx(self):
+        row = flatten_transaction(ACCOUNT_TX)
+        self.assertEqual(row['time'], 600000000 + 946684800)
+        self.assertEqual((row['amount'], row['amount_exponent'], row['currency']), (-125, 2, 'USD'))
+        self.assertEqual((row['fee'], row['result'], row['ledger_index']), (12, 'tesSUCCESS', 45000000))
+        self.assertEqual(set(row), {name for name, _ in TRANSACTION_COLUMNS})
+        row = flatten_transaction({'hash': 'AB', 'date': '2019-01-01T00:00:00Z', 'ledger_index': 1,
+                                   'tx': {'Amount': '1000', 'Fee': '10'}, 'meta': {}})
+        self.assertEqual((row['hash'], row['time'], row['amount'], row['currency']), ('AB', 1546300800, 1000, 'XRP'))
+
+    def test_payment_and_exchange(self):
+        row = flatten_payment(PAYMENT)
+        self.assertEqual((row['amount'], row['amount_exponent'], row['currency'], row['fee']), (1250000, 0, 'XRP', 12))
+        self.assertEqual((row['account'], row['time']), ('rA', 1546300810))
+        row = flatten_exchange(EXCHANGE)
+        self.assertEqual((row['base_amount'], row['base_currency']), (100500000, 'XRP'))
+        self.assertEqual((row['counter_amount'], row['counter_exponent'], row['counter_issuer']),
+                         (3015, -2, 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B'))
+
+    def test_column_batch(self):
+        batch = ColumnBatch(TRANSACTION_COLUMNS)
+        batch.append(flatten_transaction(ACCOUNT_TX))
+        batch.append({'hash': 'AB'})
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.values['hash'], ['AB' * 32, 'AB'])
+        self.assertEqual(batch.values['fee'], [12, None])
+        batch.clear()
+        self.assertEqual((len(batch), batch.values['hash']), (0, []))
+
+
+@unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+class TestColumnarExport(unittest.TestCase):
+    def test_parquet(self):
+        import pyarrow.parquet
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tx.parquet')
+            rows = export_records(iter([ACCOUNT_TX] * 25), path, batch_size=10)
+            self.assertEqual(rows, 25)
+            table = pyarrow.parquet.read_table(path)
+            self.assertEqual(table.num_rows, 25)
+            self.assertEqual(table.column('amount').to_pylist()[0], -125)
+            self.assertEqual(str(table.schema.field('time').type), 'timestamp[ms, tz=UTC]')
+            self.assertEqual(table.column('time').to_pylist()[0].timestamp(), unix_time(ACCOUNT_TX['tx']['date']))
+
+    def test_arrow(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'exchanges.arrow')
+            export_records([EXCHANGE, EXCHANGE], path, kind='exchanges', format='arrow')
+            with pyarrow.memory_map(path) as source:
+                table = pyarrow.ipc.open_file(source).read_all()
+            self.assertEqual(table.column('counter_amount').to_pylist(), [3015, 3015])
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from ripple_api import RippleRPCClient, RippleAPIError
+from tests import LocalNode
+
+
+class Chain(object):
+    """
+    Ledgers validated one by one, `validated` is advanced by the test
+    """
+    def __init__(self, validated: int, missing: int = None) -> None:
+        self.validated = validated
+        self.missing = missing
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def __call__(self, method, params):
+        index = params['ledger_index']
+        if index == 'validated':
+            return {'result': {'status': 'success', 'ledger_index': self.validated, 'validated': True}}
+        if index > self.validated or index == self.missing:
+            return {'result': {'status': 'error', 'error': 'lgrNotFound'}}
+        time.sleep(0.01 * (index % 3))
+        with self.lock:
+            self.fetched.append(index)
+        assert params['transactions'] and params['expand']
+        return {'result': {'status': 'success', 'ledger_index': index, 'validated': True,
+                           'ledger': {'ledger_index': str(index), 'transactions': [{'hash': str(index)}]}}}
+
+
+class TestLedgerFollower(unittest.TestCase):
+    def test_catch_up_and_follow(self):
+        chain = Chain(validated=120)
+        with LocalNode(chain) as node:
+            rpc = RippleRPCClient(node.url)
+            follower = rpc.follow_ledgers(start=100, workers=4, poll_interval=0.01)
+            indexes = []
+            for ledger in follower:
+                indexes.append(ledger['ledger_index'])
+                if ledger['ledger_index'] == 100:
+                    self.assertEqual(follower.lag, 21)
+                if ledger['ledger_index'] == 120:
+                    chain.validated = 125
+                if ledger['ledger_index'] == 125:
+                    follower.stop()
+            self.assertEqual(indexes, list(range(100, 126)))
+            self.assertEqual(sorted(chain.fetched), list(range(100, 126)))
+            self.assertEqual(follower.stats, dict(processed_index=125, validated_index=125, lag=0, ledgers=26))
+
+    def test_cursor(self):
+        chain = Chain(validated=50)
+        with LocalNode(chain) as node, tempfile.TemporaryDirectory() as directory:
+            rpc = RippleRPCClient(node.url)
+            cursor = os.path.join(directory, 'cursor.json')
+            follower = rpc.follow_ledgers(cursor=cursor, poll_interval=0.01)
+            for ledger in follower:
+                self.assertEqual(ledger['ledger_index'], 50)
+                follower.stop()
+            chain.validated = 53
+            follower = rpc.follow_ledgers(start=1, cursor=cursor, poll_interval=0.01)
+            indexes = []
+            for ledger in follower:
+                indexes.append(ledger['ledger_index'])
+                if len(indexes) == 3:
+                    follower.stop()
+            self.assertEqual(indexes, [51, 52, 53])
+
+    def test_missing_ledger(self):
+        with LocalNode(Chain(validated=10, missing=8)) as node:
+            rpc = RippleRPCClient(node.url)
+            follower = rpc.follow_ledgers(start=5, poll_interval=0.01)
+            indexes = []
+            with self.assertRaises(RippleAPIError):
+                for ledger in follower:
+                    indexes.append(ledger['ledger_index'])
+            self.assertEqual(indexes, [5, 6, 7])
+            self.assertEqual(follower.processed_index, 7)
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import unittest
+
+from ripple_api import Account, AsyncAccount, binary_codec, keypairs
+from ripple_api.keypairs import Keypair, parse_seed, sign_transactions
+from tests import LocalNode
+
+SEED = 'snoPBrXtMeMyMHUVTgbuqAfg1SUTb'
+ADDRESS = 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh'
+DESTINATION = 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B'
+
+
+def handler(method, params):
+    if method == 'account_info':
+        return {'result': {'status': 'success', 'ledger_current_index': 100,
+                           'account_data': {'Account': params['account'], 'Sequence': 7}}}
+    if method == 'fee':
+        return {'result': {'status': 'success', 'drops': {'base_fee': '10', 'open_ledger_fee': '12'}}}
+    if method == 'submit':
+        tx_json = binary_codec.decode(params['tx_blob'])
+        return {'result': {'status': 'success', 'engine_result': 'tesSUCCESS', 'tx_json': tx_json}}
+    return {'result': {'status': 'error', 'error': 'unknownCmd'}}
+
+
+def payment(**fields):
+    tx_json = dict(TransactionType='Payment', Account=ADDRESS, Destination=DESTINATION, Amount='1000')
+    tx_json.update(fields)
+    return tx_json
+
+
+class TestKeypairs(unittest.TestCase):
+    def test_parse_seed(self):
+        entropy = bytes.fromhex('DEDCE9CE67B451D852FD4E846FCDE31C')
+        self.assertEqual(parse_seed(SEED), (entropy, None))
+        self.assertEqual(parse_seed('DEDCE9CE67B451D852FD4E846FCDE31C'), (entropy, None))
+        self.assertEqual(parse_seed('masterpassphrase'), (entropy, None))
+        self.assertEqual(parse_seed('I IRE BOND BOW TRIO LAID SEAT GOAL HEN IBIS IBIS DARE'), (entropy, None))
+
+    def test_secp256k1(self):
+        keypair = Keypair.from_seed(SEED)
+        self.assertEqual(keypair.address, ADDRESS)
+        self.assertEqual(keypair.public_key.hex().upper(),
+                         '0330E7FC9D56BB25D6893BA3F317AE5BCF33B3291BD63DB32654A313222F7FD020')
+        signature = keypair.sign(b'message')
+        self.assertEqual(signature, keypair.sign(b'message'))
+        self.assertTrue(keypair.verify(b'message', signature))
+        self.assertFalse(keypair.verify(b'other message', signature))
+
+    def test_rfc6979(self):
+        # deterministic nonce test vector of secp256k1 with private key 1
+        signature = keypairs._secp256k1_sign(1, hashlib.sha256(b'Satoshi Nakamoto').digest())
+        self.assertEqual(signature.hex(),
+                         '3045022100934b1ea10a4b3c1757e2b0c017d0b6143ce3c9a7e6a4a49860d7a6ab210ee3d8'
+                         '02202442ce9d2b916064108014783e923ec36b49743e2ffa1c4496f01a512aafd9e5')
+
+    def test_ed25519(self):
+        # RFC 8032, test 1
+        secret = bytes.fromhex('9d61b19deffd5a60ba844af492ec2cc44449c5697b326919703bac031cae7f60')
+        public_key = bytes.fromhex('d75a980182b10ab7d54bfed3c964073a0ee172f3daa62325af021a68f707511a')
+        keypair = Keypair(secret, b'\xed' + public_key, keypairs.ED25519)
+        signature = keypair.sign(b'')
+        self.assertEqual(signature.hex(),
+                         'e5564300c360ac729086e2cc806e828a84877f1eb8e5d974d873e065224901555f'
+                         'b8821590a33bacc61e39701cf9b46bd25bf5f0595bbe24655141438e7a100b')
+        self.assertTrue(keypair.verify(b'', signature))
+        self.assertFalse(keypair.verify(b'x', signature))
+        derived = Keypair.from_seed(SEED, keypairs.ED25519)
+        self.assertTrue(derived.public_key.startswith(b'\xed'))
+        self.assertNotEqual(derived.address, ADDRESS)
+        with self.assertRaises(ValueError):
+            Keypair.from_seed(SEED, 'rsa')
+
+    def test_sign_transaction(self):
+        for key_type in (keypairs.SECP256K1, keypairs.ED25519):
+            keypair = Keypair.from_seed(SEED, key_type)
+            signed = keypair.sign_transaction(payment(Account=keypair.address, Fee='10', Sequence=1))
+            tx_json = binary_codec.decode(signed['tx_blob'])
+            self.assertEqual(tx_json, {k: v for k, v in signed['tx_json'].items() if k != 'hash'})
+            signature = bytes.fromhex(tx_json.pop('TxnSignature'))
+            self.assertTrue(keypair.verify(binary_codec.encode_for_signing(tx_json), signature))
+            self.assertEqual(signed['tx_json']['hash'], keypairs.sha512_half(
+                keypairs.TRANSACTION_ID_PREFIX + bytes.fromhex(signed['tx_blob'])).hex().upper())
+
+    def test_sign_transactions(self):
+        transactions = [payment(Fee='10', Sequence=sequence) for sequence in range(1, 6)]
+        expected = [Keypair.from_seed(SEED).sign_transaction(tx_json) for tx_json in transactions]
+        self.assertEqual(sign_transactions(transactions, SEED), expected)
+        self.assertEqual(sign_transactions(transactions, SEED, workers=2, chunk_size=2), expected)
+
+
+class TestLocalSigning(unittest.TestCase):
+    def test_sign_and_submit(self):
+        with LocalNode(handler) as node:
+            account = Account(node.url, ADDRESS, SEED, local_signing=True)
+            result = account.send_xrp(issuer=ADDRESS, taker=DESTINATION, amount='1', secret=SEED)
+            self.assertEqual(result['engine_result'], 'tesSUCCESS')
+            self.assertEqual([method for method, _ in node.requests], ['account_info', 'fee', 'submit'])
+            self.assertEqual(result['tx_json']['Sequence'], 7)
+            self.assertEqual(result['tx_json']['Fee'], '12')
+            self.assertEqual(result['tx_json']['LastLedgerSequence'], 120)
+            self.assertEqual(result['tx_json']['Amount'], '1000000')
+
+    def test_opt_in(self):
+        with LocalNode(handler) as node:
+            self.assertFalse(Account(node.url, ADDRESS, SEED).local_signing)
+            account = Account(node.url, ADDRESS, SEED, local_signing=True, last_ledger_offset=None)
+            result = account.sign_and_submit(payment(Sequence=3, Fee='10'))
+            self.assertNotIn('LastLedgerSequence', result['tx_json'])
+            self.assertEqual([method for method, _ in node.requests], ['submit'])
+            filled = account.autofill(payment(Sequence=3, Fee='10', LastLedgerSequence=5))
+            self.assertEqual(filled['LastLedgerSequence'], 5)
+
+    def test_sign_many(self):
+        with LocalNode(handler) as node:
+            account = Account(node.url, ADDRESS, SEED, local_signing=True)
+            signed = account.sign_many([payment(), payment(Sequence=3), payment(Fee='15')], workers=1)
+            self.assertEqual([item['tx_json']['Sequence'] for item in signed], [7, 3, 8])
+            self.assertEqual({item['tx_json']['LastLedgerSequence'] for item in signed}, {120})
+            self.assertEqual([item['tx_json']['Fee'] for item in signed], ['12', '12', '15'])
+            self.assertEqual(len(node.requests), 2)
+
+    def test_autofill_error(self):
+        with LocalNode(lambda method, params: {'result': {'status': 'error', 'error': 'actNotFound'}}) as node:
+            account = Account(node.url, ADDRESS, SEED, local_signing=True)
+            self.assertEqual(account.sign_and_submit(payment())['error'], 'actNotFound')
+            self.assertEqual(account.sign_many([payment()])['error'], 'actNotFound')
+
+    def test_async(self):
+        async def run(url):
+            account = AsyncAccount(url, ADDRESS, SEED, local_signing=True)
+            return await account.sign_and_submit(payment()), await account.sign_many([payment()] * 2, workers=1)
+
+        with LocalNode(handler) as node:
+            result, signed = asyncio.run(run(node.url))
+            self.assertEqual(result['tx_json']['Sequence'], 7)
+            self.assertEqual(result['tx_json']['LastLedgerSequence'], 120)
+            self.assertEqual([item['tx_json']['Sequence'] for item in signed], [7, 8])
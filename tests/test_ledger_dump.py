@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import queue
+import random
+import tempfile
+import threading
+import unittest
+
+from ripple_api import RippleRPCClient, RippleAPIError
+from ripple_api.ledger_dump import LedgerStateDump, shard_bounds
+from tests import LocalNode
+
+generator = random.Random(1)
+KEYS = sorted('{:064X}'.format(generator.getrandbits(256)) for _ in range(1000))
+STATE = [{'index': key, 'data': key[:16]} for key in KEYS]
+
+
+class StateTree(object):
+    """
+    ledger_data of a single ledger version, markers are keys of the last returned objects
+    """
+    def __init__(self, fail_after: int = None) -> None:
+        self.fail_after = fail_after
+        self.pages = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, method, params):
+        if method == 'ledger':
+            return {'result': {'status': 'success', 'ledger_index': 42, 'validated': True}}
+        with self.lock:
+            self.pages += 1
+            if self.fail_after is not None and self.pages > self.fail_after:
+                return {'result': {'status': 'error', 'error': 'tooBusy'}}
+        assert params['ledger_index'] == 42
+        marker = params.get('marker')
+        start = 0
+        if marker is not None:
+            start = next((index for index, key in enumerate(KEYS) if key > marker), len(KEYS))
+        page = STATE[start:start + params['limit']]
+        result = {'status': 'success', 'ledger_index': 42, 'state': page}
+        if start + params['limit'] < len(STATE):
+            result['marker'] = page[-1]['index']
+        return {'result': result}
+
+
+class TestLedgerStateDump(unittest.TestCase):
+    def test_shard_bounds(self):
+        bounds = shard_bounds(4)
+        self.assertEqual(bounds[0], (None, '4' + '0' * 63))
+        self.assertEqual(bounds[1], ('4' + '0' * 63, '8' + '0' * 63))
+        self.assertEqual(bounds[3], ('C' + '0' * 63, 'F' * 64))
+
+    def test_dump_to_queue(self):
+        with LocalNode(StateTree()) as node:
+            rpc = RippleRPCClient(node.url)
+            sink = queue.Queue()
+            stats = rpc.dump_ledger_state(shards=8, sink=sink, limit=50)
+            objects = [sink.get_nowait() for _ in range(sink.qsize())]
+            self.assertEqual(sorted(obj['index'] for obj in objects), KEYS)
+            self.assertEqual(stats['objects'], len(KEYS))
+            self.assertEqual(stats['ledger_index'], 42)
+            self.assertEqual(stats['shards_done'], 8)
+            self.assertGreater(stats['objects_per_second'], 0)
+            markers = [params.get('marker') for method, params in node.requests if method == 'ledger_data']
+            self.assertIn('2' + '0' * 63, markers)
+
+    def test_dump_to_file_and_callback(self):
+        with LocalNode(StateTree()) as node:
+            rpc = RippleRPCClient(node.url)
+            sink = io.StringIO()
+            rpc.dump_ledger_state(ledger_index=42, shards=3, sink=sink, limit=100)
+            lines = sink.getvalue().splitlines()
+            self.assertEqual(sorted(json.loads(line)['index'] for line in lines), KEYS)
+            objects = []
+            progress = []
+            rpc.dump_ledger_state(ledger_index=42, shards=1, sink=objects.append, limit=300, progress=progress.append)
+            self.assertEqual(objects, STATE)
+            self.assertEqual([stats['objects'] for stats in progress], [300, 600, 900, 1000])
+
+    def test_resume_from_checkpoint(self):
+        tree = StateTree(fail_after=10)
+        with LocalNode(tree) as node, tempfile.TemporaryDirectory() as directory:
+            rpc = RippleRPCClient(node.url)
+            checkpoint = os.path.join(directory, 'dump.json')
+            objects = []
+            with self.assertRaises(RippleAPIError):
+                rpc.dump_ledger_state(shards=4, sink=objects.append, checkpoint=checkpoint, limit=40)
+            self.assertLess(len(objects), len(KEYS))
+            delivered = len(objects)
+            tree.fail_after = None
+            stats = rpc.dump_ledger_state(shards=4, sink=objects.append, checkpoint=checkpoint, limit=40)
+            self.assertEqual(sorted(set(obj['index'] for obj in objects)), KEYS)
+            self.assertEqual(len(objects), len(KEYS))
+            self.assertEqual(stats['objects'], len(KEYS))
+            self.assertLess(stats['objects'] - delivered, len(KEYS))
+            with open(checkpoint) as fp:
+                self.assertTrue(all(shard['done'] for shard in json.load(fp)['shards']))
+
+    def test_run_again_after_failure(self):
+        tree = StateTree(fail_after=10)
+        with LocalNode(tree) as node:
+            objects = []
+            dump = LedgerStateDump(RippleRPCClient(node.url), 'validated', shards=4, sink=objects.append, limit=40)
+            with self.assertRaises(RippleAPIError):
+                dump.run()
+            tree.fail_after = None
+            stats = dump.run()
+            self.assertEqual(stats['shards_done'], 4)
+            self.assertEqual(sorted(set(obj['index'] for obj in objects)), KEYS)
@@ -0,0 +1,86 @@
+import unittest
+
+from ripple_api import RippleRPCClient, NodePool
+from tests import LocalNode, RawNode
+
+
+def node_handler(server_state, seq, status=200):
+    def handler(method, params):
+        if status != 200:
+            return status, {}
+        if method == 'server_info':
+            return {'result': {'info': {'server_state': server_state, 'validated_ledger': {'seq': seq}},
+                               'status': 'success'}}
+        return {'result': {'status': 'success', 'node': server_state}}
+    return handler
+
+
+class TestNodePool(unittest.TestCase):
+    def test_unsynced_and_lagging_nodes_are_skipped(self):
+        with LocalNode(node_handler('full', 100)) as full, \
+                LocalNode(node_handler('syncing', 100)) as syncing, \
+                LocalNode(node_handler('proposing', 80)) as lagging:
+            pool = NodePool([syncing.url, lagging.url, full.url], probe_interval=None)
+            pool.probe()
+            self.assertEqual([node.url for node in pool.candidates()], [full.url])
+            rpc = RippleRPCClient(pool)
+            self.assertEqual(rpc.ping()['node'], 'full')
+            self.assertEqual(len(syncing.requests), 1)
+
+    def test_failover(self):
+        with LocalNode(node_handler('full', 100, status=503)) as broken, \
+                LocalNode(node_handler('full', 100)) as healthy:
+            pool = NodePool(['http://127.0.0.1:1/', broken.url, healthy.url], probe_interval=None)
+            rpc = RippleRPCClient(pool)
+            self.assertEqual(rpc.fee()['status'], 'success')
+            self.assertEqual([node.healthy for node in pool.nodes], [False, False, True])
+            self.assertEqual(pool.candidates()[0].url, healthy.url)
+            self.assertIsNotNone(pool.nodes[2].latency)
+
+    def test_no_failover_after_send(self):
+        dropping = RawNode(['drop', 'drop'])
+        try:
+            with LocalNode(node_handler('full', 100)) as healthy:
+                pool = NodePool([dropping.url, healthy.url], probe_interval=None)
+                rpc = RippleRPCClient(pool)
+                self.assertEqual(rpc.submit(tx_blob='00')['status'], 'error')
+                self.assertEqual([request['method'] for request in dropping.requests], ['submit'])
+                self.assertEqual(healthy.requests, [])
+                pool.nodes[0].healthy = True
+                self.assertEqual(rpc.fee()['node'], 'full')
+                self.assertEqual([request['method'] for request in dropping.requests], ['submit', 'fee'])
+        finally:
+            dropping.close()
+
+    def test_all_nodes_down(self):
+        rpc = RippleRPCClient(['http://127.0.0.1:1/'])
+        rpc.node_pool.close()
+        self.assertEqual(rpc.ping()['status'], 'error')
+
+    def test_probe_with_client_transport(self):
+        with LocalNode(node_handler('full', 100)) as full:
+            with RippleRPCClient([full.url]) as rpc:
+                pool = rpc.node_pool
+                self.assertIsNone(pool._thread)
+                self.assertIs(pool.transport, rpc.transport)
+                self.assertIs(pool.codec, rpc.codec)
+                self.assertEqual(rpc.ping()['node'], 'full')
+                self.assertTrue(pool._thread.is_alive())
+                thread = pool._thread
+                requests = rpc.transport.stats['requests']
+                pool.probe()
+                self.assertGreater(rpc.transport.stats['requests'], requests)
+            self.assertFalse(thread.is_alive())
+            self.assertIn('server_info', [method for method, _ in full.requests])
+
+    def test_close(self):
+        with LocalNode(node_handler('full', 100)) as full:
+            with NodePool([full.url], probe_interval=0.01) as pool:
+                pool.candidates()
+                thread = pool._thread
+                rpc = RippleRPCClient(pool)
+                rpc.close()
+                self.assertTrue(thread.is_alive())
+            self.assertFalse(thread.is_alive())
+            pool.candidates()
+            self.assertIsNone(pool._thread)
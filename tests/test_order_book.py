@@ -0,0 +1,98 @@
+import unittest
+
+from ripple_api import RippleRPCClient
+from ripple_api.order_book import OrderBook
+from tests import LocalNode
+
+ISSUER = 'rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B'
+
+
+def usd(value):
+    return {'currency': 'USD', 'issuer': ISSUER, 'value': str(value)}
+
+
+def xrp(value):
+    return str(int(value * 1000000))
+
+
+# asks sell XRP for USD, bids buy XRP with USD
+ASKS = [{'index': 'A{}'.format(index), 'TakerGets': xrp(100), 'TakerPays': usd(100 * (0.30 + index * 0.01))}
+        for index in range(5)]
+BIDS = [{'index': 'B{}'.format(index), 'TakerGets': usd(50 * (0.29 - index * 0.01)), 'TakerPays': xrp(50)}
+        for index in range(5)]
+
+
+def handler(method, params):
+    if method == 'ledger':
+        return {'result': {'status': 'success', 'ledger_index': 100, 'validated': True}}
+    assert params['ledger_index'] == 100
+    offers = ASKS if params['taker_gets'] == {'currency': 'XRP'} else BIDS
+    start = int(params.get('marker', 0))
+    result = {'status': 'success', 'ledger_index': 100, 'offers': offers[start:start + params['limit']]}
+    if start + params['limit'] < len(offers):
+        result['marker'] = str(start + params['limit'])
+    return {'result': result}
+
+
+def offer_node(kind, index, gets, pays):
+    fields = 'FinalFields' if kind != 'CreatedNode' else 'NewFields'
+    return {kind: {'LedgerEntryType': 'Offer', 'LedgerIndex': index, fields: {'TakerGets': gets, 'TakerPays': pays}}}
+
+
+class TestOrderBook(unittest.TestCase):
+    def setUp(self):
+        with LocalNode(handler) as node:
+            self.book = RippleRPCClient(node.url).order_book('XRP', 'USD+' + ISSUER, limit=2)
+
+    def test_seed(self):
+        book = self.book
+        self.assertEqual(book.ledger_index, 100)
+        self.assertEqual(len(book.offers), 10)
+        self.assertAlmostEqual(book.best_ask()[0], 0.30)
+        self.assertEqual(book.best_ask()[1], 100)
+        self.assertAlmostEqual(book.best_bid()[0], 0.29)
+        self.assertEqual([round(price, 2) for price, _ in book.depth('bids', 3)], [0.29, 0.28, 0.27])
+
+    def test_vwap_and_impact(self):
+        book = self.book
+        self.assertAlmostEqual(book.vwap('asks', 100), 0.30)
+        self.assertAlmostEqual(book.vwap('asks', 150), (100 * 0.30 + 50 * 0.31) / 150)
+        self.assertAlmostEqual(book.vwap('asks', 500), 0.32)
+        self.assertIsNone(book.vwap('asks', 501))
+        self.assertAlmostEqual(book.market_impact('asks', 500), 0.02 / 0.30)
+        self.assertAlmostEqual(book.market_impact('bids', 100), 0.005 / 0.29)
+
+    def test_apply_ledger(self):
+        book = self.book
+        meta = {'AffectedNodes': [
+            offer_node('DeletedNode', 'A0', xrp(0), usd(0)),
+            offer_node('ModifiedNode', 'A1', xrp(40), usd(40 * 0.31)),
+            offer_node('CreatedNode', 'B9', usd(10 * 0.295), xrp(10)),
+            offer_node('CreatedNode', 'E1', {'currency': 'EUR', 'issuer': ISSUER, 'value': '1'}, xrp(10)),
+            {'ModifiedNode': {'LedgerEntryType': 'AccountRoot', 'LedgerIndex': 'R1', 'FinalFields': {}}},
+        ]}
+        book.apply_ledger({'ledger_index': 101, 'ledger': {'transactions': [{'hash': 'T', 'metaData': meta}]}})
+        self.assertEqual(book.ledger_index, 101)
+        self.assertAlmostEqual(book.best_ask()[0], 0.31)
+        self.assertAlmostEqual(book.best_ask()[1], 40)
+        self.assertAlmostEqual(book.best_bid()[0], 0.295)
+        self.assertNotIn('E1', book.offers)
+        # ledgers the book has already seen are ignored
+        book.apply_ledger({'ledger_index': 101, 'ledger': {'transactions': [
+            {'metaData': {'AffectedNodes': [offer_node('DeletedNode', 'A1', xrp(0), usd(0))]}}]}})
+        self.assertIn('A1', book.offers)
+
+    def test_transaction_order(self):
+        book = self.book
+        create = {'TransactionIndex': 3, 'AffectedNodes': [offer_node('CreatedNode', 'A9', xrp(10), usd(10 * 0.25))]}
+        consume = {'TransactionIndex': 7, 'AffectedNodes': [offer_node('DeletedNode', 'A9', xrp(0), usd(0))]}
+        book.apply_ledger({'ledger_index': 101, 'ledger': {'transactions': [
+            {'hash': 'B', 'metaData': consume}, {'hash': 'A', 'metaData': create}]}})
+        self.assertNotIn('A9', book.offers)
+        self.assertAlmostEqual(book.best_ask()[0], 0.30)
+
+    def test_empty_book(self):
+        book = OrderBook('XRP', {'currency': 'USD', 'issuer': ISSUER})
+        self.assertIsNone(book.best_bid())
+        self.assertIsNone(book.vwap('asks', 1))
+        self.assertEqual(book.depth('asks'), [])
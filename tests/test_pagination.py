@@ -0,0 +1,164 @@
+import time
+import unittest
+
+from ripple_api import RippleRPCClient, RippleDataAPIClient, RippleAPIError
+from ripple_api.pagination import Paginator, PageSizeTuner
+from tests import LocalNode
+
+LINES = [{'account': 'r{}'.format(index), 'balance': str(index)} for index in range(95)]
+
+
+def handler(method, params):
+    if params.get('account') == 'rMissing':
+        return {'result': {'status': 'error', 'error': 'actNotFound'}}
+    marker = params.get('marker')
+    start = marker['offset'] if isinstance(marker, dict) and 'offset' in marker else 0
+    limit = params.get('limit', 10)
+    result = {'status': 'success', 'ledger_index': 7, 'lines': LINES[start:start + limit]}
+    if start + limit < len(LINES):
+        result['marker'] = {'offset': start + limit}
+    return {'result': result}
+
+
+def slow_handler(method, params):
+    time.sleep(0.1)
+    return handler(method, params)
+
+
+class TestPaginator(unittest.TestCase):
+    def test_follows_marker(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            lines = rpc.iter_account_lines('r1', limit=10)
+            self.assertEqual(list(lines), LINES)
+            self.assertEqual(lines.pages_fetched, 10)
+            self.assertIsNone(lines.marker)
+            self.assertEqual([params['ledger_index'] for _, params in node.requests], ['validated'] + [7] * 9)
+            self.assertNotIn('marker', node.requests[0][1])
+            self.assertEqual(node.requests[-1][1]['marker'], {'offset': 90})
+
+    def test_resume(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            lines = rpc.iter_account_lines('r1', limit=10)
+            consumed = []
+            for line in lines:
+                consumed.append(line)
+                if len(consumed) == 25:
+                    break
+            self.assertEqual(lines.marker, {'offset': 20})
+            resumed = rpc.iter_account_lines('r1', limit=10, marker=lines.marker,
+                                             ledger_index=lines.params['ledger_index'])
+            self.assertEqual(consumed[:20] + list(resumed), LINES)
+
+    def test_prefetch(self):
+        with LocalNode(slow_handler) as node:
+            rpc = RippleRPCClient(node.url)
+            start = time.monotonic()
+            for _ in rpc.iter_account_lines('r1', limit=20):
+                time.sleep(0.005)
+            prefetched = time.monotonic() - start
+            start = time.monotonic()
+            params = dict(account='r1', ledger_index='validated', limit=20)
+            for _ in Paginator(rpc, 'account_lines', params, prefetch=False):
+                time.sleep(0.005)
+            sequential = time.monotonic() - start
+            self.assertLess(prefetched, sequential - 0.2)
+
+    def test_account_tx_range(self):
+        def account_tx(method, params):
+            marker = params.get('marker')
+            ledger = marker['ledger'] if marker else 110
+            result = {'status': 'success', 'ledger_index_min': 100, 'ledger_index_max': 120,
+                      'transactions': [{'ledger_index': ledger}]}
+            if ledger > 108:
+                result['marker'] = {'ledger': ledger - 1, 'seq': 0}
+            return {'result': result}
+
+        with LocalNode(account_tx) as node:
+            rpc = RippleRPCClient(node.url)
+            transactions = rpc.iter_account_tx('r1', ledger_index_min=105)
+            self.assertEqual([tx['ledger_index'] for tx in transactions], [110, 109, 108])
+            self.assertEqual([(params['ledger_index_min'], params['ledger_index_max']) for _, params in node.requests],
+                             [(105, -1), (105, 120), (105, 120)])
+            self.assertNotIn('ledger_index', node.requests[-1][1])
+
+    def test_error(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            with self.assertRaises(RippleAPIError) as context:
+                list(rpc.iter_account_offers('rMissing'))
+            self.assertEqual(str(context.exception), 'actNotFound')
+
+    def test_marker_parameters(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            rpc.account_lines('r1')
+            rpc.account_tx('r1', marker={'ledger': 1, 'seq': 2})
+            rpc.ledger_data(ledger_index=5, limit=100, marker='AB')
+            rpc.ledger_data('HASH')
+            self.assertEqual(node.requests[0][1], {'account': 'r1'})
+            self.assertEqual(node.requests[1][1]['marker'], {'ledger': 1, 'seq': 2})
+            self.assertEqual(node.requests[2][1], dict(ledger_index=5, binary=True, limit=100, marker='AB'))
+            self.assertEqual(node.requests[3][1], dict(ledger_hash='HASH', binary=True, limit=5))
+
+
+PAYMENTS = [{'tx_hash': '{:064X}'.format(index), 'amount': str(index)} for index in range(2500)]
+
+
+def data_handler(path, query):
+    if path != '/v2/payments/USD':
+        return 400, {'result': 'error', 'message': 'invalid currency'}
+    start = int(query.get('marker', 0))
+    limit = int(query['limit'])
+    result = {'result': 'success', 'count': limit, 'payments': PAYMENTS[start:start + limit]}
+    if start + limit < len(PAYMENTS):
+        result['marker'] = str(start + limit)
+    return result
+
+
+class TestDataAPIPaginator(unittest.TestCase):
+    def test_follows_marker_and_grows_limit(self):
+        with LocalNode(data_handler) as node:
+            api = RippleDataAPIClient(node.url)
+            payments = api.iter_payments('USD', start='2019-01-01')
+            self.assertEqual(list(payments), PAYMENTS)
+            limits = [int(query['limit']) for _, query in node.requests]
+            self.assertEqual(limits, [100, 200, 400, 800, 1000])
+            self.assertEqual(node.requests[0][1]['start'], '2019-01-01')
+            self.assertNotIn('marker', node.requests[0][1])
+
+    def test_explicit_limit(self):
+        with LocalNode(data_handler) as node:
+            api = RippleDataAPIClient(node.url)
+            payments = api.iter_payments('USD', limit=500)
+            self.assertEqual(len(list(payments)), len(PAYMENTS))
+            self.assertEqual({query['limit'] for _, query in node.requests}, {'500'})
+
+    def test_resume(self):
+        with LocalNode(data_handler) as node:
+            api = RippleDataAPIClient(node.url)
+            payments = api.iter_payments('USD', marker='2400', limit=50)
+            self.assertEqual(list(payments), PAYMENTS[2400:])
+            self.assertEqual(payments.pages_fetched, 2)
+            self.assertEqual(payments.url_params, ('payments', 'USD'))
+
+    def test_error(self):
+        with LocalNode(data_handler) as node:
+            api = RippleDataAPIClient(node.url)
+            with self.assertRaises(RippleAPIError):
+                list(api.iter_payments('EUR'))
+
+    def test_tuner_shrinks_on_slow_pages(self):
+        tuner = PageSizeTuner(initial=400, minimum=50, maximum=1000, target_latency=0.5)
+        tuner.record(400, 400, 0.1)
+        self.assertEqual(tuner.limit, 800)
+        tuner.record(800, 800, 0.1)
+        self.assertEqual(tuner.limit, 1000)
+        tuner.record(1000, 1000, 2.0)
+        self.assertEqual(tuner.limit, 500)
+        tuner.record(500, 20, 0.1)
+        self.assertEqual(tuner.limit, 500)
+        for _ in range(5):
+            tuner.record(tuner.limit, tuner.limit, 1.0)
+        self.assertEqual(tuner.limit, 50)
@@ -0,0 +1,46 @@
+import unittest
+
+from ripple_api import RippleRPCClient
+from ripple_api.snapshot import AccountSnapshot
+from tests import LocalNode
+
+ADDRESSES = ['r{}'.format(index) for index in range(300)]
+
+
+def handler(method, params):
+    if method == 'ledger':
+        return {'result': {'status': 'success', 'ledger_index': 1000, 'validated': True}}
+    assert params['ledger_index'] == 1000 and params['queue'] is False
+    index = int(params['account'][1:])
+    if index % 100 == 99:
+        return {'result': {'status': 'error', 'error': 'actNotFound', 'account': params['account']}}
+    return {'result': {'status': 'success', 'ledger_index': 1000, 'validated': True, 'account_data': {
+        'Account': params['account'], 'Balance': str(index * 1000000 + 7), 'Sequence': index + 1,
+        'OwnerCount': index % 5, 'Flags': 131072 if index % 2 else 0}}}
+
+
+class TestAccountSnapshot(unittest.TestCase):
+    def test_account_info_many(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            snapshot = rpc.account_info_many(iter(ADDRESSES), max_in_flight=8)
+            self.assertEqual(snapshot.ledger_index, 1000)
+            self.assertEqual(len(snapshot), 297)
+            self.assertEqual(sorted(snapshot.errors), ['r199', 'r299', 'r99'])
+            self.assertEqual(snapshot.addresses, [address for address in ADDRESSES if address not in snapshot.errors])
+            self.assertEqual(snapshot.balances.typecode, 'q')
+            self.assertEqual(snapshot.sum(), sum(index * 1000000 + 7 for index in range(300) if index % 100 != 99))
+            self.assertEqual(snapshot.top(2), [('r298', 298000007), ('r297', 297000007)])
+            self.assertEqual(snapshot.top(1, 'sequences'), [('r298', 299)])
+            self.assertEqual(snapshot.get('r3'), dict(address='r3', Balance=3000007, Sequence=4,
+                                                      OwnerCount=3, Flags=131072))
+            self.assertIsNone(snapshot.get('r99'))
+
+    def test_large_balances(self):
+        snapshot = AccountSnapshot(1)
+        snapshot.append('r1', {'Balance': '99999999999000000', 'Sequence': 4294967295, 'Flags': 0x80000000})
+        self.assertEqual(snapshot.sum(), 99999999999000000)
+        self.assertGreaterEqual(snapshot.flags.itemsize, 4)
+        self.assertEqual(snapshot.get('r1')['Flags'], 0x80000000)
+        self.assertEqual(snapshot.get('r1')['Sequence'], 4294967295)
+        self.assertEqual(snapshot.get('r1')['OwnerCount'], 0)
@@ -0,0 +1,91 @@
+import json
+import unittest
+from io import BytesIO
+
+from ripple_api import RippleRPCClient, RippleDataAPIClient, RippleAPIError
+from ripple_api.streaming import JSONStream
+from tests import LocalNode
+
+TRANSACTIONS = [{'hash': '{:064X}'.format(index), 'Memo': 'café "quoted" \\ [{}]', 'Fee': '12',
+                 'meta': {'AffectedNodes': [{'ModifiedNode': {'LedgerIndex': str(index)}}]}}
+                for index in range(300)]
+
+
+def handler(method, params):
+    if method == 'ledger':
+        if params['ledger_index'] == 'bad':
+            return {'result': {'error': 'invalidParams', 'status': 'error', 'request': params}}
+        return {'result': {'ledger': {'accepted': True, 'accountState': [{'x': [1, 2]}],
+                                      'ledger_index': '90', 'transactions': TRANSACTIONS},
+                           'ledger_hash': 'ABC', 'status': 'success', 'validated': True}}
+    if method == 'account_tx':
+        return {'result': {'account': params['account'], 'marker': {'ledger': 10, 'seq': 2},
+                           'transactions': [], 'validated': True}}
+    return {'result': 'success', 'exchanges': [{'rate': index / 3} for index in range(50)], 'marker': 'next'}
+
+
+class TestJSONStream(unittest.TestCase):
+    def stream(self, document, path, chunk_size=7):
+        data = json.dumps(document).encode('utf-8')
+        return JSONStream(lambda: BytesIO(data), path, chunk_size=chunk_size)
+
+    def test_small_chunks(self):
+        document = {'a': 1, 'b': {'skip': [{'c': '}]'}], 'rows': [1.5e3, 'x', None, {'y': [True, False]}, -2],
+                                  'z': 'after'}, 'tail': 'end'}
+        stream = self.stream(document, ('b', 'rows'))
+        self.assertEqual(list(stream), [1.5e3, 'x', None, {'y': [True, False]}, -2])
+        self.assertEqual(stream.fields, {'a': 1, 'z': 'after', 'tail': 'end'})
+        self.assertTrue(stream.found)
+
+    def test_numbers_across_chunks(self):
+        data = b'{"result": {"lines": [1.5, 2.25, 3e5, -0.125E-2, 10, true]}, "fee": 1.25}'
+        for chunk_size in range(1, len(data) + 1):
+            stream = JSONStream(lambda: BytesIO(data), ('result', 'lines'), chunk_size=chunk_size)
+            self.assertEqual(list(stream), [1.5, 2.25, 3e5, -0.125e-2, 10, True], chunk_size)
+            self.assertEqual(stream.fields, {'fee': 1.25}, chunk_size)
+
+    def test_missing_path(self):
+        stream = self.stream({'a': {'b': 1}, 'c': 2}, ('a', 'rows'))
+        self.assertEqual(list(stream), [])
+        self.assertFalse(stream.found)
+        self.assertEqual(stream.fields, {'b': 1, 'c': 2})
+
+    def test_empty_array(self):
+        stream = self.stream({'rows': [], 'marker': 'm'}, ('rows', ))
+        self.assertEqual(list(stream), [])
+        self.assertEqual(stream.fields['marker'], 'm')
+
+
+class TestClientStreaming(unittest.TestCase):
+    def test_ledger_transactions(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            stream = rpc.stream('ledger', dict(ledger_index=90, transactions=True, expand=True))
+            self.assertEqual(list(stream), TRANSACTIONS)
+            self.assertEqual(stream.fields['ledger_hash'], 'ABC')
+            self.assertEqual(stream.fields['ledger_index'], '90')
+            rpc.ping()
+            self.assertEqual(rpc.transport.stats['connections_reused'], 1)
+
+    def test_error(self):
+        with LocalNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            with self.assertRaises(RippleAPIError) as context:
+                list(rpc.stream('ledger', dict(ledger_index='bad')))
+            self.assertEqual(context.exception.response['error'], 'invalidParams')
+        with self.assertRaises(RippleAPIError):
+            list(RippleRPCClient('http://127.0.0.1:1/').stream('ledger', {}))
+
+    def test_marker(self):
+        with LocalNode(handler) as node:
+            stream = RippleRPCClient(node.url).stream('account_tx', dict(account='r1'))
+            self.assertEqual(list(stream), [])
+            self.assertEqual(stream.fields['account'], 'r1')
+            self.assertEqual(stream.fields['marker'], {'ledger': 10, 'seq': 2})
+
+    def test_data_api(self):
+        with LocalNode(handler) as node:
+            api = RippleDataAPIClient(node.url)
+            stream = api.stream(('exchanges', 'XRP', 'USD'), dict(limit=50), 'exchanges')
+            self.assertEqual(len(list(stream)), 50)
+            self.assertEqual(stream.fields['marker'], 'next')
@@ -0,0 +1,85 @@
+import random
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+
+from ripple_api import RippleDataAPIClient, RippleAPIError
+from ripple_api.time_range import to_iso, to_timestamp
+from tests import LocalNode
+
+START = to_timestamp('2019-01-01T00:00:00Z')
+generator = random.Random(2)
+# a quiet day with a busy hour
+TIMES = sorted([START + generator.randrange(86400) for _ in range(300)] +
+               [START + 36000 + generator.randrange(3600) for _ in range(1200)])
+PAYMENTS = [{'tx_hash': '{:064X}'.format(index), 'executed_time': to_iso(timestamp)}
+            for index, timestamp in enumerate(TIMES)]
+
+
+class Payments(object):
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, path, query):
+        if self.fail:
+            return {'result': 'error', 'message': 'too many requests'}
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        records = [payment for payment in PAYMENTS if query['start'] <= payment['executed_time'] <= query['end']]
+        start, limit = int(query.get('marker', 0)), int(query['limit'])
+        result = {'result': 'success', 'payments': records[start:start + limit]}
+        if start + limit < len(records):
+            result['marker'] = str(start + limit)
+        return result
+
+
+class TestTimeRangeFetcher(unittest.TestCase):
+    def test_conversions(self):
+        self.assertEqual(to_timestamp('2019-01-01'), START)
+        self.assertEqual(to_timestamp(datetime(2019, 1, 1)), START)
+        self.assertEqual(to_timestamp(datetime(2019, 1, 1, tzinfo=timezone.utc)), START)
+        self.assertEqual(to_iso(START + 61), '2019-01-01T00:01:01Z')
+
+    def test_records_in_time_order(self):
+        handler = Payments()
+        with LocalNode(handler) as node:
+            api = RippleDataAPIClient(node.url)
+            payments = api.fetch_range(('payments', ), {}, 'payments', '2019-01-01', START + 86399,
+                                       intervals=4, max_concurrency=4, limit=100)
+            self.assertEqual(list(payments), PAYMENTS)
+            stats = payments.stats
+            self.assertEqual(stats['records'], len(PAYMENTS))
+            self.assertGreater(stats['splits'], 3)
+            self.assertGreater(handler.max_active, 1)
+            self.assertLessEqual(handler.max_active, 4)
+
+    def test_first_page_reused(self):
+        with LocalNode(Payments()) as node:
+            api = RippleDataAPIClient(node.url)
+            payments = api.fetch_range(('payments', ), {}, 'payments', '2019-01-01', START + 86399,
+                                       intervals=4, max_concurrency=4, limit=100)
+            self.assertEqual(list(payments), PAYMENTS)
+            starts = [query['start'] for _, query in node.requests if 'marker' not in query]
+            self.assertEqual(len(starts), len(set(starts)))
+
+    def test_parsed_time_order(self):
+        records = [{'executed_time': '2019-01-01T00:00:20.5Z'}, {'executed_time': '2019-01-01T00:00:10Z'},
+                   {'executed_time': '2019-01-01T01:00:05+01:00'}]
+        with LocalNode(lambda path, query: {'result': 'success', 'payments': records}) as node:
+            api = RippleDataAPIClient(node.url)
+            payments = list(api.fetch_range(('payments', ), {}, 'payments', START, START + 59, intervals=1))
+            self.assertEqual(payments, [records[2], records[1], records[0]])
+
+    def test_error(self):
+        with LocalNode(Payments(fail=True)) as node:
+            api = RippleDataAPIClient(node.url)
+            with self.assertRaises(RippleAPIError):
+                list(api.fetch_payments('2019-01-01', '2019-01-02', currency='USD'))
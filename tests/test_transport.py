@@ -0,0 +1,88 @@
+import unittest
+
+from ripple_api import RippleRPCClient, RippleDataAPIClient, HTTPTransport
+from tests import LocalNode, RawNode
+
+
+class TestHTTPTransport(unittest.TestCase):
+    @staticmethod
+    def handler(method, params):
+        if method == 'account_info':
+            return {'result': {'status': 'success', 'account_data': {'Account': params['account']}}}
+        return {'result': 'success', 'path': method}
+
+    def test_connection_reuse(self):
+        with LocalNode(self.handler) as node:
+            rpc = RippleRPCClient(node.url)
+            for _ in range(5):
+                info = rpc.account_info('r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+                self.assertEqual(info['status'], 'success')
+            stats = rpc.transport.stats
+            self.assertEqual(stats['requests'], 5)
+            self.assertEqual(stats['connections_opened'], 1)
+            self.assertEqual(stats['connections_reused'], 4)
+            self.assertEqual(node.connections, 1)
+
+    def test_shared_transport(self):
+        transport = HTTPTransport()
+        with LocalNode(self.handler) as node:
+            rpc = RippleRPCClient(node.url, transport=transport)
+            api = RippleDataAPIClient(node.url, transport=transport)
+            rpc.ping()
+            info = api.get_stats()
+            self.assertEqual(info['path'], '/v2/stats')
+            self.assertEqual(transport.stats['connections_reused'], 1)
+
+    def test_idle_eviction(self):
+        transport = HTTPTransport(idle_timeout=0)
+        with LocalNode(self.handler) as node:
+            rpc = RippleRPCClient(node.url, transport=transport)
+            rpc.ping()
+            rpc.ping()
+            self.assertEqual(transport.stats['connections_evicted'], 1)
+            self.assertEqual(transport.stats['connections_opened'], 2)
+
+    def test_http_error(self):
+        with LocalNode(lambda method, params: (403, {})) as node:
+            rpc = RippleRPCClient(node.url)
+            info = rpc.stop()
+            self.assertEqual(info['status'], 'error')
+            self.assertIn('Admin methods', info['text'])
+
+    def test_connection_error(self):
+        rpc = RippleRPCClient('http://127.0.0.1:1/')
+        info = rpc.ping()
+        self.assertEqual(info['status'], 'error')
+
+    def test_stale_connection(self):
+        node = RawNode(['respond_close', 'respond'])
+        try:
+            rpc = RippleRPCClient(node.url)
+            self.assertEqual(rpc.ping()['status'], 'success')
+            self.assertEqual(rpc.ping()['status'], 'success')
+            self.assertEqual(rpc.transport.stats['connections_opened'], 2)
+            self.assertEqual(len(node.requests), 2)
+        finally:
+            node.close()
+
+    def test_no_resend(self):
+        node = RawNode(['respond', 'drop', 'respond'])
+        try:
+            rpc = RippleRPCClient(node.url)
+            self.assertEqual(rpc.ping()['status'], 'success')
+            self.assertEqual(rpc.submit(tx_blob='00')['status'], 'error')
+            self.assertEqual([request['method'] for request in node.requests], ['ping', 'submit'])
+        finally:
+            node.close()
+
+    def test_stream_caller_errors(self):
+        transport = HTTPTransport()
+        with LocalNode(self.handler) as node:
+            with self.assertRaises(PermissionError):
+                with transport.stream('POST', node.url, body=b'{"method": "ping", "params": [{}]}') as body:
+                    body.read(1)
+                    raise PermissionError('disk is read-only')
+            with transport.stream('POST', node.url, body=b'{"method": "ping", "params": [{}]}') as body:
+                self.assertIn(b'ping', body.read())
+            self.assertEqual(transport.stats['connections_reused'], 0)
+            self.assertEqual(transport.stats['idle_connections'], 1)
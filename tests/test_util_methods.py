@@ -1,10 +1,127 @@
+import json
+import os
+import tempfile
 import unittest
 
-from ripple_api.utils import generate_seed
+from ripple_api.utils import (
+    b58check_decode, b58check_encode, b58decode, b58encode, convert_seeds, decode_seed, encode_account_id,
+    encode_seed, english_to_key, generate_seed, generate_wallets, is_valid_address, key_to_english,
+    rfc1751_to_seed, seed_to_rfc1751, validate_addresses, wallet,
+)
+from ripple_api.keypairs import Keypair
+
+MASTER_ENTROPY = bytes.fromhex('DEDCE9CE67B451D852FD4E846FCDE31C')
+MASTER_WORDS = 'I IRE BOND BOW TRIO LAID SEAT GOAL HEN IBIS IBIS DARE'
 
 
 class TestUtilMethods(unittest.TestCase):
     def test_generate_seed(self):
         seed = generate_seed()
         self.assertTrue(str(seed))
-        self.assertEqual(len(seed), 29)
\ No newline at end of file
+        self.assertEqual(len(seed), 29)
+        self.assertTrue(seed.startswith('s'))
+        self.assertEqual(len(decode_seed(seed)[0]), 16)
+        self.assertNotEqual(seed, generate_seed())
+        self.assertEqual(len(rfc1751_to_seed(generate_seed('rfc1751'))), 16)
+        self.assertEqual(len(bytes.fromhex(generate_seed('hex'))), 16)
+        self.assertEqual(len(generate_seed('passphrase')), 20)
+        with self.assertRaises(Exception):
+            generate_seed('words')
+
+    def test_base58(self):
+        for size in range(40):
+            data = os.urandom(size)
+            self.assertEqual(b58decode(b58encode(data)), data)
+            self.assertEqual(b58decode(b58encode(bytes(3) + data)), bytes(3) + data)
+        self.assertEqual(b58encode(b'\0\0\1'), 'rrp')
+        with self.assertRaises(ValueError):
+            b58decode('r0')
+        with self.assertRaises(ValueError):
+            b58check_decode(b58check_encode(b'payload')[:-1] + 'r')
+
+    def test_seed(self):
+        entropy = bytes.fromhex('DEDCE9CE67B451D852FD4E846FCDE31C')
+        self.assertEqual(encode_seed(entropy), 'snoPBrXtMeMyMHUVTgbuqAfg1SUTb')
+        self.assertEqual(decode_seed('snoPBrXtMeMyMHUVTgbuqAfg1SUTb'), (entropy, None))
+        ed25519 = encode_seed(entropy, 'ed25519')
+        self.assertTrue(ed25519.startswith('sEd'))
+        self.assertEqual(decode_seed(ed25519), (entropy, 'ed25519'))
+        with self.assertRaises(ValueError):
+            decode_seed('rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh')
+
+    def test_validate_addresses(self):
+        addresses = ['rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh', 'rrrrrrrrrrrrrrrrrrrrrhoLvTp',
+                     'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTj', 'r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk591313',
+                     '19cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59', 'rHb9CJAWyB4rj91VRWn96DkukG4bwdtyé',
+                     'snoPBrXtMeMyMHUVTgbuqAfg1SUTb', '', None]
+        self.assertEqual(validate_addresses(addresses), [True, True] + [False] * 7)
+        generated = [encode_account_id(os.urandom(20)) for _ in range(1000)]
+        self.assertTrue(all(validate_addresses(iter(generated))))
+        self.assertFalse(is_valid_address(generated[0][:-1]))
+
+    def test_rfc1751(self):
+        # examples of RFC 1751
+        self.assertEqual(key_to_english(bytes.fromhex('CCAC2AED591056BE4F90FD441C534766')),
+                         'RASH BUSH MILK LOOK BAD BRIM AVID GAFF BAIT ROT POD LOVE')
+        self.assertEqual(english_to_key('trod mute tail warm char kong haag city bore o teal awl'),
+                         bytes.fromhex('EFF81F9BFBC65350920CDD7416DE8009'))
+        self.assertEqual(seed_to_rfc1751(MASTER_ENTROPY), MASTER_WORDS)
+        self.assertEqual(rfc1751_to_seed(MASTER_WORDS), MASTER_ENTROPY)
+        # parity of the last word does not match
+        with self.assertRaises(ValueError):
+            english_to_key('I IRE BOND BOW TRIO LAID SEAT GOAL HEN IBIS IBIS DASH')
+        with self.assertRaises(ValueError):
+            english_to_key('I IRE BOND BOW TRIO XYZZY')
+        with self.assertRaises(ValueError):
+            english_to_key('I IRE BOND')
+        with self.assertRaises(ValueError):
+            key_to_english(b'short')
+
+    def test_convert_seeds(self):
+        seeds = ['snoPBrXtMeMyMHUVTgbuqAfg1SUTb', MASTER_WORDS, MASTER_ENTROPY.hex()]
+        self.assertEqual(convert_seeds(seeds, 'hex'), [MASTER_ENTROPY.hex().upper()] * 3)
+        self.assertEqual(convert_seeds(seeds, 'rfc1751'), [MASTER_WORDS] * 3)
+        generated = [generate_seed() for _ in range(100)]
+        self.assertEqual(convert_seeds(convert_seeds(generated, 'rfc1751')), generated)
+        ed25519 = encode_seed(MASTER_ENTROPY, 'ed25519')
+        self.assertEqual(convert_seeds([ed25519]), [ed25519])
+        with self.assertRaises(ValueError):
+            convert_seeds(['not a seed'])
+
+    def test_wallet(self):
+        self.assertEqual(wallet(MASTER_ENTROPY), dict(
+            account_id='rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh',
+            key_type='secp256k1',
+            master_key=MASTER_WORDS,
+            master_seed='snoPBrXtMeMyMHUVTgbuqAfg1SUTb',
+            master_seed_hex='DEDCE9CE67B451D852FD4E846FCDE31C',
+            public_key='aBQG8RQAzjs1eTKFEAQXr2gS4utcDiEC9wmi7pfUPTi27VCahwgw',
+            public_key_hex='0330E7FC9D56BB25D6893BA3F317AE5BCF33B3291BD63DB32654A313222F7FD020',
+        ))
+        ed25519 = wallet(MASTER_ENTROPY, 'ed25519')
+        self.assertEqual(ed25519['master_seed'], 'snoPBrXtMeMyMHUVTgbuqAfg1SUTb')
+        self.assertTrue(ed25519['public_key_hex'].startswith('ED'))
+        self.assertEqual(Keypair.from_seed(ed25519['master_seed'], 'ed25519').address, ed25519['account_id'])
+
+    def test_generate_wallets(self):
+        wallets = generate_wallets(5, workers=1)
+        self.assertEqual(len(wallets), 5)
+        self.assertEqual(len({item['master_seed'] for item in wallets}), 5)
+        for item in wallets:
+            self.assertEqual(wallet(bytes.fromhex(item['master_seed_hex'])), item)
+        wallets = generate_wallets(7, key_type='ed25519', workers=2, chunk_size=3)
+        self.assertEqual(len(wallets), 7)
+        self.assertTrue(all(item['key_type'] == 'ed25519' for item in wallets))
+        self.assertTrue(all(validate_addresses(item['account_id'] for item in wallets)))
+        self.assertEqual(generate_wallets(0), [])
+        with self.assertRaises(ValueError):
+            generate_wallets(1, key_type='rsa')
+
+    def test_generate_wallets_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'wallets.jsonl')
+            self.assertEqual(generate_wallets(5, path=path, workers=1, chunk_size=2), 5)
+            with open(path) as fp:
+                wallets = [json.loads(line) for line in fp]
+        self.assertEqual(len(wallets), 5)
+        self.assertEqual(wallet(bytes.fromhex(wallets[0]['master_seed_hex'])), wallets[0])
@@ -0,0 +1,75 @@
+import time
+import unittest
+from urllib.error import URLError
+
+from ripple_api import RippleRPCClient, WebSocketTransport
+from tests import LocalWebSocketNode
+
+
+def handler(command, params):
+    if command == 'account_info':
+        time.sleep(params.get('delay', 0))
+        if params['account'].startswith('1'):
+            return {'error': 'actMalformed', 'error_message': 'Account malformed.'}
+        return {'account_data': {'Account': params['account']}, 'status': 'success'}
+    return {'status': 'success'}
+
+
+class TestWebSocketTransport(unittest.TestCase):
+    def test_call(self):
+        with LocalWebSocketNode(handler) as node:
+            rpc = RippleRPCClient(node.url)
+            self.assertIsInstance(rpc.transport, WebSocketTransport)
+            info = rpc.account_info('r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+            self.assertEqual(info['account_data']['Account'], 'r9cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+            self.assertEqual(node.requests[0]['command'], 'account_info')
+            error = rpc.account_info('19cZA1mLK5R5Am25ArfXFmqgNwjZgnfk59')
+            self.assertEqual(error['status'], 'error')
+            self.assertEqual(error['error'], 'actMalformed')
+            rpc.transport.close()
+
+    def test_out_of_order_responses(self):
+        with LocalWebSocketNode(handler) as node:
+            transport = WebSocketTransport(node.url)
+            slow = transport.call_async('account_info', dict(account='rSlow', delay=0.3))
+            fast = transport.call_async('account_info', dict(account='rFast'))
+            self.assertEqual(fast.result(5)['account_data']['Account'], 'rFast')
+            self.assertFalse(slow.done())
+            self.assertEqual(slow.result(5)['account_data']['Account'], 'rSlow')
+            self.assertEqual(node.connections, 1)
+            self.assertEqual(transport.stats['requests'], 2)
+            transport.close()
+
+    def test_connection_error(self):
+        rpc = RippleRPCClient('ws://127.0.0.1:1/')
+        self.assertEqual(rpc.ping()['status'], 'error')
+
+    def test_reconnect(self):
+        with LocalWebSocketNode(handler) as node:
+            transport = WebSocketTransport(node.url)
+            rpc = RippleRPCClient(node.url, transport=transport)
+            rpc.ping()
+            transport.close()
+            self.assertEqual(rpc.ping()['status'], 'success')
+            self.assertEqual(transport.stats['connections_opened'], 2)
+            transport.close()
+
+    def test_timeout(self):
+        messages = []
+
+        def on_message(message):
+            messages.append(message)
+            raise RuntimeError('callback failed')
+
+        with LocalWebSocketNode(handler) as node:
+            transport = WebSocketTransport(node.url, timeout=0.1, on_message=on_message)
+            rpc = RippleRPCClient(node.url, transport=transport)
+            with self.assertRaises(URLError):
+                transport.call('account_info', dict(account='rSlow', delay=0.3))
+            self.assertEqual(transport.stats['in_flight'], 0)
+            time.sleep(0.4)
+            self.assertEqual(messages[0]['result']['account_data']['Account'], 'rSlow')
+            self.assertEqual(transport.stats['callback_errors'], 1)
+            self.assertEqual(rpc.ping()['status'], 'success')
+            self.assertEqual(transport.stats['connections_opened'], 1)
+            transport.close()